@@ -1,39 +1,34 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
-import csv
-import copy
 import argparse
-import itertools
-import threading
+import multiprocessing
+import queue
 import time
-import math
-from collections import Counter, deque
 
 import cv2 as cv
 import numpy as np
-import mediapipe as mp
-from pythonosc import udp_client
 
 from utils import CvFpsCalc
-from model import KeyPointClassifier
-from model import PointHistoryClassifier
+from shimon import LatestSlot, StageTimer, CaptureThread, WorkerThread
+from shimon import HandGeometry, StdinKeys
+from shimon import EventBus, THUMBS_UP, SPIN_CW, SPIN_CCW
+from shimon import LandmarkRecorder, LandmarkRecording, open_source, BatchClassifier
+from shimon import Metrics, MetricsServer, TrainingLogger
+from shimon import Coordinator, VoteBob, POLICIES, TEMPOS, RoiInference
+from shimon import BACKENDS, load_classifier
+from shimon import load_labels as load_model_labels
+from shimon import GestureEngine, EvaluationPlanner, ALL_STAGES, NO_STAGES
+from shimon import arpeggio_control, chord_control
+from shimon import TextCache, draw_hand, LandmarkFilter
+from shimon import HOST, MUSIC_PORT, OSC_ARM_PATH, HeadBobber, HeadBobControl
+from shimon.headbob import (PORT, OSC_PATH, UP_ANGLE, DOWN_ANGLE, SPEED, INTERVAL_MIN, INTERVAL_MAX,
+                            START_STABLE_FRAMES, SMOOTH_STABLE_FRAMES)
 
 # ===================== Shimon control =====================
-HOST = "192.168.1.1"   # <-- set your robot IP
-PORT = 9000
-OSC_PATH = "/head-commands"
-UP_ANGLE = 0.10
-DOWN_ANGLE = -0.10
-SPEED = 3
-
-# Ramped cadence (seconds between bobs)
-INTERVAL_MIN = 0.30   # fastest
-INTERVAL_MAX = 1.20   # slowest
-RAMP_FASTER_PER_S = 0.25  # shrink interval/sec when "Point" (speed up)
-RAMP_SLOWER_PER_S = 0.12  # grow interval/sec otherwise (slow down)
-
-# >>> Thumbs-up gate config
-START_STABLE_FRAMES = 15  # ~0.5s at ~30fps; how long 👍 must be held to start
+# robot address, neck (head bob) and arm (music modes) OSC settings live in the
+# shimon package, shared with ShimonSimulator; HOST: set your robot IP there or pass --host
+BPM_DEFAULT = 120.0
+LOOPBACK = "127.0.0.1"    # --replay's default --host (nothing listens unless ShimonSimulator does)
 
 # ===================== Playback hook (EDIT ME) =====================
 def on_start_playback():
@@ -50,174 +45,94 @@ def on_start_playback():
     # from audioToMidi import AudioMidiConverter
     # AudioMidiConverter(...).start()
 
-# ===================== Head bob control =====================
-class HeadBobber:
-    """Background head-bobbing loop you can pause/resume and retime."""
-    def __init__(self, host=HOST, port=PORT, path=OSC_PATH,
-                 up=UP_ANGLE, down=DOWN_ANGLE, speed=SPEED,
-                 interval=1.0):
-        self.client = udp_client.SimpleUDPClient(host, port)
-        self.path = path
-        self.up, self.down = float(up), float(down)
-        self.speed = int(speed)
-        self.interval = float(interval)
-        self.running = False  # >>> start paused (wait for 👍)
-        self._beat = 0
-        self._stop = threading.Event()
-        self._thr = threading.Thread(target=self._loop, daemon=True)
-        self._thr.start()
-
-    def _loop(self):
-        while not self._stop.is_set():
-            if self.running:
-                angle = self.up if (self._beat % 2 == 0) else self.down
-                try:
-                    self.client.send_message(self.path, ["NECK", angle, self.speed])
-                except Exception as e:
-                    print("[OSC ERROR]", e)
-                self._beat += 1
-                time.sleep(self.interval)
-            else:
-                time.sleep(0.05)
-
-    def pause(self):
-        if self.running:
-            print("[HeadBob] PAUSE")
-        self.running = False
-
-    def resume(self):
-        if not self.running:
-            print("[HeadBob] RESUME")
-        self.running = True
-
-    def set_interval(self, new_interval: float):
-        new_interval = float(new_interval)
-        new_interval = max(INTERVAL_MIN, min(INTERVAL_MAX, new_interval))
-        if abs(new_interval - self.interval) > 1e-6:
-            print(f"[HeadBob] interval -> {new_interval:.2f}s")
-        self.interval = new_interval
-
-    def nudge_interval(self, delta: float):
-        self.set_interval(self.interval + float(delta))
-
-    def shutdown(self):
-        self.running = False
-        self._stop.set()
-        if self._thr.is_alive():
-            self._thr.join(timeout=1.0)
-
 # ===================== CLI args ===========================
-def get_args():
+CONTROLLERS = ("bob", "arp", "chords")
+
+
+def get_args(argv=None):
     parser = argparse.ArgumentParser()
-    parser.add_argument("--device", type=int, default=0)
+    parser.add_argument("--controllers", nargs="+", choices=CONTROLLERS, default=["bob"],
+                        help="modes driven from the one camera stream: head bob, arpeggios "
+                             "(ShimonMasterHandGestures), chords + dynamics (ShimonVelocityTester)")
+    parser.add_argument("--bpm", type=float, default=BPM_DEFAULT, help="tempo of the arp / chords modes")
+    parser.add_argument("--host", default=None,
+                        help=f"Shimon's IP (default {HOST}; with --replay, 127.0.0.1 unless given). "
+                             "127.0.0.1 with ShimonSimulator running tests without the robot")
+    parser.add_argument("--device", type=str, nargs="+", default=["0"],
+                        help="camera index, video file, or directory of images; "
+                             "several = one performer per source, each in its own process")
+    parser.add_argument("--policy", choices=POLICIES, default="any_stop",
+                        help="multi-performer STOP/GO merge (see shimon.coordinator)")
+    parser.add_argument("--tempo", choices=TEMPOS, default="mean",
+                        help="multi-performer bob interval merge")
     parser.add_argument("--width", help='cap width', type=int, default=960)
     parser.add_argument("--height", help='cap height', type=int, default=540)
     parser.add_argument('--use_static_image_mode', action='store_true')
     parser.add_argument("--min_detection_confidence", type=float, default=0.7)
     parser.add_argument("--min_tracking_confidence",  type=float, default=0.5)
     parser.add_argument("--max_hands", type=int, default=2)  # <— multiple hands
-    return parser.parse_args()
-
-# ===================== Hand helpers (indices) =======================
-WRIST = 0
-TH_MCP, TH_IP, TH_TIP = 2, 3, 4
-IX_MCP, IX_PIP, IX_DIP, IX_TIP = 5, 6, 7, 8
-MI_MCP, MI_PIP, MI_DIP, MI_TIP = 9, 10, 11, 12
-RI_MCP, RI_PIP, RI_DIP, RI_TIP = 13, 14, 15, 16
-PI_MCP, PI_PIP, PI_DIP, PI_TIP = 17, 18, 19, 20
-
-# Point-history labels that count as "finger spin"
-SPIN_KEYWORDS = {
-    "spin", "spinning", "circle", "circling",
-    "cw", "clockwise", "ccw", "counterclockwise",
-    "rotate", "rotation"
-}
-
-# Hand-sign labels that count as "Point" (case-insensitive)
-POINT_LABELS = {"point", "pointer", "pointing"}
-
-def _scale_from_points(pts):
-    x, y, w, h = cv.boundingRect(pts.astype(np.int32))
-    return (w**2 + h**2) ** 0.5 + 1e-6
-
-def _pip_angle(pts, mcp, pip, dip):
-    v1 = pts[mcp] - pts[pip]
-    v2 = pts[dip] - pts[pip]
-    a = np.linalg.norm(v1); b = np.linalg.norm(v2)
-    if a == 0 or b == 0: return 180.0
-    cosang = np.clip(np.dot(v1, v2) / (a*b), -1.0, 1.0)
-    return math.degrees(math.acos(cosang))
-
-def _curl_score(pts, mcp, pip, dip):
-    # 0 = straight, 1 = curled (maps PIP angle 180°->0, 60°->1)
-    ang = _pip_angle(pts, mcp, pip, dip)
-    return float(np.clip((180.0 - ang) / 120.0, 0.0, 1.0))
-
-def _others_mostly_folded(pts, tol=0.45):
-    curls = [
-        _curl_score(pts, IX_MCP, IX_PIP, IX_DIP),
-        _curl_score(pts, MI_MCP, MI_PIP, MI_DIP),
-        _curl_score(pts, RI_MCP, RI_PIP, RI_DIP),
-        _curl_score(pts, PI_MCP, PI_PIP, PI_DIP),
-    ]
-    return (sum(c >= tol for c in curls) >= 3) and (np.mean(curls) >= (tol - 0.05))
-
-def _thumb_extended_and_up(pts):
-    v1 = pts[TH_MCP] - pts[TH_IP]
-    v2 = pts[TH_TIP] - pts[TH_IP]
-    a = np.linalg.norm(v1); b = np.linalg.norm(v2)
-    ang = 180.0 if a == 0 or b == 0 else math.degrees(math.acos(np.clip(np.dot(v1, v2)/(a*b), -1.0, 1.0)))
-    dir_vec = pts[TH_TIP] - pts[TH_MCP]
-    n = np.linalg.norm(dir_vec)
-    dir_vec = dir_vec / n if n > 0 else np.array([0.0, 0.0])
-    upness = -dir_vec[1]  # +1 up, -1 down
-    return (ang > 150.0, upness, dir_vec)
-
+    parser.add_argument("--no_overlay", action="store_true",
+                        help="show the raw camera frame without landmarks/HUD")
+    parser.add_argument("--headless", action="store_true",
+                        help="no window/drawing; keys from stdin, SIGUSR1 cycles mode")
+    parser.add_argument("--infer_every", "--infer-every", type=int, default=1,
+                        help="run hands.process on every Nth frame, reuse landmarks between")
+    parser.add_argument("--smooth", action="store_true",
+                        help="One-Euro filter the landmarks per hand before the rules "
+                             "(the 👍 start gate then needs fewer frames)")
+    parser.add_argument("--predict_ms", type=float, default=0.0,
+                        help="with --smooth: extrapolate landmarks this far ahead to offset latency")
+    parser.add_argument("--start_frames", type=int, default=None,
+                        help=f"frames of 👍 to start (default {START_STABLE_FRAMES}, "
+                             f"{SMOOTH_STABLE_FRAMES} with --smooth)")
+    parser.add_argument("--plan_eval", action="store_true",
+                        help="skip the classifiers on frames where no decision depends on them "
+                             "(off by default: check benchmarks/bench_decisions.py first)")
+    parser.add_argument("--history_length", type=int, default=16,
+                        help="point-history / gesture-vote window (the point-history model "
+                             "must be trained on the same length)")
+    parser.add_argument("--classifier_backend", choices=["auto", *BACKENDS], default="auto",
+                        help="classifier runtime (auto: first of numpy/onnx/tflite with a model file)")
+    parser.add_argument("--roi", action="store_true",
+                        help="run MediaPipe on a padded crop around the tracked hands")
+    parser.add_argument("--full_every", type=int, default=15,
+                        help="with --roi: full-frame detection every N inferences")
+    parser.add_argument("--target_fps", type=float, default=None,
+                        help="scale the MediaPipe input resolution to hold this inference rate")
+    parser.add_argument("--max_fps", "--max-fps", type=float, default=None,
+                        help="pace file/directory input at this rate (default: source FPS)")
+    parser.add_argument("--as_fast_as_possible", "--as-fast-as-possible", action="store_true",
+                        help="file/directory input: no pacing and no dropped frames (benchmarking)")
+    parser.add_argument("--metrics_port", type=int, default=0,
+                        help="serve per-stage latency histograms at http://127.0.0.1:PORT/metrics")
+    parser.add_argument("--trace", type=str, default=None,
+                        help="append every stage timing to this JSONL file")
+    parser.add_argument("--record", type=str, default=None,
+                        help="write per-frame landmarks/handedness/timestamps to this file")
+    parser.add_argument("--replay", type=str, default=None,
+                        help="run the gesture logic on a recording instead of the camera")
+    parser.add_argument("--replay_speed", type=float, default=0.0,
+                        help="replay rate (1.0 = real time, 0 = as fast as possible)")
+    parser.add_argument("--log_shards", type=str, default=None,
+                        help="modes k/h: also write training samples as NPZ shards to this directory")
+    return parser.parse_args(argv)
+
+# ===================== Gesture rules =======================
 def is_thumbs_up(landmark_list_xy):
-    pts = np.asarray(landmark_list_xy, dtype=np.float32)
-    s = _scale_from_points(pts)
-    if not _others_mostly_folded(pts, tol=0.45):
-        return False
-    th_ext, upness, dir_vec = _thumb_extended_and_up(pts)
-    if not th_ext:
-        return False
-    vertical_ok = (abs(upness) > 0.35) and (abs(upness) > abs(dir_vec[0]) * 0.8)
-    if not (upness > 0 and vertical_ok):
-        return False
-    knuckle_y = 0.5 * (pts[IX_MCP][1] + pts[PI_MCP][1])
-    margin = 0.06 * s
-    tip_y = pts[TH_TIP][1]
-    return tip_y < (knuckle_y - margin)
-
-def _finger_extended(pts, mcp, pip, dip, tip, thres_deg=160):
-    return _pip_angle(pts, mcp, pip, dip) > thres_deg
+    """Single-hand 👍 check; main() batches all hands through HandGeometry instead."""
+    return bool(HandGeometry.from_hand(landmark_list_xy).thumbs_up()[0])
 
 def is_open_palm(landmark_list_xy):
     """
     Open/Stop ✋: all four non-thumb fingers extended fairly straight,
     and a decent span between index and pinky tips.
     """
-    pts = np.asarray(landmark_list_xy, dtype=np.float32)
-    s = _scale_from_points(pts)
-
-    idx = _finger_extended(pts, IX_MCP, IX_PIP, IX_DIP, IX_TIP)
-    mid = _finger_extended(pts, MI_MCP, MI_PIP, MI_DIP, MI_TIP)
-    rin = _finger_extended(pts, RI_MCP, RI_PIP, RI_DIP, RI_TIP)
-    pin = _finger_extended(pts, PI_MCP, PI_PIP, PI_DIP, PI_TIP)
-
-    if idx and mid and rin and pin:
-        curls = [
-            _curl_score(pts, IX_MCP, IX_PIP, IX_DIP),
-            _curl_score(pts, MI_MCP, MI_PIP, MI_DIP),
-            _curl_score(pts, RI_MCP, RI_PIP, RI_DIP),
-            _curl_score(pts, PI_MCP, PI_PIP, PI_DIP),
-        ]
-        avg_curl = float(np.mean(curls))
-        span = np.linalg.norm(pts[IX_TIP] - pts[PI_TIP]) / s
-        return (avg_curl <= 0.20) and (span >= 0.28)
-    return False
-
-# ===================== Original helpers (unchanged drawing & IO) =====================
+    return bool(HandGeometry.from_hand(landmark_list_xy).open_palm()[0])
+
+# ===================== Original helpers (drawing & IO) =====================
+# Rasterized HUD / label text, reused while the values don't change (render thread only)
+hud_text = TextCache()
+
 def select_mode(key, mode):
     number = -1
     if 48 <= key <= 57:  # 0 ~ 9
@@ -230,138 +145,27 @@ def select_mode(key, mode):
         mode = 2
     return number, mode
 
-def calc_bounding_rect(image, landmarks):
-    image_width, image_height = image.shape[1], image.shape[0]
-    landmark_array = np.empty((0, 2), int)
-    for _, landmark in enumerate(landmarks.landmark):
-        landmark_x = min(int(landmark.x * image_width), image_width - 1)
-        landmark_y = min(int(landmark.y * image_height), image_height - 1)
-        landmark_array = np.append(landmark_array, [np.array((landmark_x, landmark_y))], axis=0)
-    x, y, w, h = cv.boundingRect(landmark_array)
-    return [x, y, x + w, y + h]
-
-def calc_landmark_list(image, landmarks):
-    image_width, image_height = image.shape[1], image.shape[0]
-    landmark_point = []
-    for _, landmark in enumerate(landmarks.landmark):
-        landmark_x = min(int(landmark.x * image_width), image_width - 1)
-        landmark_y = min(int(landmark.y * image_height), image_height - 1)
-        landmark_point.append([landmark_x, landmark_y])
-    return landmark_point
-
-def pre_process_landmark(landmark_list):
-    temp_landmark_list = copy.deepcopy(landmark_list)
-    base_x, base_y = 0, 0
-    for index, landmark_point in enumerate(temp_landmark_list):
-        if index == 0:
-            base_x, base_y = landmark_point[0], landmark_point[1]
-        temp_landmark_list[index][0] = temp_landmark_list[index][0] - base_x
-        temp_landmark_list[index][1] = temp_landmark_list[index][1] - base_y
-    temp_landmark_list = list(itertools.chain.from_iterable(temp_landmark_list))
-    max_value = max(list(map(abs, temp_landmark_list))) or 1.0
-    temp_landmark_list = [n / max_value for n in temp_landmark_list]
-    return temp_landmark_list
-
-def pre_process_point_history(image, point_history):
-    image_width, image_height = image.shape[1], image.shape[0]
-    temp_point_history = copy.deepcopy(point_history)
-    base_x, base_y = 0, 0
-    for index, point in enumerate(temp_point_history):
-        if index == 0:
-            base_x, base_y = point[0], point[1]
-        temp_point_history[index][0] = (temp_point_history[index][0] - base_x) / image_width
-        temp_point_history[index][1] = (temp_point_history[index][1] - base_y) / image_height
-    temp_point_history = list(itertools.chain.from_iterable(temp_point_history))
-    return temp_point_history
-
-def logging_csv(number, mode, landmark_list, point_history_list):
-    if mode == 1 and (0 <= number <= 9):
-        csv_path = 'model/keypoint_classifier/keypoint.csv'
-        with open(csv_path, 'a', newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow([number, *landmark_list])
-    if mode == 2 and (0 <= number <= 9):
-        csv_path = 'model/point_history_classifier/point_history.csv'
-        with open(csv_path, 'a', newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow([number, *point_history_list])
-    return
-
 def draw_landmarks(image, landmark_point):
-    if len(landmark_point) > 0:
-        # Thumb
-        cv.line(image, tuple(landmark_point[2]), tuple(landmark_point[3]), (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[2]), tuple(landmark_point[3]), (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[3]), tuple(landmark_point[4]), (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[3]), tuple(landmark_point[4]), (255, 255, 255), 2)
-        # Index
-        cv.line(image, tuple(landmark_point[5]), tuple(landmark_point[6]), (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[5]), tuple(landmark_point[6]), (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[6]), tuple(landmark_point[7]), (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[6]), tuple(landmark_point[7]), (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[7]), tuple(landmark_point[8]), (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[7]), tuple(landmark_point[8]), (255, 255, 255), 2)
-        # Middle
-        cv.line(image, tuple(landmark_point[9]), tuple(landmark_point[10]), (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[9]), tuple(landmark_point[10]), (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[10]), tuple(landmark_point[11]), (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[10]), tuple(landmark_point[11]), (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[11]), tuple(landmark_point[12]), (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[11]), tuple(landmark_point[12]), (255, 255, 255), 2)
-        # Ring
-        cv.line(image, tuple(landmark_point[13]), tuple(landmark_point[14]), (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[13]), tuple(landmark_point[14]), (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[14]), tuple(landmark_point[15]), (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[14]), tuple(landmark_point[15]), (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[15]), tuple(landmark_point[16]), (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[15]), tuple(landmark_point[16]), (255, 255, 255), 2)
-        # Little
-        cv.line(image, tuple(landmark_point[17]), tuple(landmark_point[18]), (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[17]), tuple(landmark_point[18]), (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[18]), tuple(landmark_point[19]), (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[18]), tuple(landmark_point[19]), (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[19]), tuple(landmark_point[20]), (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[19]), tuple(landmark_point[20]), (255, 255, 255), 2)
-        # Palm
-        cv.line(image, tuple(landmark_point[0]), tuple(landmark_point[1]), (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[0]), tuple(landmark_point[1]), (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[1]), tuple(landmark_point[2]), (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[1]), tuple(landmark_point[2]), (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[2]), tuple(landmark_point[5]), (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[2]), tuple(landmark_point[5]), (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[5]), tuple(landmark_point[9]), (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[5]), tuple(landmark_point[9]), (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[9]), tuple(landmark_point[13]), (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[9]), tuple(landmark_point[13]), (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[13]), tuple(landmark_point[17]), (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[13]), tuple(landmark_point[17]), (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[17]), tuple(landmark_point[0]), (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[17]), tuple(landmark_point[0]), (255, 255, 255), 2)
-
-    for index, landmark in enumerate(landmark_point):
-        r_big = 8 if index in (4, 8, 12, 16, 20) else 5
-        cv.circle(image, (landmark[0], landmark[1]), r_big, (255, 255, 255), -1)
-        cv.circle(image, (landmark[0], landmark[1]), r_big, (0, 0, 0), 1)
-    return image
+    # (21, 2) int array from LandmarkBuffer; bones and joints are batched (see shimon.overlay)
+    return draw_hand(image, landmark_point)
 
 def draw_bounding_rect(use_brect, image, brect):
     if use_brect:
+        brect = [int(v) for v in brect]
         cv.rectangle(image, (brect[0], brect[1]), (brect[2], brect[3]), (0, 0, 0), 1)
     return image
 
-def draw_info_text(image, brect, handedness, hand_sign_text, finger_gesture_text):
+def draw_info_text(image, brect, hand_label, hand_sign_text, finger_gesture_text):
+    brect = [int(v) for v in brect]
     cv.rectangle(image, (brect[0], brect[1]), (brect[2], brect[1] - 22), (0, 0, 0), -1)
-    info_text = handedness.classification[0].label[0:]
+    info_text = hand_label
     if hand_sign_text != "":
         info_text = info_text + ':' + hand_sign_text
-    cv.putText(image, info_text, (brect[0] + 5, brect[1] - 4),
-               cv.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1, cv.LINE_AA)
+    hud_text.put(image, info_text, (brect[0] + 5, brect[1] - 4), 0.6, (255, 255, 255))
 
     if finger_gesture_text != "":
-        cv.putText(image, "Finger Gesture:" + finger_gesture_text, (10, 60),
-                   cv.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 0), 4, cv.LINE_AA)
-        cv.putText(image, "Finger Gesture:" + finger_gesture_text, (10, 60),
-                   cv.FONT_HERSHEY_SIMPLEX, 1.0, (255, 255, 255), 2, cv.LINE_AA)
+        hud_text.put(image, "Finger Gesture:" + finger_gesture_text, (10, 60),
+                     1.0, (255, 255, 255), 2, outline=4)
     return image
 
 def draw_point_history(image, point_history):
@@ -372,260 +176,572 @@ def draw_point_history(image, point_history):
     return image
 
 def draw_info(image, fps, mode, number):
-    cv.putText(image, "FPS:" + str(fps), (10, 30), cv.FONT_HERSHEY_SIMPLEX,
-               1.0, (0, 0, 0), 4, cv.LINE_AA)
-    cv.putText(image, "FPS:" + str(fps), (10, 30), cv.FONT_HERSHEY_SIMPLEX,
-               1.0, (255, 255, 255), 2, cv.LINE_AA)
+    # whole FPS: a handful of distinct strings, each rasterized once by hud_text
+    hud_text.put(image, f"FPS:{fps:.0f}", (10, 30), 1.0, (255, 255, 255), 2, outline=4)
 
     mode_string = ['Logging Key Point', 'Logging Point History']
     if 1 <= mode <= 2:
-        cv.putText(image, "MODE:" + mode_string[mode - 1], (10, 90),
-                   cv.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1,
-                   cv.LINE_AA)
+        hud_text.put(image, "MODE:" + mode_string[mode - 1], (10, 90), 0.6, (255, 255, 255))
         if 0 <= number <= 9:
-            cv.putText(image, "NUM:" + str(number), (10, 110),
-                       cv.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1,
-                       cv.LINE_AA)
+            hud_text.put(image, "NUM:" + str(number), (10, 110), 0.6, (255, 255, 255))
     return image
 
 # ===================== Start Gate =====================
-class StartGate:
+# ===================== Gesture decisions (shared by live + replay) =====================
+class HandView:
+    """Everything the render stage needs to draw one hand."""
+    __slots__ = ("brect", "landmark_list", "hand_label", "sign_text", "gesture_text")
+
+    def __init__(self, brect, landmark_list, hand_label, sign_text, gesture_text):
+        self.brect = brect
+        self.landmark_list = landmark_list
+        self.hand_label = hand_label
+        self.sign_text = sign_text
+        self.gesture_text = gesture_text
+
+
+class FrameAnalysis:
+    """Output of the inference stage for one frame."""
+    __slots__ = ("frame", "hands", "status", "trails")
+
+    def __init__(self, frame, hands, status, trails):
+        self.frame = frame
+        self.hands = hands      # list[HandView]
+        self.status = status    # [(text, color), ...] from the controllers
+        self.trails = trails    # point-history snapshots for drawing
+
+
+def load_labels():
+    """Keypoint and point-history labels (read once per process, see shimon.backends)."""
+    return load_model_labels("keypoint"), load_model_labels("point_history")
+
+
+def load_classifiers(args):
+    """Both classifiers on --classifier_backend, batched for --max_hands."""
+    batch = max(1, args.max_hands)
+    return tuple(BatchClassifier(load_classifier(kind, args.classifier_backend), max_batch=batch)
+                 for kind in ("keypoint", "point_history"))
+
+
+def open_hands(args, timer=None):
     """
-    Arms on pause/launch. Requires a stable 👍 for N frames to fire once.
+    MediaPipe Hands behind RoiInference (convert, --roi crop, --target_fps scale).
+    With --roi, crops get a second Hands so neither one's tracking sees the
+    input switch between crop and full frame (see shimon.roi).
     """
-    def __init__(self, stable_frames=START_STABLE_FRAMES):
-        self.stable_needed = int(max(1, stable_frames))
-        self.stable = 0
-        self.armed = True
+    import mediapipe as mp  # only where MediaPipe actually runs
+
+    def hands():
+        return mp.solutions.hands.Hands(
+            static_image_mode=args.use_static_image_mode,
+            max_num_hands=max(1, args.max_hands),
+            min_detection_confidence=args.min_detection_confidence,
+            min_tracking_confidence=args.min_tracking_confidence,
+        )
+    return RoiInference(hands(), crop_hands=hands() if args.roi else None, use_roi=args.roi,
+                        full_every=args.full_every, target_fps=args.target_fps, timer=timer)
+
 
-    def reset_and_arm(self):
-        self.stable = 0
-        self.armed = True
+def control_options(args):
+    """GestureControl kwargs for --smooth / --predict_ms / --start_frames / --plan_eval."""
+    smoothing = LandmarkFilter(lead=args.predict_ms / 1000.0) if args.smooth else None
+    start_frames = args.start_frames
+    if start_frames is None:
+        start_frames = SMOOTH_STABLE_FRAMES if args.smooth else START_STABLE_FRAMES
+    return {"smoothing": smoothing, "start_frames": start_frames, "plan": args.plan_eval}
 
-    def disarm(self):
-        self.armed = False
-        self.stable = 0
 
-    def update(self, thumbs_now: bool) -> bool:
+class GestureControl:
+    """
+    Per-frame gesture logic, independent of where landmarks come from: the
+    shared GestureEngine (classifiers, rule detectors), then every controller.
+    `bob` gets a HeadBobControl in front of `controllers`; pass None to run
+    only the other modes.
+    Fill self.landmarks (live MediaPipe or a recording), then call step().
+    """
+    def __init__(self, bob, keypoint_classifier, point_history_classifier,
+                 keypoint_classifier_labels, point_history_classifier_labels,
+                 max_hands=2, history_length=16, timer=None, collect_views=True,
+                 on_start=on_start_playback, events=None, datalog=None, controllers=(),
+                 smoothing=None, start_frames=START_STABLE_FRAMES, plan=False):
+        self.timer = timer or StageTimer()
+        self.bob = bob
+        self.head = HeadBobControl(bob, on_start, start_frames) if bob is not None else None
+        self.controllers = ([self.head] if self.head is not None else []) + list(controllers)
+        # plan=False (default): both classifiers on every frame, whatever the controllers
+        # need. The planner's bookkeeping costs about what it saves on these small models
+        self.planner = EvaluationPlanner(self.controllers, extra=self._edge_stages) if plan else None
+        self.engine = GestureEngine(keypoint_classifier, point_history_classifier,
+                                    keypoint_classifier_labels, point_history_classifier_labels,
+                                    max_hands=max_hands, history_length=history_length,
+                                    timer=self.timer, datalog=datalog, smoothing=smoothing,
+                                    planner=self.planner)
+        self.landmarks = self.engine.landmarks
+        self.tracker = self.engine.tracker
+        self.collect_views = collect_views
+        # optional EventBus: thumbs-up / spin edges are published for other actuators
+        self.events = events
+        self._last_thumbs = False
+        self._last_spin = None
+
+    @property
+    def start_gate(self):
+        return self.head.start_gate if self.head is not None else None
+
+    def request_sample(self, mode, number):
+        """Log the next frame's features under label `number` (any thread; see select_mode)."""
+        self.engine.request_sample(mode, number)
+
+    def step(self, hand_labels, image_width, image_height, now, t_frame=None):
         """
-        Returns True exactly once when a stable thumbs-up is achieved while armed.
+        Decide on the hands currently in self.landmarks. Returns a FrameAnalysis.
+        t_frame: perf_counter capture time of a live frame, for gesture -> OSC latency.
         """
-        if not self.armed:
-            self.stable = 0
-            return False
-
-        if thumbs_now:
-            self.stable += 1
-            if self.stable >= self.stable_needed:
-                self.disarm()
-                return True
-        else:
-            # decay quickly to avoid accidental holds
-            self.stable = max(0, self.stable - 2)
-        return False
-
-# ===================== Main (MULTI-HAND) =====================
-def main():
-    args = get_args()
-    cap = cv.VideoCapture(args.device)
-    cap.set(cv.CAP_PROP_FRAME_WIDTH, args.width)
-    cap.set(cv.CAP_PROP_FRAME_HEIGHT, args.height)
-
-    # MediaPipe Hands with multiple hands
-    mp_hands = mp.solutions.hands
-    hands = mp_hands.Hands(
-        static_image_mode=args.use_static_image_mode,
-        max_num_hands=max(1, args.max_hands),
-        min_detection_confidence=args.min_detection_confidence,
-        min_tracking_confidence=args.min_tracking_confidence,
-    )
-
-    keypoint_classifier = KeyPointClassifier()
-    point_history_classifier = PointHistoryClassifier()
+        gestures = self.engine.perceive(hand_labels, image_width, image_height, now)
+
+        t_control = time.perf_counter()
+        if self.events is not None:
+            self._publish_edges(gestures.thumbs_up_any, gestures.spin, t_frame)
+        status = []
+        for controller in self.controllers:
+            line = controller.update(gestures, now, t_frame)
+            if line is not None:
+                status.append(line)
+        self.timer.add("control", time.perf_counter() - t_control)
+
+        views = []
+        trails = None
+        if self.collect_views:
+            for i in range(gestures.n):
+                if gestures.open_palm[i]:
+                    hand_sign_text_draw = "Open Hand"
+                elif gestures.thumbs_up[i]:
+                    hand_sign_text_draw = "Thumbs Up"
+                elif gestures.thumbs_down[i]:
+                    hand_sign_text_draw = "Thumbs Down"
+                else:
+                    hand_sign_text_draw = gestures.signs[i]
+                track = gestures.tracks[i]
+                # the render thread gets its own copy; the buffer is refilled next frame
+                views.append(HandView(gestures.brects[i].copy(), gestures.landmarks[i].copy(),
+                                      f"{track.label} #{track.id}",
+                                      hand_sign_text_draw, gestures.gestures[i]))
+            trails = [track.points.view().tolist() for track in self.tracker.tracks]
+        return FrameAnalysis(None, views, status, trails)
+
+    def hud(self):
+        """HUD lines from every controller (render thread)."""
+        return [line for controller in self.controllers for line in controller.hud()]
+
+    def close(self):
+        for controller in self.controllers:
+            if controller is not self.head:
+                controller.close()
+
+    def skip_report(self):
+        return self.planner.report() if self.planner is not None else ""
+
+    def _edge_stages(self):
+        # spin edges go on the bus only if someone listens for them
+        if self.events is not None and (self.events.subscribed(SPIN_CW) or self.events.subscribed(SPIN_CCW)):
+            return ALL_STAGES
+        return NO_STAGES
+
+    def _publish_edges(self, thumbs, spin, t_frame):
+        """Publish thumbs-up / spin when they start, not on every frame they last."""
+        if thumbs and not self._last_thumbs:
+            self.events.publish(THUMBS_UP, t=t_frame)
+        self._last_thumbs = thumbs
+        if spin and spin != self._last_spin:
+            ccw = "ccw" in spin or "counter" in spin
+            self.events.publish(SPIN_CCW if ccw else SPIN_CW, t=t_frame, label=spin)
+        self._last_spin = spin or None
+
+
+# ===================== Replay (no camera, no MediaPipe) =====================
+def run_replay(args, control):
+    """
+    Feed a landmark recording through GestureControl. --replay_speed 0 runs as
+    fast as possible (decision-logic benchmark); 1.0 replays in real time.
+    """
+    recording = LandmarkRecording(args.replay)
+    frames = recording.frames
+    print(f"[Replay] {args.replay}: {len(recording)} frames, {recording.duration:.1f}s, "
+          f"{recording.width}x{recording.height}, OSC -> {args.host}")
+    t_start = time.perf_counter()
+    for i in range(len(frames)):
+        rec = frames[i]
+        n = int(rec["n"])
+        if args.replay_speed > 0:
+            wait = rec["t"] / args.replay_speed - (time.perf_counter() - t_start)
+            if wait > 0:
+                time.sleep(wait)
+        control.landmarks.fill_array(rec["lm"][:n])
+        control.step(recording.labels(i), recording.width, recording.height, float(rec["t"]))
+    elapsed = time.perf_counter() - t_start
+    print(f"[Replay] {len(frames)} frames in {elapsed:.3f}s "
+          f"({len(frames) / max(elapsed, 1e-9):.0f} frames/s)  {control.timer.report()}  "
+          f"{control.skip_report()}")
+
+
+# ===================== Multi-performer (one process per source) =====================
+def run_performer(performer, device, args, decisions, halt):
+    """
+    Worker process: one source with its own MediaPipe Hands and GestureControl.
+    Decisions go to the coordinator instead of OSC (see shimon.coordinator).
+    """
+    keypoint_classifier, point_history_classifier = load_classifiers(args)
+    keypoint_classifier_labels, point_history_classifier_labels = load_labels()
+    vote = VoteBob(interval=1.0, interval_min=INTERVAL_MIN, interval_max=INTERVAL_MAX)
+    control = GestureControl(vote, keypoint_classifier, point_history_classifier,
+                             keypoint_classifier_labels, point_history_classifier_labels,
+                             max_hands=args.max_hands, history_length=args.history_length,
+                             collect_views=False, on_start=lambda: None, **control_options(args))
+
+    cap = open_source(device, args.width, args.height,
+                      max_fps=args.max_fps, as_fast_as_possible=args.as_fast_as_possible)
+    front = open_hands(args)
+    inferred = None
+    frames = 0
+    try:
+        while not halt.is_set():
+            t_frame = time.perf_counter()
+            ret, image = cap.read()
+            if not ret:
+                break
+            image = cv.flip(image, 1)
+            fresh = inferred is None or frames % args.infer_every == 0
+            if fresh:
+                inferred = front.process(image)
+            results, roi = inferred
+            frames += 1
+
+            n_hands = control.landmarks.fill(results.multi_hand_landmarks, roi=roi)
+            handedness = results.multi_handedness[:n_hands] if n_hands else []
+            hand_labels = [h.classification[0].label for h in handedness]
+            if fresh:
+                front.observe(control.landmarks.norm[:n_hands],
+                              [h.classification[0].score for h in handedness])
+            control.step(hand_labels, image.shape[1], image.shape[0], t_frame, t_frame=t_frame)
+            decisions.put((performer, t_frame, vote.take(), vote.running, vote.interval))
+    finally:
+        decisions.put((performer, None, None, False, 0.0))
+        front.close()
+        cap.release()
+        print(f"[Performer {performer}] {frames} frames from {device}")
 
-    # Labels
-    with open('model/keypoint_classifier/keypoint_classifier_label.csv', encoding='utf-8-sig') as f:
-        keypoint_classifier_labels = [row[0] for row in csv.reader(f)]
-    with open('model/point_history_classifier/point_history_classifier_label.csv', encoding='utf-8-sig') as f:
-        point_history_classifier_labels = [row[0] for row in csv.reader(f)]
 
-    cvFpsCalc = CvFpsCalc(buffer_len=10)
+def run_multi(args, bob, timer):
+    """
+    One worker process per --device; this process is the coordinator and owns
+    the only OSC output. Keys come from stdin (there is no preview window).
+    """
+    ctx = multiprocessing.get_context("spawn")  # no fork of a process holding threads / MediaPipe
+    decisions = ctx.Queue()
+    halt = ctx.Event()
+    workers = [ctx.Process(target=run_performer, args=(i, device, args, decisions, halt),
+                           name=f"performer-{i}", daemon=True)
+               for i, device in enumerate(args.device)]
+    coordinator = Coordinator(bob, policy=args.policy, tempo=args.tempo)
+    keys = StdinKeys()
+    for w in workers:
+        w.start()
+    print(f"[Multi] {len(workers)} performers, policy={args.policy}, tempo={args.tempo}")
+
+    finished = 0
+    last_report = time.perf_counter()
+    try:
+        while finished < len(workers):
+            if (keys.poll() & 0xFF) in (27, ord('q'), ord('Q')):
+                break
+            try:
+                msg = decisions.get(timeout=0.05)
+            except queue.Empty:
+                if not any(w.is_alive() for w in workers):
+                    break
+                continue
+            t0 = time.perf_counter()
+            while True:
+                if msg[1] is None:
+                    finished += 1
+                coordinator.update(*msg)
+                try:
+                    msg = decisions.get_nowait()
+                except queue.Empty:
+                    break
+            if coordinator.apply():
+                on_start_playback()
+            timer.add("coordinate", time.perf_counter() - t0)
+
+            now = time.perf_counter()
+            if now - last_report >= 5.0:
+                last_report = now
+                state = "ON" if coordinator.running else "PAUSED"
+                print(f"[Multi] active:{len(coordinator.active())}/{len(workers)} "
+                      f"messages:{coordinator.messages} bob:{state} "
+                      f"interval:{bob.interval:.2f}s  {timer.report()}")
+    finally:
+        halt.set()
+        for w in workers:
+            w.join(timeout=2.0)
+            if w.is_alive():
+                w.terminate()
+
+
+def close_metrics(metrics, server):
+    if server is not None:
+        server.close()
+    if metrics is not None:
+        metrics.close()
+        print("[Metrics] p50/p99 per stage (bucket bounds): " + "  ".join(
+            f"{stage}:{p50 * 1000:g}/{p99 * 1000:g}ms"
+            for stage, (p50, p99, n) in metrics.summary().items() if n))
+
+
+# ===================== Main (MULTI-HAND, pipelined) =====================
+def build_controllers(args, bus):
+    """The music modes from --controllers (the head bob is GestureControl's own)."""
+    controllers = []
+    if "arp" in args.controllers:
+        controllers.append(arpeggio_control(bus, args.host, MUSIC_PORT, OSC_ARM_PATH, bpm=args.bpm))
+    if "chords" in args.controllers:
+        controllers.append(chord_control(bus, args.host, MUSIC_PORT, OSC_ARM_PATH, bpm=args.bpm))
+    return controllers
+
+
+def main(argv=None):
+    args = get_args(argv)
+    if len(args.device) > 1 and args.controllers != ["bob"]:
+        raise SystemExit("several --device sources (multi-performer) only drive the head bob")
+    if args.headless:
+        args.no_overlay = True
+    args.infer_every = max(1, args.infer_every)
+    if args.host is None:
+        # an offline replay only reaches the robot when asked to
+        args.host = LOOPBACK if args.replay else HOST
+
+    # --metrics_port / --trace: histograms of every timer stage
+    metrics = Metrics(trace_path=args.trace) if (args.metrics_port or args.trace) else None
+    timer = StageTimer(window=60, metrics=metrics)
 
-    history_length = 16
-    point_histories = {"Left": deque(maxlen=history_length), "Right": deque(maxlen=history_length)}
-    finger_gesture_histories = {"Left": deque(maxlen=history_length), "Right": deque(maxlen=history_length)}
+    # Start bobbing paused, interval mid-tempo
+    # one asyncio loop thread for actuators; vision publishes gesture events into it
+    bus = EventBus().start()
+    bob = None
+    if "bob" in args.controllers:
+        bob = HeadBobber(bus, host=args.host, port=PORT, path=OSC_PATH,
+                         up=UP_ANGLE, down=DOWN_ANGLE, speed=SPEED, interval=1.0, timer=timer)
+    metrics_server = None
+    if metrics is not None:
+        if bob is not None:
+            metrics.gauge("bob_running", lambda: bob.running, "1 while the head is bobbing")
+            metrics.gauge("bob_interval_seconds", lambda: bob.interval)
+            for name in ("sent", "coalesced", "rate_limited", "dropped"):
+                metrics.gauge(f"osc_{name}_total", lambda name=name: getattr(bob.osc, name))
+        if args.metrics_port:
+            metrics_server = MetricsServer(metrics, args.metrics_port)
+            print(f"[Metrics] http://127.0.0.1:{metrics_server.port}/metrics")
+
+    if len(args.device) > 1:
+        try:
+            run_multi(args, bob, timer)
+        finally:
+            bob.shutdown()
+            bus.stop()
+            close_metrics(metrics, metrics_server)
+        return
+
+    # one invoke per frame for all hands
+    keypoint_classifier, point_history_classifier = load_classifiers(args)
 
-    mode = 0
+    # Labels
+    keypoint_classifier_labels, point_history_classifier_labels = load_labels()
+
+    # modes k/h: samples are queued here and written by a background thread
+    datalog = TrainingLogger(shard_dir=args.log_shards)
+    # every mode shares the one perception pass (see shimon.gestures)
+    control = GestureControl(bob, keypoint_classifier, point_history_classifier,
+                             keypoint_classifier_labels, point_history_classifier_labels,
+                             max_hands=args.max_hands, history_length=args.history_length, timer=timer,
+                             collect_views=not args.no_overlay, events=bus, datalog=datalog,
+                             controllers=build_controllers(args, bus), **control_options(args))
+
+    if args.replay:
+        try:
+            run_replay(args, control)
+        finally:
+            if bob is not None:
+                bob.shutdown()
+            control.close()
+            bus.stop()
+            datalog.close()
+            close_metrics(metrics, metrics_server)
+        return
+
+    cap = open_source(args.device[0], args.width, args.height,
+                      max_fps=args.max_fps, as_fast_as_possible=args.as_fast_as_possible)
 
-    # Start bobbing paused, interval mid-tempo
-    bob = HeadBobber(host=HOST, port=PORT, path=OSC_PATH,
-                     up=UP_ANGLE, down=DOWN_ANGLE, speed=SPEED, interval=1.0)
+    cvFpsCalc = CvFpsCalc(buffer_len=10)
+    # --record: opened on the first frame, once the real frame size is known
+    recorder = [None]
 
-    # >>> Start gate (await thumbs-up)
-    start_gate = StartGate(stable_frames=START_STABLE_FRAMES)
+    # MediaPipe Hands (imported in open_hands: replay never needs it); --roi crops around
+    # tracked hands, --target_fps scales the input
+    front = open_hands(args, timer=timer)
+    # --infer_every: [frames processed, (last MediaPipe results, their roi)]
+    infer_state = [0, None]
 
-    # timebase for ramp
-    last_t = time.time()
+    mode = 0
 
+    def analyze(frame):
+        """Inference stage: MediaPipe, then GestureControl (classifiers, STOP/GO, OSC)."""
+        image = frame.image
+
+        fresh = infer_state[0] % args.infer_every == 0 or infer_state[1] is None
+        if fresh:
+            infer_state[1] = front.process(image)
+        # else: skipped frame, carry the last landmarks forward
+        results, roi = infer_state[1]
+        infer_state[0] += 1
+
+        # landmarks -> reused (max_hands, 21, 3) full-frame buffer, no per-landmark lists
+        n_hands = control.landmarks.fill(results.multi_hand_landmarks, roi=roi)
+        handedness = results.multi_handedness[:n_hands] if n_hands else []
+        hand_labels = [h.classification[0].label for h in handedness]
+        scores = [h.classification[0].score for h in handedness]
+        if fresh:
+            front.observe(control.landmarks.norm[:n_hands], scores)
+        if args.record:
+            if recorder[0] is None:
+                recorder[0] = LandmarkRecorder(args.record, args.max_hands,
+                                               image.shape[1], image.shape[0])
+            recorder[0].write(frame.t_capture, control.landmarks, hand_labels, scores)
+
+        analysis = control.step(hand_labels, image.shape[1], image.shape[0], frame.t_capture,
+                                t_frame=frame.t_capture)
+        analysis.frame = frame
+        return analysis
+
+    def render(analysis, fps, mode, number):
+        """Render stage: all drawing happens here, off the inference thread."""
+        # Inference is finished with this frame once its analysis is published,
+        # so the overlay is drawn straight onto it instead of onto a copy.
+        debug_image = analysis.frame.image
+        if args.no_overlay:
+            return debug_image
+
+        for view in analysis.hands:
+            debug_image = draw_bounding_rect(True, debug_image, view.brect)
+            debug_image = draw_landmarks(debug_image, view.landmark_list)
+            debug_image = draw_info_text(
+                debug_image, view.brect, view.hand_label, view.sign_text, view.gesture_text
+            )
+
+        # one status line per controller that has something to say this frame
+        y = 120
+        for text, color in analysis.status:
+            hud_text.put(debug_image, text, (10, y), 0.8, color, 2)
+            y += 30
+
+        # HUD
+        debug_image = draw_info(debug_image, fps, mode, number)
+        y = max(y, 150)
+        for text, color in control.hud():
+            hud_text.put(debug_image, text, (10, y), 0.7, color, 1, outline=3)
+            y += 25
+        # changes every frame: drawn directly rather than churning the cache
+        cv.putText(debug_image, timer.report(), (10, debug_image.shape[0] - 10),
+                   cv.FONT_HERSHEY_SIMPLEX, 0.45, (255, 255, 255), 1, cv.LINE_AA)
+
+        # Trails
+        for trail in analysis.trails:
+            debug_image = draw_point_history(debug_image, trail)
+        return debug_image
+
+    # capture -> [frames] -> inference -> [analyses] -> render/display (this thread)
+    frames = LatestSlot("frames")
+    analyses = LatestSlot("analyses")
+    capture = CaptureThread(cap, frames, timer=timer, drop_frames=not args.as_fast_as_possible)
+    inference = WorkerThread("inference", analyze, frames, analyses)
+    keys = StdinKeys() if args.headless else None
+    if metrics is not None:
+        metrics.gauge("frames_dropped_total", lambda: frames.dropped, "frames overwritten before inference")
+        metrics.gauge("analyses_dropped_total", lambda: analyses.dropped, "analyses overwritten before render")
+        metrics.gauge("frames_processed_total", lambda: analyses.delivered)
+        planner = control.planner
+        if planner is not None:
+            metrics.gauge("planned_hands_total", lambda: planner.hands, "hands seen by the evaluation planner")
+            for stage in planner.skipped:
+                metrics.gauge(f"{stage}_skipped_total", lambda stage=stage: planner.skipped[stage],
+                              "hands this classifier was skipped for (no decision depended on it)")
+    capture.start()
+    inference.start()
+
+    last_report = t_start = time.perf_counter()
     try:
         while True:
-            fps = cvFpsCalc.get()
-
-            # Quit on q/ESC
-            key = cv.waitKey(1) & 0xFF
+            # Quit on q/ESC (waitKey also pumps the HighGUI event loop)
+            key = (keys.poll() if args.headless else cv.waitKey(1)) & 0xFF
             if key in (27, ord('q'), ord('Q')):
                 break
             number, mode = select_mode(key, mode)
+            if 1 <= mode <= 2 and 0 <= number <= 9:
+                control.request_sample(mode, number)
 
-            ret, image = cap.read()
-            if not ret:
-                break
-            image = cv.flip(image, 1)
-            debug_image = copy.deepcopy(image)
-
-            rgb = cv.cvtColor(image, cv.COLOR_BGR2RGB)
-            rgb.flags.writeable = False
-            results = hands.process(rgb)
-            rgb.flags.writeable = True
-
-            # per-frame aggregate decisions
-            want_stop = False
-            want_go = False
-            saw_point_any = False
-            saw_spin_any = False
-            thumbs_now_any = False  # >>> for start gate
-
-            # track which hands were seen this frame
-            seen_hands = set()
-
-            if results.multi_hand_landmarks is not None:
-                for hand_landmarks, handedness in zip(results.multi_hand_landmarks,
-                                                      results.multi_handedness):
-                    hand_label = handedness.classification[0].label  # "Left" or "Right"
-                    seen_hands.add(hand_label)
-                    # Ensure deques exist for this label (safety)
-                    if hand_label not in point_histories:
-                        point_histories[hand_label] = deque(maxlen=history_length)
-                    if hand_label not in finger_gesture_histories:
-                        finger_gesture_histories[hand_label] = deque(maxlen=history_length)
-
-                    brect = calc_bounding_rect(debug_image, hand_landmarks)
-                    landmark_list = calc_landmark_list(debug_image, hand_landmarks)
-
-                    pre_processed_landmark_list = pre_process_landmark(landmark_list)
-
-                    # Hand sign classification (static)
-                    hand_sign_id = keypoint_classifier(pre_processed_landmark_list)
-                    hand_sign_text = keypoint_classifier_labels[hand_sign_id]
-
-                    # Maintain PER-HAND point history (index tip if "Point" id==2)
-                    if hand_sign_id == 2:
-                        point_histories[hand_label].append(landmark_list[8])
-                    else:
-                        point_histories[hand_label].append([0, 0])
-
-                    # Build preprocessed point history FOR THIS HAND
-                    pre_processed_point_history_list = pre_process_point_history(
-                        debug_image, point_histories[hand_label]
-                    )
-
-                    # Finger gesture classification (temporal) per hand
-                    finger_gesture_id = 0
-                    if len(pre_processed_point_history_list) == (history_length * 2):
-                        finger_gesture_id = point_history_classifier(pre_processed_point_history_list)
-                    finger_gesture_histories[hand_label].append(finger_gesture_id)
-                    most_common_fg_id = Counter(finger_gesture_histories[hand_label]).most_common()
-                    finger_gesture_text = point_history_classifier_labels[most_common_fg_id[0][0]]
-
-                    # Aggregate decisions
-                    if hand_sign_text.strip().lower() in POINT_LABELS:
-                        saw_point_any = True
-                    if finger_gesture_text.strip().lower() in SPIN_KEYWORDS:
-                        saw_spin_any = True
-
-                    # Draw for this hand
-                    debug_image = draw_bounding_rect(True, debug_image, brect)
-                    debug_image = draw_landmarks(debug_image, landmark_list)
-
-                    # STOP/GO from this hand
-                    if is_open_palm(landmark_list):
-                        hand_sign_text_draw = "Open Hand"
-                        want_stop = True
-                    elif is_thumbs_up(landmark_list):
-                        hand_sign_text_draw = "Thumbs Up"
-                        thumbs_now_any = True          # >>> feed start gate
-                        if not start_gate.armed:
-                            # Only acts as "GO" when not awaiting start
-                            want_go = True
-                    else:
-                        hand_sign_text_draw = hand_sign_text
-
-                    debug_image = draw_info_text(
-                        debug_image, brect, handedness, hand_sign_text_draw, finger_gesture_text
-                    )
-
-            # For any hand NOT seen this frame, keep timeline moving with [0,0]
-            for hand_label in ("Left", "Right"):
-                if hand_label not in seen_hands:
-                    point_histories[hand_label].append([0, 0])
-
-            # >>> START GATE: while armed, ignore other GO signals and wait for stable 👍
-            if start_gate.armed:
-                triggered = start_gate.update(thumbs_now_any)
-                if triggered:
-                    on_start_playback()   # call your music start
-                    bob.resume()          # and start bobbing
-                # Status overlay
-                need = max(0, start_gate.stable_needed - start_gate.stable)
-                cv.putText(debug_image, f"Awaiting 👍 to start ({need} frames)",
-                           (10, 120), cv.FONT_HERSHEY_SIMPLEX, 0.8, (0, 200, 255), 2, cv.LINE_AA)
-            else:
-                # Apply control: STOP has priority over GO when not awaiting start
-                if want_stop:
-                    bob.pause()
-                    start_gate.reset_and_arm()  # >>> require another 👍 after stop
-                    cv.putText(debug_image, "SHIMON: STOP (re-armed)", (10, 120),
-                               cv.FONT_HERSHEY_SIMPLEX, 0.8, (0,0,255), 2, cv.LINE_AA)
-                elif want_go or saw_spin_any:
-                    bob.resume()
-                    msg = "SHIMON: GO"
-                    if saw_spin_any:
-                        msg += " (Spin)"
-                    cv.putText(debug_image, msg, (10, 120),
-                               cv.FONT_HERSHEY_SIMPLEX, 0.8, (0,255,0), 2, cv.LINE_AA)
-
-            # Smoothly ramp the interval (Point from ANY hand speeds up)
-            now = time.time()
-            dt = max(0.0, now - last_t)
-            last_t = now
-
-            if (not start_gate.armed) and (saw_point_any or saw_spin_any):
-                bob.nudge_interval(-RAMP_FASTER_PER_S * dt)  # faster (shorter)
-            elif not start_gate.armed:
-                bob.nudge_interval(+RAMP_SLOWER_PER_S * dt)  # slower (longer)
-
-            # HUD
-            debug_image = draw_info(debug_image, fps, mode, number)
-            state = "ON" if bob.running else "PAUSED"
-            cv.putText(debug_image, f"Bobbing: {state}", (10, 150),
-                       cv.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 3, cv.LINE_AA)
-            cv.putText(debug_image, f"Bobbing: {state}", (10, 150),
-                       cv.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 1, cv.LINE_AA)
-            cv.putText(debug_image, f"Interval: {bob.interval:.2f}s", (10, 175),
-                       cv.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 3, cv.LINE_AA)
-            cv.putText(debug_image, f"Interval: {bob.interval:.2f}s", (10, 175),
-                       cv.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 1, cv.LINE_AA)
-
-            # Trails
-            debug_image = draw_point_history(debug_image, point_histories["Left"])
-            debug_image = draw_point_history(debug_image, point_histories["Right"])
-
-            cv.imshow('Hand Gesture Recognition + Shimon Control (Multi-hand + Thumbs-Up Start)', debug_image)
+            analysis = analyses.get(timeout=0.05)
+            if analysis is None:
+                if analyses.closed:
+                    break
+                continue
+
+            fps = cvFpsCalc.get()
+            if args.headless:
+                timer.add("end_to_end", time.perf_counter() - analysis.frame.t_capture)
+                now = time.perf_counter()
+                if now - last_report >= 5.0:
+                    last_report = now
+                    hud = "  ".join(text for text, _ in control.hud())
+                    print(f"[Headless] FPS:{fps} mode:{mode} {hud}  {timer.report()}  {control.skip_report()}")
+                continue
+
+            with timer.stage("render"):
+                debug_image = render(analysis, fps, mode, number)
+            with timer.stage("display"):
+                cv.imshow('Hand Gesture Recognition + Shimon Control (Multi-hand + Thumbs-Up Start)', debug_image)
+            timer.add("end_to_end", time.perf_counter() - analysis.frame.t_capture)
+
+            now = time.perf_counter()
+            if now - last_report >= 5.0:
+                last_report = now
+                print(f"[Pipeline] {timer.report()}  dropped(frames={frames.dropped}, "
+                      f"analyses={analyses.dropped})  {control.skip_report()}")
 
     finally:
-        bob.shutdown()
+        capture.stop()
+        inference.stop()
+        capture.join(timeout=1.0)
+        inference.join(timeout=1.0)
+        elapsed = time.perf_counter() - t_start
+        print(f"[Pipeline] {analyses.delivered} frames in {elapsed:.1f}s "
+              f"({analyses.delivered / max(elapsed, 1e-9):.1f} FPS)  {timer.report()}  "
+              f"dropped(frames={frames.dropped}, analyses={analyses.dropped})  {control.skip_report()}")
+        if args.roi or args.target_fps:
+            print(f"[ROI] {front.stats()}")
+        front.close()
+        if bob is not None:
+            bob.shutdown()
+        control.close()
+        bus.stop()
+        if recorder[0] is not None:
+            recorder[0].close()
+            print(f"[Record] {recorder[0].frames} frames -> {recorder[0].path}")
+        datalog.close()
+        if datalog.logged:
+            print(f"[Datalog] {datalog.stats()}")
         cap.release()
-        cv.destroyAllWindows()
+        close_metrics(metrics, metrics_server)
+        if not args.headless:
+            cv.destroyAllWindows()
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+tracemalloc check that the steady-state preprocessing path does not allocate.
+
+    python benchmarks/bench_alloc.py --frames 2000
+
+Runs pre_process_landmark + PointHistory + pre_process_point_history on reused
+buffers for N frames after a warm-up, and compares traced memory growth and
+peak against the legacy deepcopy/itertools list versions. Exits non-zero if
+the array path retains or peaks above --budget bytes. What remains is a few
+transient numpy view / scalar objects; a single frame copy would be ~1.5 MB.
+"""
+import argparse
+import copy
+import itertools
+import os
+import sys
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shimon.preprocessing import (PointHistory, pre_process_landmark, pre_process_point_history,
+                                  landmark_feature_buffer, point_history_feature_buffer)
+
+
+# ===================== Legacy list versions (before) =====================
+def legacy_pre_process_landmark(landmark_list):
+    temp_landmark_list = copy.deepcopy(landmark_list)
+    base_x, base_y = 0, 0
+    for index, landmark_point in enumerate(temp_landmark_list):
+        if index == 0:
+            base_x, base_y = landmark_point[0], landmark_point[1]
+        temp_landmark_list[index][0] = temp_landmark_list[index][0] - base_x
+        temp_landmark_list[index][1] = temp_landmark_list[index][1] - base_y
+    temp_landmark_list = list(itertools.chain.from_iterable(temp_landmark_list))
+    max_value = max(list(map(abs, temp_landmark_list))) or 1.0
+    return [n / max_value for n in temp_landmark_list]
+
+def legacy_pre_process_point_history(image_width, image_height, point_history):
+    temp_point_history = copy.deepcopy(point_history)
+    base_x, base_y = 0, 0
+    for index, point in enumerate(temp_point_history):
+        if index == 0:
+            base_x, base_y = point[0], point[1]
+        temp_point_history[index][0] = (temp_point_history[index][0] - base_x) / image_width
+        temp_point_history[index][1] = (temp_point_history[index][1] - base_y) / image_height
+    return list(itertools.chain.from_iterable(temp_point_history))
+
+
+def measure(step, frames, warmup=50):
+    """Returns (net bytes retained, peak bytes above baseline) over `frames` calls."""
+    for i in range(warmup):
+        step(i)
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    for i in range(frames):
+        step(i)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current - base, peak - base
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--frames", type=int, default=2000)
+    p.add_argument("--history", type=int, default=16)
+    p.add_argument("--budget", type=int, default=4096)
+    args = p.parse_args()
+
+    width, height = 960, 540
+    rng = np.random.default_rng(0)
+    hands = rng.integers(0, 540, size=(64, 21, 2)).astype(np.int32)
+    hands_lists = hands.tolist()
+
+    # ---- after: reused arrays ----
+    features = landmark_feature_buffer()
+    history = PointHistory(args.history)
+    history_features = point_history_feature_buffer(args.history)
+    size = np.array((width, height), dtype=np.float32)
+
+    def step_array(i):
+        pts = hands[i % 64]
+        pre_process_landmark(pts, out=features)
+        history.append(pts[8, 0], pts[8, 1])
+        pre_process_point_history(history, width, height, out=history_features, size=size)
+
+    # ---- before: deepcopy + lists ----
+    from collections import deque
+    legacy_history = deque(maxlen=args.history)
+
+    def step_legacy(i):
+        pts = hands_lists[i % 64]
+        legacy_pre_process_landmark(pts)
+        legacy_history.append(pts[8])
+        legacy_pre_process_point_history(width, height, legacy_history)
+
+    # same numbers as before
+    for i in range(64):
+        step_array(i)
+        step_legacy(i)
+    assert np.allclose(features, legacy_pre_process_landmark(hands_lists[63]), atol=1e-6)
+    assert np.allclose(pre_process_point_history(history, width, height),
+                       legacy_pre_process_point_history(width, height, legacy_history), atol=1e-6)
+
+    net_a, peak_a = measure(step_array, args.frames)
+    net_l, peak_l = measure(step_legacy, args.frames)
+    print(f"legacy lists : net {net_l:7d} B  peak {peak_l:7d} B over {args.frames} frames")
+    print(f"array buffers: net {net_a:7d} B  peak {peak_a:7d} B over {args.frames} frames")
+    if net_a > args.budget or peak_a > args.budget:
+        print(f"FAIL: array path exceeded {args.budget} B budget")
+        sys.exit(1)
+    print("OK: no per-frame allocations in steady state")
+
+
+if __name__ == "__main__":
+    main()
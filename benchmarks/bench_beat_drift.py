@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Cumulative beat drift over many beats against a fake clock.
+
+    python benchmarks/bench_beat_drift.py --beats 10000
+
+Both loops see the same simulated costs per beat: an OSC send that takes
+--send-ms and an OS wake-up that is late by up to --jitter-ms. The legacy
+`send(); sleep(interval)` loop accumulates both; BeatTimeline schedules on
+absolute deadlines, so its error stays bounded by a single beat's lateness.
+Exits non-zero if the scheduler's final drift exceeds one beat's worst case.
+
+    python benchmarks/bench_beat_drift.py --live 500 --live-interval 0.01
+
+additionally runs a real BeatTask on an EventBus for that many beats and
+reports its drift against the loop clock (informational, real OS jitter).
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shimon.bus import BeatTask, EventBus
+from shimon.scheduler import BeatTimeline
+
+
+def legacy_loop(beats, interval, send_s, jitter_s, rng):
+    """Old HeadBobber._loop: send, then sleep(interval). Returns beat times."""
+    now, times = 0.0, []
+    for _ in range(beats):
+        times.append(now)
+        now += send_s                              # send_message
+        now += interval + rng.uniform(0, jitter_s)  # time.sleep overshoot
+    return times
+
+
+def scheduler_loop(beats, interval, send_s, jitter_s, rng):
+    """BeatTask._run driven by a fake clock. Returns beat times."""
+    now = 0.0
+    timeline = BeatTimeline(interval, now)
+    times = []
+    while len(times) < beats:
+        beat = timeline.poll(now)
+        if beat is None:
+            # _sleep(time_until) wakes late by OS jitter
+            now += timeline.time_until(now) + rng.uniform(0, jitter_s)
+            continue
+        times.append(now)
+        now += send_s
+    return times
+
+
+def live_loop(beats, interval, send_s):
+    """A real BeatTask on an EventBus; on_beat busy-waits send_s. Returns beat times."""
+    bus = EventBus(name="drift").start()
+    times, done = [], threading.Event()
+
+    def on_beat(_):
+        now = bus.loop.time()
+        times.append(now)
+        while bus.loop.time() - now < send_s:
+            pass
+        if len(times) >= beats:
+            task.pause()
+            done.set()
+
+    task = BeatTask(bus, on_beat, interval, running=True)
+    try:
+        done.wait()
+    finally:
+        task.cancel()
+        bus.stop()
+    return [t - times[0] for t in times]
+
+
+def drift_stats(times, interval):
+    errors = [t - i * interval for i, t in enumerate(times)]
+    return errors[-1], max(abs(e) for e in errors)
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--beats", type=int, default=10000)
+    p.add_argument("--interval", type=float, default=0.30)
+    p.add_argument("--send-ms", type=float, default=0.4)
+    p.add_argument("--jitter-ms", type=float, default=2.0)
+    p.add_argument("--live", type=int, default=0, help="also run a real BeatTask for this many beats")
+    p.add_argument("--live-interval", type=float, default=0.01)
+    args = p.parse_args()
+
+    send_s, jitter_s = args.send_ms / 1000.0, args.jitter_ms / 1000.0
+    legacy = legacy_loop(args.beats, args.interval, send_s, jitter_s, random.Random(1))
+    sched = scheduler_loop(args.beats, args.interval, send_s, jitter_s, random.Random(1))
+
+    for name, times in (("legacy sleep loop", legacy), ("BeatTimeline", sched)):
+        final, worst = drift_stats(times, args.interval)
+        print(f"{name:18s}: drift after {args.beats} beats {final * 1000:9.2f} ms "
+              f"(worst {worst * 1000:9.2f} ms)")
+
+    if args.live:
+        live = live_loop(args.live, args.live_interval, send_s)
+        final, worst = drift_stats(live, args.live_interval)
+        print(f"{'BeatTask (live)':18s}: drift after {args.live} beats {final * 1000:9.2f} ms "
+              f"(worst {worst * 1000:9.2f} ms)")
+
+    final, worst = drift_stats(sched, args.interval)
+    if worst > jitter_s + 1e-9:
+        print("FAIL: scheduler drift exceeds a single beat's jitter")
+        sys.exit(1)
+    print("OK: no cumulative drift")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+Hot-path regression suite for the gesture decisions (pytest-benchmark), with a
+committed baseline in benchmarks/baselines/.
+
+    # before a show: fail if any case's best time is >25% slower than the latest saved run
+    python -m pytest benchmarks/bench_decisions.py \\
+        --benchmark-storage=file://benchmarks/baselines \\
+        --benchmark-compare --benchmark-compare-fail=min:25%
+
+    # new baseline (on the show machine; baselines are per machine)
+    python -m pytest benchmarks/bench_decisions.py \\
+        --benchmark-storage=file://benchmarks/baselines --benchmark-save=baseline
+
+Covers the thumbs-up / open-palm rules, pre_process_landmark,
+pre_process_point_history / PointHistory.features, StartGate.update and the
+whole per-frame decision block (GestureEngine.perceive + HeadBobControl, as
+in app.py's GestureControl.step), timed per pass over all frames: eager
+(the default), planned (--plan_eval), with the --smooth LandmarkFilter, and
+planned with training samples requested between skipped frames. Inputs are
+the fixed poses in benchmarks/fixtures.py, plus any --recording made with
+app.py --record. No camera, robot, MediaPipe or app.py is needed.
+
+The classifiers are the models in model/ on --backend (see shimon.backends);
+with --stub-classifiers, or when model/ has no usable model, they are
+constants. The classifier kind is part of every decide case's id, so a run
+is only compared against baseline cases measured the same way. Compare the
+best ("min") time: it is far less noisy than the mean on a loaded machine.
+The file is not named test_*.py, so a plain `pytest` does not collect it.
+"""
+import numpy as np
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from fixtures import FIST, OPEN_PALM, THUMBS_UP, WIDTH, HEIGHT, frame_sequence
+from shimon import (BatchClassifier, EvaluationPlanner, GestureEngine, HandGeometry, HeadBobControl,
+                    LandmarkFilter, LandmarkRecording, PointHistory, StartGate, VoteBob,
+                    available_backends, load_classifier, load_labels,
+                    pre_process_landmark, pre_process_point_history,
+                    landmark_feature_buffer, point_history_feature_buffer)
+from shimon.headbob import INTERVAL_MIN, INTERVAL_MAX
+
+STUB = "stub"
+
+
+class ConstantClassifier:
+    """--stub-classifiers: measure everything but the model invokes."""
+    def __init__(self, value):
+        self.value = value
+
+    def __call__(self, features):
+        return self.value
+
+
+class SampleLog:
+    """decide[sampled]: counts the rows a TrainingLogger would be handed."""
+    def __init__(self):
+        self.rows = {}
+
+    def log(self, dataset, label, rows):
+        self.rows[dataset] = self.rows.get(dataset, 0) + len(rows)
+
+
+class Decisions:
+    """
+    GestureControl.step without the HUD views: the shared GestureEngine, then
+    HeadBobControl driving a VoteBob (no bus, no OSC).
+    """
+    def __init__(self, classifiers, max_hands=2, history_length=16, smoothing=None, plan=False,
+                 datalog=None):
+        kind, kpc, phc, kp_labels, ph_labels = classifiers
+        vote = VoteBob(interval_min=INTERVAL_MIN, interval_max=INTERVAL_MAX)
+        self.head = HeadBobControl(vote)
+        planner = EvaluationPlanner([self.head]) if plan else None
+        self.engine = GestureEngine(BatchClassifier(kpc, max_batch=max_hands),
+                                    BatchClassifier(phc, max_batch=max_hands), kp_labels, ph_labels,
+                                    max_hands=max_hands, history_length=history_length,
+                                    datalog=datalog, smoothing=smoothing, planner=planner)
+        self.landmarks = self.engine.landmarks
+
+    def request_sample(self, mode, number):
+        self.engine.request_sample(mode, number)
+
+    def step(self, hand_labels, image_width, image_height, now):
+        gestures = self.engine.perceive(hand_labels, image_width, image_height, now)
+        return self.head.update(gestures, now)
+
+
+def classifier_kind(config):
+    """The backend the decide cases will load, or STUB."""
+    if config.getoption("stub_classifiers"):
+        return STUB
+    backend = config.getoption("backend")
+    if backend != "auto":
+        return backend
+    usable = [name for name in available_backends("keypoint") if name in available_backends("point_history")]
+    return usable[0] if usable else STUB
+
+
+def pytest_generate_tests(metafunc):
+    if "classifiers" in metafunc.fixturenames:
+        metafunc.parametrize("classifiers", [classifier_kind(metafunc.config)],
+                             indirect=True, scope="module")
+
+
+@pytest.fixture(scope="module")
+def classifiers(request):
+    kind = request.param
+    if kind == STUB:
+        return (kind, ConstantClassifier(2), ConstantClassifier(0),
+                ["Open", "Close", "Pointer", "OK"], ["Stop", "Clockwise", "Counter Clockwise", "Move"])
+    return (kind, load_classifier("keypoint", kind), load_classifier("point_history", kind),
+            load_labels("keypoint"), load_labels("point_history"))
+
+
+def stepper(decisions, frames, width, height):
+    state = {"i": 0, "t": 0.0}
+
+    def step():
+        norm, labels = frames[state["i"]]
+        state["i"] = (state["i"] + 1) % len(frames)
+        state["t"] += 1 / 30
+        decisions.landmarks.fill_array(norm)
+        decisions.step(labels, width, height, state["t"])
+    return step
+
+
+def sampling(decisions, step, every=4):
+    """
+    Every `every`-th frame asks for a training sample (modes 1 and 2 in turn),
+    as the k / h key presses do. The frames in between let the planner skip stages.
+    """
+    state = {"i": 0}
+
+    def sampled_step():
+        state["i"] += 1
+        if state["i"] % every == 0:
+            decisions.request_sample(1 + (state["i"] // every) % 2, 0)
+        step()
+    return sampled_step
+
+
+def whole(step, frames):
+    """
+    One call = one pass over every frame. Frames differ a lot in cost (no
+    hands vs two), so timing single steps would make "min" an empty frame.
+    """
+    def run():
+        for _ in range(len(frames)):
+            step()
+    return run
+
+
+# ===================== Rules and preprocessing =====================
+@pytest.mark.parametrize("pose", ["thumbs_up", "open_palm", "fist"])
+def test_thumbs_up(benchmark, pose):
+    hand = {"thumbs_up": THUMBS_UP, "open_palm": OPEN_PALM, "fist": FIST}[pose].astype(np.int32)
+    assert benchmark(lambda: bool(HandGeometry.from_hand(hand).thumbs_up()[0])) == (pose == "thumbs_up")
+
+
+@pytest.mark.parametrize("pose", ["thumbs_up", "open_palm", "fist"])
+def test_open_palm(benchmark, pose):
+    hand = {"thumbs_up": THUMBS_UP, "open_palm": OPEN_PALM, "fist": FIST}[pose].astype(np.int32)
+    assert benchmark(lambda: bool(HandGeometry.from_hand(hand).open_palm()[0])) == (pose == "open_palm")
+
+
+def test_pre_process_landmark(benchmark):
+    thumbs = THUMBS_UP.astype(np.int32)
+    out = landmark_feature_buffer()
+    benchmark(pre_process_landmark, thumbs, out=out)
+
+
+def _history():
+    history = PointHistory(16)
+    for k in range(16):
+        history.append(400 + 3 * k, 300 - 2 * k)
+    return history
+
+
+def test_pre_process_point_history(benchmark):
+    history, out = _history(), point_history_feature_buffer(16)
+    benchmark(pre_process_point_history, history, WIDTH, HEIGHT, out=out)
+
+
+def test_point_history_features(benchmark):
+    history, out = _history(), point_history_feature_buffer(16)
+    benchmark(history.features, WIDTH, HEIGHT, out=out)
+
+
+def test_start_gate_update_x64(benchmark):
+    gate = StartGate()
+    gate_inputs = [k % 20 < 15 for k in range(64)]
+
+    def gate_updates():
+        # 64 frames per call: one update is too short to time against the loop
+        for thumbs_now in gate_inputs:
+            if gate.update(thumbs_now):
+                gate.reset_and_arm()
+    benchmark(gate_updates)
+
+
+# ===================== Decision block (per pass over the frames) =====================
+@pytest.mark.parametrize("mode", ["eager", "planned", "smoothed", "sampled"])
+def test_decide(benchmark, classifiers, mode):
+    frames = frame_sequence()
+    if mode == "sampled":
+        decisions = Decisions(classifiers, plan=True, datalog=SampleLog())
+        step = sampling(decisions, stepper(decisions, frames, WIDTH, HEIGHT))
+    else:
+        decisions = Decisions(classifiers, plan=mode == "planned",
+                              smoothing=LandmarkFilter() if mode == "smoothed" else None)
+        step = stepper(decisions, frames, WIDTH, HEIGHT)
+    step()  # warm-up (lazy buffers, first invoke)
+    benchmark.extra_info["classifiers"] = classifiers[0]
+    benchmark.extra_info["frames"] = len(frames)
+    benchmark(whole(step, frames))
+
+
+def test_decide_recorded(benchmark, classifiers, request):
+    path = request.config.getoption("recording")
+    if not path:
+        pytest.skip("no --recording given")
+    recording = LandmarkRecording(path)
+    recorded = [(np.array(rec["lm"][:int(rec["n"])]), recording.labels(i))
+                for i, rec in enumerate(recording.frames)]
+    decisions = Decisions(classifiers, max_hands=recording.max_hands)
+    step = stepper(decisions, recorded, recording.width, recording.height)
+    step()
+    benchmark.extra_info["classifiers"] = classifiers[0]
+    benchmark.extra_info["frames"] = len(recorded)
+    benchmark(whole(step, recorded))
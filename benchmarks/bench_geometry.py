@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Per-frame cost of the rule detectors: legacy per-finger helpers vs HandGeometry.
+
+    python benchmarks/bench_geometry.py --hands 2 --frames 5000
+
+The legacy helpers (benchmarks/fixtures.py) reproduce what app.py used before
+the batched geometry pass; they are also used to check both paths agree.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fixtures import OPEN_PALM, THUMBS_UP, WIDTH, legacy_is_open_palm, legacy_is_thumbs_up
+from shimon.geometry import HandGeometry
+
+
+def synthetic_hands(n, rng, jitter=6.0):
+    """Open-palm / thumbs-up landmark lists (int pixels) with per-joint jitter."""
+    poses = np.where(rng.random(n)[:, None, None] < 0.5, OPEN_PALM, THUMBS_UP)
+    noise = rng.normal(0.0, jitter, size=(n, 21, 2))
+    return np.clip(poses + noise, 0, WIDTH - 1).astype(np.int32)
+
+
+def bench(fn, frames):
+    t0 = time.perf_counter()
+    for f in frames:
+        fn(f)
+    return (time.perf_counter() - t0) / len(frames)
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--hands", type=int, default=2)
+    p.add_argument("--frames", type=int, default=5000)
+    p.add_argument("--seed", type=int, default=0)
+    args = p.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    frames = [synthetic_hands(args.hands, rng) for _ in range(args.frames)]
+    frames_lists = [f.tolist() for f in frames]
+
+    # agreement check
+    mismatches = n_up = n_palm = 0
+    for f, fl in zip(frames, frames_lists):
+        g = HandGeometry(f)
+        up, palm = g.thumbs_up(), g.open_palm()
+        n_up += int(up.sum())
+        n_palm += int(palm.sum())
+        for i, hand in enumerate(fl):
+            mismatches += (bool(up[i]) != bool(legacy_is_thumbs_up(hand)))
+            mismatches += (bool(palm[i]) != bool(legacy_is_open_palm(hand)))
+    print(f"agreement: {mismatches} mismatches over {args.frames * args.hands} hands "
+          f"({n_up} thumbs-up, {n_palm} open palm)")
+
+    def before(fl):
+        for hand in fl:
+            legacy_is_open_palm(hand)
+            legacy_is_thumbs_up(hand)
+
+    def after(fl):
+        g = HandGeometry(fl)
+        g.open_palm()
+        g.thumbs_up()
+
+    t_before = bench(before, frames_lists)
+    t_after = bench(after, frames_lists)
+    print(f"before (per-finger helpers): {t_before * 1e6:8.1f} us/frame")
+    print(f"after  (HandGeometry)      : {t_after * 1e6:8.1f} us/frame   ({t_before / t_after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Loopback harness for the shared OSC output layer.
+
+    python benchmarks/bench_osc_loopback.py --messages 20000
+
+Starts a UDP receiver on 127.0.0.1, then:
+  1. sends numbered messages and checks they arrive complete and in order;
+  2. sends numbered chord bundles and checks every bundle decodes to its notes;
+  3. checks an identical repeat is coalesced and the rate limiter caps bursts;
+  4. reports encode+send throughput vs a fresh SimpleUDPClient.send_message.
+Exits non-zero on any ordering / content failure.
+"""
+import argparse
+import os
+import socket
+import sys
+import threading
+import time
+
+from pythonosc import osc_packet, udp_client
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shimon.osc import OscOutput
+
+
+class Receiver(threading.Thread):
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 8 * 1024 * 1024)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.settimeout(0.2)
+        self.port = self.sock.getsockname()[1]
+        self.datagrams = []
+        self._halt = threading.Event()
+
+    def run(self):
+        while not self._halt.is_set():
+            try:
+                data, _ = self.sock.recvfrom(65536)
+            except socket.timeout:
+                continue
+            self.datagrams.append(data)
+
+    def drain(self, expected, timeout=5.0):
+        t_end = time.monotonic() + timeout
+        while len(self.datagrams) < expected and time.monotonic() < t_end:
+            time.sleep(0.01)
+        out, self.datagrams = self.datagrams, []
+        return out
+
+    def stop(self):
+        self._halt.set()
+
+
+def decode(dgram):
+    return [(m.message.address, list(m.message.params)) for m in osc_packet.OscPacket(dgram).messages]
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--messages", type=int, default=20000)
+    args = p.parse_args()
+    n = args.messages
+    failures = 0
+
+    rx = Receiver()
+    rx.start()
+    # no rate limit / dedupe for the ordering checks
+    out = OscOutput("127.0.0.1", rx.port, max_rate=0, dedupe_s=0)
+
+    # 1. ordering (paced in chunks so the loopback buffer never overflows)
+    for i in range(n):
+        out.send("/arm", (i % 128, i))
+        if i % 500 == 499:
+            time.sleep(0.002)
+    got = [decode(d)[0][1][1] for d in rx.drain(n)]
+    in_order = got == list(range(n))
+    print(f"messages: sent {n}, received {len(got)}, in order: {in_order}, dropped {out.dropped}")
+    failures += not in_order
+
+    # 2. bundles
+    for i in range(1000):
+        out.send_bundle([("/arm", (60, i)), ("/arm", (64, i)), ("/arm", (67, i))])
+    bundles = [decode(d) for d in rx.drain(1000)]
+    ok = len(bundles) == 1000 and all(
+        b == [("/arm", [60, i]), ("/arm", [64, i]), ("/arm", [67, i])] for i, b in enumerate(bundles))
+    print(f"bundles : received {len(bundles)}/1000, chord notes intact and ordered: {ok}")
+    failures += not ok
+
+    # 3. coalescing + rate limiting
+    limited = OscOutput("127.0.0.1", rx.port, max_rate=100.0, dedupe_s=0.05)
+    limited.send("/head-commands", ("NECK", 0.1, 3))
+    limited.send("/head-commands", ("NECK", 0.1, 3))
+    for i in range(500):
+        limited.send("/arm", (60, i))
+    stats = limited.stats()
+    rx.drain(stats["sent"], timeout=1.0)
+    print(f"limiter : {stats}")
+    ok = stats["coalesced"] == 1 and stats["sent"] <= 102
+    failures += not ok
+
+    # 4. throughput
+    out.max_rate = 0
+    t0 = time.perf_counter()
+    for i in range(n):
+        out.send("/head-commands", ("NECK", 0.1 if i % 2 else -0.1, 3))
+    t_shared = time.perf_counter() - t0
+    rx.drain(n, timeout=1.0)
+    client = udp_client.SimpleUDPClient("127.0.0.1", rx.port)
+    t0 = time.perf_counter()
+    for i in range(n):
+        client.send_message("/head-commands", ["NECK", 0.1 if i % 2 else -0.1, 3])
+    t_client = time.perf_counter() - t0
+    rx.drain(n, timeout=1.0)
+    print(f"throughput: OscOutput {n / t_shared:9.0f} msg/s   SimpleUDPClient {n / t_client:9.0f} msg/s")
+
+    rx.stop()
+    out.close()
+    limited.close()
+    if failures:
+        print("FAIL")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+"""
+pytest options for the pytest-benchmark suites in benchmarks/ (bench_decisions.py).
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from shimon import BACKENDS
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("shimon benchmarks")
+    group.addoption("--recording", default=None,
+                    help="also replay a landmark recording (app.py --record) through the decisions")
+    group.addoption("--backend", choices=["auto", *BACKENDS], default="auto",
+                    help="classifier backend for the decide cases")
+    group.addoption("--stub-classifiers", action="store_true",
+                    help="constant classifiers instead of the models in model/")
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+Fixed 21-point hand poses for benchmarks, in 960x540 pixel coordinates.
+
+Each pose is checked against HandGeometry: THUMBS_UP is a thumbs-up,
+OPEN_PALM an open palm, FIST and POINTING neither. frame_sequence() builds a
+deterministic multi-frame stream (seeded jitter) shaped like what
+LandmarkBuffer.fill_array() takes, so decisions can be driven without a
+camera or MediaPipe. legacy_is_thumbs_up / legacy_is_open_palm are the
+per-finger helpers app.py used before HandGeometry, kept as a reference.
+"""
+import math
+
+import cv2 as cv
+import numpy as np
+
+from shimon.geometry import (TH_MCP, TH_IP, TH_TIP, IX_MCP, IX_PIP, IX_DIP, IX_TIP, MI_MCP, MI_PIP, MI_DIP,
+                             RI_MCP, RI_PIP, RI_DIP, PI_MCP, PI_PIP, PI_DIP, PI_TIP)
+
+WIDTH, HEIGHT = 960, 540
+
+THUMBS_UP = np.array([
+    [480, 420], [450, 395], [440, 360], [438, 325], [437, 290],
+    [470, 350], [500, 345], [505, 365], [495, 372],
+    [475, 372], [505, 368], [508, 388], [497, 394],
+    [478, 392], [505, 390], [507, 408], [497, 412],
+    [480, 410], [502, 410], [503, 425], [495, 428]], dtype=np.float32)
+
+OPEN_PALM = np.array([
+    [480, 450], [440, 430], [410, 400], [390, 370], [375, 345],
+    [455, 360], [450, 310], [447, 280], [445, 250],
+    [480, 355], [480, 300], [480, 265], [480, 235],
+    [505, 360], [508, 310], [510, 280], [512, 252],
+    [528, 372], [535, 330], [540, 305], [544, 282]], dtype=np.float32)
+
+FIST = np.array([
+    [480, 450], [450, 430], [440, 405], [455, 385], [470, 378],
+    [455, 360], [452, 330], [462, 345], [465, 365],
+    [480, 355], [480, 325], [488, 342], [490, 362],
+    [505, 360], [507, 332], [512, 348], [512, 366],
+    [528, 372], [530, 348], [532, 362], [530, 375]], dtype=np.float32)
+
+POINTING = FIST.copy()
+POINTING[5:9] = OPEN_PALM[5:9]
+
+POSES = {"thumbs_up": THUMBS_UP, "open_palm": OPEN_PALM, "fist": FIST, "pointing": POINTING}
+
+# (poses in frame, labels) segments of the synthetic show, 30 frames each
+_SCRIPT = [
+    ((), ()),
+    (("thumbs_up",), ("Right",)),
+    (("pointing",), ("Right",)),
+    (("pointing", "fist"), ("Right", "Left")),
+    (("open_palm",), ("Left",)),
+    (("thumbs_up", "pointing"), ("Right", "Left")),
+]
+
+
+def normalized(pose, dx=0.0, dy=0.0):
+    """Pixel pose -> (21, 3) normalized landmarks (z = 0), optionally shifted in pixels."""
+    out = np.zeros((21, 3), dtype=np.float32)
+    out[:, 0] = (pose[:, 0] + dx) / WIDTH
+    out[:, 1] = (pose[:, 1] + dy) / HEIGHT
+    return out
+
+
+def frame_sequence(frames_per_segment=30, jitter_px=1.5, seed=0):
+    """[(norm (n, 21, 3), labels), ...] cycling through every segment once."""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for names, labels in _SCRIPT:
+        for k in range(frames_per_segment):
+            hands = []
+            for j, name in enumerate(names):
+                # second hand sits to the side; everything drifts slowly
+                hand = normalized(POSES[name], dx=-260 * j + k, dy=0.5 * k)
+                hand[:, :2] += rng.normal(0, jitter_px, (21, 2)) / (WIDTH, HEIGHT)
+                hands.append(hand)
+            norm = np.stack(hands) if hands else np.zeros((0, 21, 3), dtype=np.float32)
+            frames.append((norm, list(labels)))
+    return frames
+
+
+# ===================== Legacy helpers (before) =====================
+def _scale_from_points(pts):
+    x, y, w, h = cv.boundingRect(pts.astype(np.int32))
+    return (w**2 + h**2) ** 0.5 + 1e-6
+
+def _pip_angle(pts, mcp, pip, dip):
+    v1 = pts[mcp] - pts[pip]
+    v2 = pts[dip] - pts[pip]
+    a = np.linalg.norm(v1); b = np.linalg.norm(v2)
+    if a == 0 or b == 0: return 180.0
+    cosang = np.clip(np.dot(v1, v2) / (a*b), -1.0, 1.0)
+    return math.degrees(math.acos(cosang))
+
+def _curl_score(pts, mcp, pip, dip):
+    ang = _pip_angle(pts, mcp, pip, dip)
+    return float(np.clip((180.0 - ang) / 120.0, 0.0, 1.0))
+
+def _others_mostly_folded(pts, tol=0.45):
+    curls = [
+        _curl_score(pts, IX_MCP, IX_PIP, IX_DIP),
+        _curl_score(pts, MI_MCP, MI_PIP, MI_DIP),
+        _curl_score(pts, RI_MCP, RI_PIP, RI_DIP),
+        _curl_score(pts, PI_MCP, PI_PIP, PI_DIP),
+    ]
+    return (sum(c >= tol for c in curls) >= 3) and (np.mean(curls) >= (tol - 0.05))
+
+def _thumb_extended_and_up(pts):
+    v1 = pts[TH_MCP] - pts[TH_IP]
+    v2 = pts[TH_TIP] - pts[TH_IP]
+    a = np.linalg.norm(v1); b = np.linalg.norm(v2)
+    ang = 180.0 if a == 0 or b == 0 else math.degrees(math.acos(np.clip(np.dot(v1, v2)/(a*b), -1.0, 1.0)))
+    dir_vec = pts[TH_TIP] - pts[TH_MCP]
+    n = np.linalg.norm(dir_vec)
+    dir_vec = dir_vec / n if n > 0 else np.array([0.0, 0.0])
+    upness = -dir_vec[1]
+    return (ang > 150.0, upness, dir_vec)
+
+def legacy_is_thumbs_up(landmark_list_xy):
+    pts = np.asarray(landmark_list_xy, dtype=np.float32)
+    s = _scale_from_points(pts)
+    if not _others_mostly_folded(pts, tol=0.45):
+        return False
+    th_ext, upness, dir_vec = _thumb_extended_and_up(pts)
+    if not th_ext:
+        return False
+    vertical_ok = (abs(upness) > 0.35) and (abs(upness) > abs(dir_vec[0]) * 0.8)
+    if not (upness > 0 and vertical_ok):
+        return False
+    knuckle_y = 0.5 * (pts[IX_MCP][1] + pts[PI_MCP][1])
+    margin = 0.06 * s
+    return pts[TH_TIP][1] < (knuckle_y - margin)
+
+def legacy_is_open_palm(landmark_list_xy):
+    pts = np.asarray(landmark_list_xy, dtype=np.float32)
+    s = _scale_from_points(pts)
+    fingers = [(IX_MCP, IX_PIP, IX_DIP), (MI_MCP, MI_PIP, MI_DIP),
+               (RI_MCP, RI_PIP, RI_DIP), (PI_MCP, PI_PIP, PI_DIP)]
+    if all(_pip_angle(pts, *f) > 160 for f in fingers):
+        avg_curl = float(np.mean([_curl_score(pts, *f) for f in fingers]))
+        span = np.linalg.norm(pts[IX_TIP] - pts[PI_TIP]) / s
+        return (avg_curl <= 0.20) and (span >= 0.28)
+    return False
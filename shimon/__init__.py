@@ -0,0 +1,29 @@
+from shimon.pipeline import LatestSlot, StageTimer, Frame, CaptureThread, WorkerThread
+from shimon.geometry import HandGeometry
+from shimon.landmarks import LandmarkBuffer
+from shimon.preprocessing import (pre_process_landmark, pre_process_point_history, PointHistory,
+                                  landmark_feature_buffer, point_history_feature_buffer)
+from shimon.headless import StdinKeys
+from shimon.scheduler import BeatTimeline
+from shimon.osc import OscOutput, HOST, encode_message, encode_bundle
+from shimon.recording import LandmarkRecorder, LandmarkRecording
+from shimon.datalog import TrainingLogger, load_shards, KEYPOINT, POINT_HISTORY
+from shimon.sources import ImageSequence, PrefetchCapture, open_source
+from shimon.classify import BatchClassifier
+from shimon.backends import (BACKENDS, Backend, register, load_classifier, load_labels, export_mlp,
+                             available_backends)
+from shimon.temporal import LabelVote
+from shimon.metrics import Metrics, MetricsServer, Histogram
+from shimon.coordinator import Coordinator, VoteBob, POLICIES, TEMPOS
+from shimon.tracking import HandTracker, Track, linear_assignment
+from shimon.roi import RoiInference
+from shimon.gestures import (GestureEngine, HandGestures, Controller, EvaluationPlanner, SPIN_KEYWORDS,
+                             POINT_LABELS, KEYPOINT_STAGE, HISTORY_STAGE, ALL_STAGES, NO_STAGES, spin_direction)
+from shimon.bus import EventBus, BeatTask, Event, STOP, GO, THUMBS_UP, SPIN_CW, SPIN_CCW, TEMPO, ANY
+from shimon.music import (MusicPlayer, MusicControl, Schedule, ARPEGGIOS, CHORDS, BPM_MIN, BPM_MAX, MUSIC_PORT,
+                          OSC_ARM_PATH, arpeggio, arpeggio_control, chord_control, compile_schedule,
+                          schedule_timing)
+from shimon.headbob import HeadBobber, HeadBobControl, StartGate
+from shimon.overlay import TextCache, HAND_BONES, draw_hand
+from shimon.smoothing import LandmarkFilter
+from shimon.simulator import ShimonSimulator
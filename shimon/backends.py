@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+Classifier backends for the keypoint / point-history models, behind one registry.
+
+    classifier = load_classifier("keypoint", backend="auto")
+    labels = load_labels("keypoint")
+    class_id = classifier(features)            # same call as model.KeyPointClassifier
+    scores = classifier.scores(rows)           # (n, features) -> (n, classes), one call
+
+Backends:
+  * "tflite": the .tflite models. Uses tflite_runtime if it is installed,
+    else tensorflow.lite;
+  * "onnx":   onnxruntime on a .onnx export (e.g. tf2onnx of the same model);
+  * "numpy":  the Dense/ReLU/softmax MLP evaluated with NumPy, from an .npz of
+    weights written by export_mlp(). It needs no runtime import at all.
+
+Runtimes are imported only when a backend is built. Instances and labels are
+cached per process, so the three entry points (and replay, benchmarks) share
+one warm model. "auto" picks the first backend that has both its model file
+and its runtime, in BACKEND_ORDER. For these small MLPs NumPy has the lowest
+call overhead, and its cold start is a file read instead of a TensorFlow import.
+"""
+import csv
+import importlib.util
+import os
+import threading
+from functools import lru_cache
+
+import numpy as np
+
+# the repo's model/ package, wherever the process was started from
+MODEL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "model")
+
+# kind -> (directory, file stem, score_th, invalid_value); matches the model/ package
+MODELS = {
+    "keypoint": ("keypoint_classifier", "keypoint_classifier", None, 0),
+    "point_history": ("point_history_classifier", "point_history_classifier", 0.5, 0),
+}
+
+BACKENDS = {}
+BACKEND_ORDER = ("numpy", "onnx", "tflite")
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def register(name):
+    """Class decorator: make a backend available to load_classifier(backend=name)."""
+    def deco(cls):
+        cls.name = name
+        BACKENDS[name] = cls
+        return cls
+    return deco
+
+
+def model_path(kind, backend):
+    directory, stem, _, _ = MODELS[kind]
+    return os.path.join(MODEL_DIR, directory, stem + BACKENDS[backend].suffix)
+
+
+class Backend:
+    """
+    Base class: subclasses set `suffix` and implement scores(). Calling the
+    instance with one feature vector returns a class id, with the same
+    argmax / score_th -> invalid_value rule as the model/ classes.
+    """
+    name = None
+    suffix = None
+    runtime = None      # module the backend imports, checked by available()
+
+    def __init__(self, path, score_th=None, invalid_value=0, num_threads=1):
+        self.path = path
+        self.score_th = score_th
+        self.invalid_value = invalid_value
+        self.num_threads = int(num_threads)
+        self.num_features = None
+
+    @classmethod
+    def available(cls):
+        return cls.runtime is None or importlib.util.find_spec(cls.runtime) is not None
+
+    def scores(self, rows):
+        raise NotImplementedError
+
+    def __call__(self, features):
+        scores = self.scores(np.asarray(features, dtype=np.float32).reshape(1, -1))[0]
+        result = int(np.argmax(scores))
+        if self.score_th is not None and scores[result] < self.score_th:
+            return self.invalid_value
+        return result
+
+
+@register("tflite")
+class TFLiteBackend(Backend):
+    suffix = ".tflite"
+
+    @classmethod
+    def available(cls):
+        return any(importlib.util.find_spec(m) is not None for m in ("tflite_runtime", "tensorflow"))
+
+    def __init__(self, path, **kwargs):
+        super().__init__(path, **kwargs)
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            from tensorflow.lite import Interpreter
+        self.interpreter = Interpreter(model_path=path, num_threads=self.num_threads)
+        self.interpreter.allocate_tensors()
+        self.input_details = self.interpreter.get_input_details()
+        self.output_details = self.interpreter.get_output_details()
+        self._in_index = self.input_details[0]["index"]
+        self._out_index = self.output_details[0]["index"]
+        self._shape = [int(s) for s in self.input_details[0]["shape"]]
+        self.num_features = self._shape[-1]
+
+    def scores(self, rows):
+        rows = np.ascontiguousarray(rows, dtype=np.float32)
+        if len(rows) != self._shape[0]:
+            try:
+                # resized once for BatchClassifier's fixed padded batch
+                self.interpreter.resize_tensor_input(self._in_index, [len(rows), self.num_features])
+                self.interpreter.allocate_tensors()
+                self._shape[0] = len(rows)
+            except (ValueError, RuntimeError):
+                return np.concatenate([self.scores(row[None]) for row in rows])
+        self.interpreter.set_tensor(self._in_index, rows)
+        self.interpreter.invoke()
+        return self.interpreter.get_tensor(self._out_index)
+
+
+@register("onnx")
+class OnnxBackend(Backend):
+    suffix = ".onnx"
+    runtime = "onnxruntime"
+
+    def __init__(self, path, **kwargs):
+        super().__init__(path, **kwargs)
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = self.num_threads
+        options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(path, sess_options=options,
+                                            providers=["CPUExecutionProvider"])
+        inp = self.session.get_inputs()[0]
+        self._input = inp.name
+        # a symbolic batch dimension is a str / None; an int means a fixed batch
+        self._fixed_batch = inp.shape[0] if isinstance(inp.shape[0], int) else None
+        self.num_features = int(inp.shape[-1])
+
+    def scores(self, rows):
+        rows = np.ascontiguousarray(rows, dtype=np.float32)
+        if self._fixed_batch is not None and len(rows) != self._fixed_batch:
+            return np.concatenate([self.scores(row[None]) for row in rows])
+        return self.session.run(None, {self._input: rows})[0]
+
+
+@register("numpy")
+class NumpyMLP(Backend):
+    """Dense layers with ReLU between them and softmax at the end (Dropout is a no-op at inference)."""
+    suffix = ".npz"
+
+    def __init__(self, path, **kwargs):
+        super().__init__(path, **kwargs)
+        with np.load(path) as weights:
+            count = sum(1 for key in weights.files if key.startswith("W"))
+            self.layers = [(weights[f"W{i}"].astype(np.float32), weights[f"b{i}"].astype(np.float32))
+                           for i in range(count)]
+        if not self.layers:
+            raise ValueError(f"{path}: no W0/b0 ... weights")
+        self.num_features = self.layers[0][0].shape[0]
+
+    def scores(self, rows):
+        x = np.asarray(rows, dtype=np.float32)
+        last = len(self.layers) - 1
+        for i, (w, b) in enumerate(self.layers):
+            x = x @ w
+            x += b
+            if i < last:
+                np.maximum(x, 0.0, out=x)
+        x -= x.max(axis=1, keepdims=True)
+        np.exp(x, out=x)
+        x /= x.sum(axis=1, keepdims=True)
+        return x
+
+
+def export_mlp(keras_model, path):
+    """
+    Write a Keras Dense-only model's weights for the "numpy" backend, e.g.
+    export_mlp(model, "model/keypoint_classifier/keypoint_classifier.npz")
+    at the end of a training notebook.
+    """
+    arrays = {}
+    for layer in keras_model.layers:
+        weights = layer.get_weights()
+        if not weights:
+            continue  # Dropout, Input, ...
+        if len(weights) != 2 or weights[0].ndim != 2:
+            raise ValueError(f"layer {layer.name!r} is not Dense; use the tflite or onnx backend")
+        k = len(arrays) // 2
+        arrays[f"W{k}"], arrays[f"b{k}"] = weights
+    np.savez(path, **arrays)
+
+
+def available_backends(kind):
+    """Backends with both a model file and an importable runtime, in BACKEND_ORDER."""
+    return [name for name in BACKEND_ORDER
+            if os.path.exists(model_path(kind, name)) and BACKENDS[name].available()]
+
+
+def load_classifier(kind, backend="auto", num_threads=1, cache=True, warm=True):
+    """
+    Build (or return the cached) classifier for `kind` ("keypoint" /
+    "point_history"). cache=False always builds a new instance, e.g. one per
+    thread. warm=True runs one inference so the first frame doesn't pay for it.
+    """
+    if kind not in MODELS:
+        raise ValueError(f"unknown model {kind!r}; expected one of {sorted(MODELS)}")
+    if backend == "auto":
+        candidates = available_backends(kind)
+        if not candidates:
+            raise FileNotFoundError(f"no usable {kind} model in {MODEL_DIR}/ for {BACKEND_ORDER}")
+        backend = candidates[0]
+    elif backend not in BACKENDS:
+        raise ValueError(f"unknown backend {backend!r}; expected one of {sorted(BACKENDS)}")
+    key = (kind, backend, int(num_threads))
+    if cache:
+        with _cache_lock:
+            if key in _cache:
+                return _cache[key]
+    _, _, score_th, invalid_value = MODELS[kind]
+    classifier = BACKENDS[backend](model_path(kind, backend), score_th=score_th,
+                                   invalid_value=invalid_value, num_threads=num_threads)
+    if warm:
+        classifier.scores(np.zeros((1, classifier.num_features), dtype=np.float32))
+    if cache:
+        with _cache_lock:
+            classifier = _cache.setdefault(key, classifier)
+    return classifier
+
+
+@lru_cache(maxsize=None)
+def _read_labels(kind):
+    directory, stem, _, _ = MODELS[kind]
+    path = os.path.join(MODEL_DIR, directory, stem + "_label.csv")
+    with open(path, encoding="utf-8-sig") as f:
+        return tuple(row[0] for row in csv.reader(f))
+
+
+def load_labels(kind):
+    """Class labels for `kind`, read once per process."""
+    return list(_read_labels(kind))
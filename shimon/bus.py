@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+asyncio control plane: one event-loop thread for every actuator.
+
+The vision side never touches actuator state. It publishes gesture events,
+and publish() is thread-safe (loop.call_soon_threadsafe into an
+asyncio.Queue). Subscribed handlers and BeatTasks all run on the bus's loop
+thread, so `running` / `interval` are only ever written from one thread:
+no lost updates between a GO and a tempo nudge, and no lock per actuator.
+
+    bus = EventBus().start()
+    bus.subscribe(GO, on_go)             # plain or async handler, gets an Event
+    beats = BeatTask(bus, on_beat, 1.0)  # drift-free beats, no thread of its own
+    bus.publish(GO, t=frame.t_capture)   # from any thread
+
+BeatTask runs the BeatTimeline deadline arithmetic (shimon.scheduler)
+against loop.time() (monotonic). Each actuator costs one asyncio task
+instead of one thread.
+"""
+import asyncio
+import inspect
+import threading
+from collections import defaultdict
+
+from shimon.scheduler import BeatTimeline
+
+# gesture events published by the vision side
+STOP = "stop"
+GO = "go"
+THUMBS_UP = "thumbs_up"
+SPIN_CW = "spin_cw"
+SPIN_CCW = "spin_ccw"
+TEMPO = "tempo"        # data: delta=seconds to add, or interval=absolute seconds
+ANY = "*"              # subscribe to everything
+
+
+class Event:
+    __slots__ = ("kind", "t", "data")
+
+    def __init__(self, kind, t=None, data=None):
+        self.kind = kind
+        self.t = t          # perf_counter capture time of the frame, if any
+        self.data = data or {}
+
+    def __repr__(self):
+        return f"Event({self.kind!r}, t={self.t}, {self.data})"
+
+
+class EventBus:
+    def __init__(self, name="control"):
+        self.name = name
+        self.loop = asyncio.new_event_loop()
+        self.published = 0
+        self.handled = 0
+        self._handlers = defaultdict(list)
+        self._queue = None
+        self._ready = threading.Event()
+        self._thr = threading.Thread(target=self._run, name=name, daemon=True)
+
+    # ---------- lifecycle ----------
+    def start(self):
+        self._thr.start()
+        self._ready.wait()
+        return self
+
+    def stop(self, timeout=1.0):
+        if self._thr.is_alive():
+            self.loop.call_soon_threadsafe(self._queue.put_nowait, None)
+            self._thr.join(timeout=timeout)
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self._dispatch())
+        finally:
+            for task in asyncio.all_tasks(self.loop):
+                task.cancel()
+            self.loop.run_until_complete(asyncio.sleep(0))
+            self.loop.close()
+
+    async def _dispatch(self):
+        self._queue = asyncio.Queue()
+        self._ready.set()
+        while True:
+            event = await self._queue.get()
+            if event is None:
+                return
+            for handler in self._handlers.get(event.kind, []) + self._handlers.get(ANY, []):
+                try:
+                    result = handler(event)
+                    if inspect.isawaitable(result):
+                        await result
+                except Exception as e:
+                    print(f"[{self.name} ERROR] {event.kind}:", e)
+            self.handled += 1
+
+    # ---------- any thread ----------
+    def subscribe(self, kind, handler):
+        self.call(lambda: self._handlers[kind].append(handler))
+
+    def subscribed(self, kind):
+        """True if a handler (or an ANY handler) receives `kind` events."""
+        return bool(self._handlers.get(kind) or self._handlers.get(ANY))
+
+    def publish(self, kind, t=None, **data):
+        self.published += 1
+        self.call(self._queue.put_nowait, Event(kind, t, data))
+
+    def call(self, fn, *args):
+        """Run fn(*args) on the loop thread (directly if already there)."""
+        if threading.current_thread() is self._thr:
+            fn(*args)
+        else:
+            self.loop.call_soon_threadsafe(fn, *args)
+
+    def run(self, coro, timeout=None):
+        """Run a coroutine on the loop from another thread and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    @property
+    def pending(self):
+        return self._queue.qsize() if self._queue is not None else 0
+
+
+class BeatTask:
+    """
+    Calls on_beat(beat_index) at absolute deadlines as an asyncio task on the
+    bus loop. on_beat may be a coroutine function. pause / resume /
+    set_interval may be called from any thread; they apply on the loop.
+    """
+    def __init__(self, bus, on_beat, interval, running=False):
+        self.bus = bus
+        self.on_beat = on_beat
+        self._timeline = BeatTimeline(interval, bus.loop.time())
+        self._running = bool(running)
+        self._waiter = None
+        self._task = None
+        bus.call(self._start)
+
+    def _start(self):
+        self._task = self.bus.loop.create_task(self._run())
+
+    @property
+    def running(self):
+        return self._running
+
+    @property
+    def interval(self):
+        return self._timeline.interval
+
+    @property
+    def beat(self):
+        return self._timeline.beat
+
+    def pause(self):
+        self.bus.call(self._set_running, False)
+
+    def resume(self):
+        self.bus.call(self._set_running, True)
+
+    def set_interval(self, interval):
+        self.bus.call(self._timeline.set_interval, float(interval))
+
+    def cancel(self):
+        self.bus.call(lambda: self._task is not None and self._task.cancel())
+
+    # ---------- loop thread ----------
+    def _set_running(self, running):
+        if running and not self._running:
+            self._timeline.restart(self.bus.loop.time())
+        self._running = running
+        _wake(self._waiter)
+
+    async def _sleep(self, timeout):
+        """Until the deadline or a pause/resume, whichever is first (a bare future + call_later)."""
+        loop = self.bus.loop
+        self._waiter = waiter = loop.create_future()
+        timer = loop.call_later(timeout, _wake, waiter) if timeout is not None else None
+        try:
+            await waiter
+        finally:
+            self._waiter = None
+            if timer is not None:
+                timer.cancel()
+
+    async def _run(self):
+        loop = self.bus.loop
+        while True:
+            if not self._running:
+                await self._sleep(None)
+                continue
+            beat = self._timeline.poll(loop.time())
+            if beat is None:
+                await self._sleep(self._timeline.time_until(loop.time()))
+                continue
+            try:
+                result = self.on_beat(beat)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                print("[Beat ERROR]", e)
+
+
+def _wake(waiter):
+    if waiter is not None and not waiter.done():
+        waiter.set_result(None)
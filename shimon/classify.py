@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Batched classifier calls: one TFLite invoke for every hand in the frame.
+
+KeyPointClassifier / PointHistoryClassifier take one feature vector and do
+set_tensor + invoke + get_tensor per hand. BatchClassifier wraps either one
+(anything exposing .interpreter / .input_details / .output_details), resizes
+the model input to (max_batch, features) once, and classifies an (n, features)
+matrix with a single invoke, keeping each classifier's own post-processing
+(argmax, and score_th -> invalid_value for the point-history model).
+shimon.backends classifiers expose scores() and are batched through it (a
+backend whose batch dimension is fixed splits the rows itself).
+
+Bare interpreters that can't be resized, and plain callables, fall back to
+sequential per-row calls.
+"""
+import numpy as np
+
+
+class BatchClassifier:
+    def __init__(self, classifier, max_batch=2):
+        self.classifier = classifier
+        self.max_batch = max(1, int(max_batch))
+        self.score_th = getattr(classifier, "score_th", None)
+        self.invalid_value = getattr(classifier, "invalid_value", 0)
+        self._ids = np.zeros(self.max_batch, dtype=np.intp)
+        self.batched = self._prepare()
+
+    def _prepare(self):
+        scores = getattr(self.classifier, "scores", None)
+        if scores is not None:
+            # shimon.backends: (n, features) -> (n, classes) in one call
+            self._scores = scores
+            self._batch = np.zeros((self.max_batch, self.classifier.num_features), dtype=np.float32)
+            return True
+        interpreter = getattr(self.classifier, "interpreter", None)
+        if interpreter is None:
+            return False
+        inp = self.classifier.input_details[0]
+        shape = [int(s) for s in inp["shape"]]
+        if len(shape) != 2:
+            return False
+        try:
+            interpreter.resize_tensor_input(inp["index"], [self.max_batch, shape[1]])
+            interpreter.allocate_tensors()
+        except (ValueError, RuntimeError):
+            # fixed batch dimension: put the model back the way it was
+            interpreter.resize_tensor_input(inp["index"], shape)
+            interpreter.allocate_tensors()
+            return False
+        self._interpreter = interpreter
+        self._scores = self._invoke_interpreter
+        self._in_index = inp["index"]
+        self._out_index = self.classifier.output_details[0]["index"]
+        # padded rows are zeros; their outputs are ignored
+        self._batch = np.zeros((self.max_batch, shape[1]), dtype=np.float32)
+        return True
+
+    def __call__(self, features):
+        """(n, features) -> (n,) class ids. The result is reused by the next call."""
+        n = len(features)
+        if n > len(self._ids):
+            self._ids = np.zeros(n, dtype=np.intp)
+        ids = self._ids[:n]
+        if n == 0:
+            return ids
+        if self.batched:
+            for start in range(0, n, self.max_batch):
+                ids[start:start + self.max_batch] = self._invoke(features[start:start + self.max_batch])
+        else:
+            for i in range(n):
+                ids[i] = self.classifier(features[i])
+        return ids
+
+    def _invoke(self, rows):
+        k = len(rows)
+        batch = self._batch
+        batch[:k] = rows
+        batch[k:] = 0.0
+        scores = self._scores(batch)[:k]
+        result = scores.argmax(axis=1)
+        if self.score_th is not None:
+            result[scores[np.arange(k), result] < self.score_th] = self.invalid_value
+        return result
+
+    def _invoke_interpreter(self, batch):
+        self._interpreter.set_tensor(self._in_index, batch)
+        self._interpreter.invoke()
+        return self._interpreter.get_tensor(self._out_index)
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+Multi-performer control: merge per-camera gesture decisions into one robot.
+
+Each camera runs in its own worker process with its own GestureControl. In
+place of the HeadBobber it gets a VoteBob, which only records what the
+performer asked for (STOP / GO / desired interval). After every frame the
+worker sends a small tuple to the coordinator:
+
+    (performer, t_frame, action, running, interval)
+
+`action` is "stop", "go" or None. `t_frame` is the perf_counter capture time,
+which is system-wide monotonic on Linux, so it still gives gesture -> OSC
+latency. A message with t_frame None means the worker has finished.
+
+The Coordinator owns the only real OSC output (HeadBobber). It merges the
+votes of the performers heard from within `stale_s`:
+
+  policy   any_stop   single-camera semantics across cameras: a STOP from
+                      anyone pauses, otherwise a GO from anyone resumes
+           majority   bob while more than half the performers want it running
+           unanimous  bob only while every performer wants it running
+  tempo    mean | fastest | slowest of the performers' desired intervals
+
+The bob applies pause / resume later, on the control bus, so its `running`
+lags behind. The Coordinator keeps its own `running` (what it last decided),
+and apply() returns True when that call started the bob.
+"""
+import time
+
+STOP, GO = "stop", "go"
+POLICIES = ("any_stop", "majority", "unanimous")
+TEMPOS = ("mean", "fastest", "slowest")
+
+
+class VoteBob:
+    """HeadBobber stand-in for a performer worker: records requests, sends nothing."""
+    def __init__(self, interval=1.0, interval_min=0.30, interval_max=1.20):
+        self.interval_min, self.interval_max = float(interval_min), float(interval_max)
+        self.interval = float(interval)
+        self.running = False
+        self.action = None
+
+    def pause(self):
+        self.running = False
+        self.action = STOP
+
+    def resume(self, t_gesture=None):
+        self.running = True
+        if self.action is None:
+            self.action = GO
+
+    def set_interval(self, new_interval):
+        self.interval = max(self.interval_min, min(self.interval_max, float(new_interval)))
+
+    def nudge_interval(self, delta):
+        self.set_interval(self.interval + float(delta))
+
+    def take(self):
+        """This frame's STOP/GO request (or None); cleared for the next frame."""
+        action, self.action = self.action, None
+        return action
+
+    def shutdown(self):
+        pass
+
+
+class _Performer:
+    __slots__ = ("seen", "running", "interval")
+
+    def __init__(self, seen, running, interval):
+        self.seen, self.running, self.interval = seen, running, interval
+
+
+class Coordinator:
+    def __init__(self, bob, policy="any_stop", tempo="mean", stale_s=1.0, clock=time.monotonic):
+        if policy not in POLICIES:
+            raise ValueError(f"policy must be one of {POLICIES}, got {policy!r}")
+        if tempo not in TEMPOS:
+            raise ValueError(f"tempo must be one of {TEMPOS}, got {tempo!r}")
+        self.bob = bob
+        self.policy = policy
+        self.tempo = tempo
+        self.stale_s = float(stale_s)
+        self.clock = clock
+        self.performers = {}
+        self.messages = 0
+        self.running = False   # last decision sent to the bob (which starts paused)
+        self._stop = False
+        self._go = None  # t_frame of the first GO since the last apply()
+
+    def update(self, performer, t_frame, action, running, interval):
+        """Record one worker message (call apply() after draining the queue)."""
+        self.messages += 1
+        if t_frame is None:
+            self.performers.pop(performer, None)
+            return
+        p = self.performers.get(performer)
+        if p is None:
+            self.performers[performer] = _Performer(self.clock(), running, interval)
+        else:
+            p.seen, p.running, p.interval = self.clock(), running, interval
+        if action == STOP:
+            self._stop = True
+        elif action == GO and self._go is None:
+            self._go = t_frame
+
+    def active(self):
+        cutoff = self.clock() - self.stale_s
+        return [p for p in self.performers.values() if p.seen >= cutoff]
+
+    def apply(self):
+        """Merge the votes received since the last call into the bob. True if this started it."""
+        active = self.active()
+        stop, go = self._stop, self._go
+        self._stop, self._go = False, None
+        if not active:
+            return False
+
+        was_running = self.running
+        if self.policy == "any_stop":
+            if stop:
+                self.bob.pause()
+                self.running = False
+            elif go is not None:
+                self.bob.resume(go)
+                self.running = True
+        else:
+            wanting = sum(p.running for p in active)
+            if self.policy == "majority":
+                run = wanting * 2 > len(active)
+            else:
+                run = wanting == len(active)
+            if run and not self.running:
+                self.bob.resume(go)
+            elif not run and self.running:
+                self.bob.pause()
+            self.running = run
+
+        intervals = [p.interval for p in active]
+        if self.tempo == "fastest":
+            target = min(intervals)
+        elif self.tempo == "slowest":
+            target = max(intervals)
+        else:
+            target = sum(intervals) / len(intervals)
+        self.bob.set_interval(target)
+        return self.running and not was_running
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+Training-data logging (modes 1 and 2) off the inference thread.
+
+The old logging_csv opened, appended one row to and closed the CSV on every
+frame a number key was held. TrainingLogger.log() only copies the rows into
+an in-memory queue; a writer thread appends them in batches to CSV files
+that stay open, in the format the notebooks already read:
+
+    label, feature_0, feature_1, ...
+
+With `shard_dir`, the same rows also go to NPZ shards, one file per
+`shard_rows` samples per dataset:
+
+    <shard_dir>/<dataset>-<session>-<index>.npz   X: (n, F) float32, y: (n,) int32
+
+load_shards() concatenates them. That is much faster than np.loadtxt on the CSV.
+"""
+import csv
+import glob
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+from shimon.backends import MODEL_DIR
+
+KEYPOINT = "keypoint"
+POINT_HISTORY = "point_history"
+
+# next to the models in the repo's model/ package, wherever the process was started from
+CSV_PATHS = {
+    KEYPOINT: os.path.join(MODEL_DIR, "keypoint_classifier", "keypoint.csv"),
+    POINT_HISTORY: os.path.join(MODEL_DIR, "point_history_classifier", "point_history.csv"),
+}
+
+
+class TrainingLogger:
+    def __init__(self, csv_paths=None, shard_dir=None, shard_rows=4096,
+                 flush_rows=256, flush_interval=1.0, maxsize=10000):
+        self.csv_paths = dict(CSV_PATHS if csv_paths is None else csv_paths)
+        self.shard_dir = shard_dir
+        self.shard_rows = max(1, int(shard_rows))
+        self.flush_rows = max(1, int(flush_rows))
+        self.flush_interval = float(flush_interval)
+        self.session = time.strftime("%Y%m%d-%H%M%S")
+        self.logged = 0
+        self.written = 0
+        self.dropped = 0    # queue full: the writer fell behind
+        self.shards = 0
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._files = {}
+        self._pending = {}  # dataset -> [(label, rows), ...] not yet in the CSV
+        self._shard = {}    # dataset -> [(labels, rows), ...] not yet in a shard
+        self._shard_index = {}
+        # the writer thread starts on the first log(): most runs never press k / h
+        self._thr = None
+        self._thr_lock = threading.Lock()
+
+    # ---------- any thread ----------
+    def log(self, dataset, label, rows):
+        """Queue one sample (F,) or a batch (n, F) under `label`. Never blocks."""
+        if dataset not in self.csv_paths:
+            raise ValueError(f"unknown dataset {dataset!r}")
+        rows = np.array(rows, copy=True)   # caller buffers are reused next frame
+        if rows.ndim == 1:
+            rows = rows[None]
+        if self._thr is None:
+            self._start()
+        try:
+            self._queue.put_nowait((dataset, int(label), rows))
+            self.logged += len(rows)
+        except queue.Full:
+            self.dropped += len(rows)
+
+    def close(self, timeout=5.0):
+        """Flush everything queued, write the last partial shards, close the files."""
+        if self._thr is not None and self._thr.is_alive():
+            self._queue.put(None)
+            self._thr.join(timeout=timeout)
+
+    def stats(self):
+        return {"logged": self.logged, "written": self.written,
+                "dropped": self.dropped, "shards": self.shards}
+
+    def _start(self):
+        with self._thr_lock:
+            if self._thr is None:
+                thr = threading.Thread(target=self._run, name="datalog", daemon=True)
+                thr.start()
+                self._thr = thr
+
+    # ---------- writer thread ----------
+    def _run(self):
+        pending = 0
+        last_flush = time.monotonic()
+        try:
+            while True:
+                timeout = max(0.0, last_flush + self.flush_interval - time.monotonic())
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    item = ()
+                if item is None:
+                    break
+                if item:
+                    dataset, label, rows = item
+                    self._pending.setdefault(dataset, []).append((label, rows))
+                    pending += len(rows)
+                if pending >= self.flush_rows or (pending and time.monotonic() - last_flush >= self.flush_interval):
+                    self._flush()
+                    pending = 0
+                    last_flush = time.monotonic()
+                elif not pending:
+                    last_flush = time.monotonic()
+        except Exception as e:
+            print("[Datalog ERROR]", e)
+        finally:
+            # drain whatever arrived before close()
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item:
+                    dataset, label, rows = item
+                    self._pending.setdefault(dataset, []).append((label, rows))
+            try:
+                self._flush(final=True)
+            except Exception as e:
+                print("[Datalog ERROR]", e)
+            for f in self._files.values():
+                f.close()
+
+    def _flush(self, final=False):
+        for dataset, batch in self._pending.items():
+            if not batch:
+                continue
+            f = self._files.get(dataset)
+            if f is None:
+                f = self._files[dataset] = open(self.csv_paths[dataset], "a", newline="")
+            writer = csv.writer(f)
+            for label, rows in batch:
+                writer.writerows([label, *row] for row in rows.tolist())
+                self.written += len(rows)
+            f.flush()
+            if self.shard_dir:
+                self._shard.setdefault(dataset, []).extend(batch)
+            batch.clear()
+        if self.shard_dir:
+            for dataset, samples in self._shard.items():
+                if samples and (final or sum(len(rows) for _, rows in samples) >= self.shard_rows):
+                    self._write_shard(dataset, samples)
+                    samples.clear()
+
+    def _write_shard(self, dataset, samples):
+        x = np.concatenate([rows for _, rows in samples]).astype(np.float32, copy=False)
+        y = np.concatenate([np.full(len(rows), label, dtype=np.int32) for label, rows in samples])
+        index = self._shard_index.get(dataset, 0)
+        self._shard_index[dataset] = index + 1
+        os.makedirs(self.shard_dir, exist_ok=True)
+        path = os.path.join(self.shard_dir, f"{dataset}-{self.session}-{index:04d}.npz")
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, X=x, y=y)
+        os.replace(tmp, path)  # a reader never sees a half-written shard
+        self.shards += 1
+
+
+def load_shards(shard_dir, dataset):
+    """(X (n, F) float32, y (n,) int32) from every shard of `dataset`, in file order."""
+    xs, ys = [], []
+    for path in sorted(glob.glob(os.path.join(shard_dir, f"{dataset}-*.npz"))):
+        with np.load(path) as shard:
+            xs.append(shard["X"])
+            ys.append(shard["y"])
+    if not xs:
+        raise FileNotFoundError(f"no {dataset} shards in {shard_dir}")
+    return np.concatenate(xs), np.concatenate(ys)
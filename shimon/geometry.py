@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Batched hand geometry for the rule-based gesture detectors.
+
+One HandGeometry pass computes every joint angle, curl score, hand scale and
+thumb direction for all detected hands at once from an (n_hands, 21, 2)
+array. is_open_palm / is_thumbs_up / is_thumbs_down then just threshold
+those shared features instead of recomputing them finger by finger.
+"""
+import numpy as np
+
+# ===================== Hand indices =====================
+WRIST = 0
+TH_MCP, TH_IP, TH_TIP = 2, 3, 4
+IX_MCP, IX_PIP, IX_DIP, IX_TIP = 5, 6, 7, 8
+MI_MCP, MI_PIP, MI_DIP, MI_TIP = 9, 10, 11, 12
+RI_MCP, RI_PIP, RI_DIP, RI_TIP = 13, 14, 15, 16
+PI_MCP, PI_PIP, PI_DIP, PI_TIP = 17, 18, 19, 20
+
+# (prev, joint, next) triples: the thumb IP joint, then the four finger PIPs
+_JOINTS = np.array([
+    (TH_MCP, TH_IP, TH_TIP),
+    (IX_MCP, IX_PIP, IX_DIP),
+    (MI_MCP, MI_PIP, MI_DIP),
+    (RI_MCP, RI_PIP, RI_DIP),
+    (PI_MCP, PI_PIP, PI_DIP),
+], dtype=np.intp)
+
+FINGERS = slice(1, 5)  # index .. pinky in HandGeometry.angles / curls
+
+
+class HandGeometry:
+    """
+    Shared per-frame features for n hands.
+        angles  (n, 5)  joint angle in degrees [thumb IP, index..pinky PIP]
+        curls   (n, 5)  0 = straight, 1 = curled (maps 180°->0, 60°->1)
+        scale   (n,)    bounding-box diagonal in pixels
+        thumb_dir (n, 2) unit vector thumb MCP -> TIP
+        upness  (n,)    +1 thumb points up, -1 down
+    """
+    def __init__(self, pts):
+        pts = np.asarray(pts, dtype=np.float32)
+        if pts.ndim == 2:
+            pts = pts[None]
+        self.pts = pts
+        self.n = pts.shape[0]
+
+        # all joint angles in one shot: (n, 5, 2) vectors around each joint
+        v1 = pts[:, _JOINTS[:, 0]] - pts[:, _JOINTS[:, 1]]
+        v2 = pts[:, _JOINTS[:, 2]] - pts[:, _JOINTS[:, 1]]
+        a = np.sqrt(np.einsum("njk,njk->nj", v1, v1))
+        b = np.sqrt(np.einsum("njk,njk->nj", v2, v2))
+        ab = a * b
+        valid = ab > 0
+        cosang = np.einsum("njk,njk->nj", v1, v2) / np.where(valid, ab, 1.0)
+        angles = np.degrees(np.arccos(np.clip(cosang, -1.0, 1.0)))
+        self.angles = np.where(valid, angles, 180.0)
+        self.curls = np.clip((180.0 - self.angles) / 120.0, 0.0, 1.0)
+
+        # same numbers cv.boundingRect would give on the integer points
+        ipts = pts.astype(np.int32)
+        wh = (ipts.max(axis=1) - ipts.min(axis=1) + 1).astype(np.float32)
+        self.scale = np.sqrt((wh ** 2).sum(axis=1)) + 1e-6
+
+        d = pts[:, TH_TIP] - pts[:, TH_MCP]
+        norm = np.sqrt((d ** 2).sum(axis=1))
+        self.thumb_dir = np.where(norm[:, None] > 0, d / np.where(norm > 0, norm, 1.0)[:, None], 0.0)
+        self.upness = -self.thumb_dir[:, 1]
+
+    @classmethod
+    def from_hand(cls, landmark_list_xy):
+        return cls(np.asarray(landmark_list_xy, dtype=np.float32)[None])
+
+    # ---------- shared building blocks ----------
+    def others_mostly_folded(self, tol=0.45):
+        curls = self.curls[:, FINGERS]
+        return ((curls >= tol).sum(axis=1) >= 3) & (curls.mean(axis=1) >= (tol - 0.05))
+
+    def thumb_extended(self):
+        return self.angles[:, 0] > 150.0
+
+    def _thumb_vertical(self):
+        up = np.abs(self.upness)
+        return (up > 0.35) & (up > np.abs(self.thumb_dir[:, 0]) * 0.8)
+
+    def _knuckle_y(self):
+        return 0.5 * (self.pts[:, IX_MCP, 1] + self.pts[:, PI_MCP, 1])
+
+    # ---------- detectors (bool arrays of shape (n,)) ----------
+    def thumbs_up(self):
+        margin = 0.06 * self.scale
+        return (self.others_mostly_folded(0.45) & self.thumb_extended()
+                & (self.upness > 0) & self._thumb_vertical()
+                & (self.pts[:, TH_TIP, 1] < self._knuckle_y() - margin))
+
+    def thumbs_down(self):
+        margin = 0.06 * self.scale
+        return (self.others_mostly_folded(0.45) & self.thumb_extended()
+                & (self.upness < 0) & self._thumb_vertical()
+                & (self.pts[:, TH_TIP, 1] > self._knuckle_y() + margin))
+
+    def fingers_extended(self, thres_deg=160):
+        return (self.angles[:, FINGERS] > thres_deg).all(axis=1)
+
+    def open_palm(self):
+        """
+        Open/Stop ✋: all four non-thumb fingers extended fairly straight,
+        and a decent span between index and pinky tips.
+        """
+        span = np.sqrt(((self.pts[:, IX_TIP] - self.pts[:, PI_TIP]) ** 2).sum(axis=1)) / self.scale
+        return (self.fingers_extended() & (self.curls[:, FINGERS].mean(axis=1) <= 0.20)
+                & (span >= 0.28))
@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+"""
+Shared gesture perception and the controller interface.
+
+GestureEngine is the one fast path every mode uses: landmarks -> stable
+tracks -> one batched HandGeometry pass -> one keypoint-classifier and one
+point-history-classifier invoke for all hands. Its per-frame HandGestures
+result goes to any number of Controllers (head bob, arpeggio player,
+chord/velocity player). Several modes can then run from one camera stream,
+and a speed-up to perception reaches all of them at once.
+
+    engine = GestureEngine(kpc, phc, kp_labels, ph_labels, max_hands=2,
+                           planner=EvaluationPlanner(controllers))
+    engine.landmarks.fill(results.multi_hand_landmarks)
+    gestures = engine.perceive(hand_labels, width, height)
+    for controller in controllers:
+        status = controller.update(gestures, now, t_frame)
+
+The geometry pass is cheap and always runs. Without a planner, both
+classifiers run on every frame. With one, they run only when some
+controller's needs() says their output could change a decision this frame
+(see EvaluationPlanner; opt-in in app.py with --plan_eval).
+"""
+import time
+
+import numpy as np
+
+from shimon.datalog import KEYPOINT, POINT_HISTORY
+from shimon.geometry import HandGeometry
+from shimon.landmarks import LandmarkBuffer
+from shimon.pipeline import StageTimer
+from shimon.preprocessing import pre_process_landmark, landmark_feature_buffer, point_history_feature_buffer
+from shimon.tracking import HandTracker
+
+# Point-history labels that count as "finger spin"
+SPIN_KEYWORDS = {
+    "spin", "spinning", "circle", "circling",
+    "cw", "clockwise", "ccw", "counterclockwise",
+    "rotate", "rotation"
+}
+
+# Hand-sign labels that count as "Point" (case-insensitive)
+POINT_LABELS = {"point", "pointer", "pointing"}
+
+# Classifier stages the EvaluationPlanner may skip (named like their timer stages)
+KEYPOINT_STAGE = "keypoint_classifier"
+HISTORY_STAGE = "history_classifier"
+STAGES = (KEYPOINT_STAGE, HISTORY_STAGE)
+ALL_STAGES = frozenset(STAGES)
+NO_STAGES = frozenset()
+
+
+def spin_direction(label):
+    """"cw", "ccw" or None for a point-history label (substring rules of the music scripts)."""
+    t = label.strip().lower()
+    if "counterclockwise" in t or "counter clockwise" in t or t == "ccw" or " ccw" in t:
+        return "ccw"
+    if "clockwise" in t or t == "cw" or " cw" in t:
+        return "cw"
+    return None
+
+
+class HandGestures:
+    """
+    One frame's perception, shared by every controller. Arrays are views of
+    the engine's reused buffers: valid until the next perceive() call.
+        landmarks   (n, 21, 2) int pixel coords;  brects (n, 4)
+        open_palm / thumbs_up / thumbs_down  (n,) bool
+        signs       keypoint-classifier labels;  gestures  voted point-history labels
+        tracks      stable HandTracker tracks;  labels  MediaPipe handedness
+    and per-frame aggregates: pointing, spin (SPIN_KEYWORDS match or None),
+    thumbs_up_any (a thumbs-up that isn't also an open palm).
+    `evaluated` holds the classifier stages that ran; a skipped stage leaves
+    its labels "" (and pointing / spin unset).
+    """
+    def __init__(self):
+        self.n = 0
+        self.width = self.height = 0
+        self.labels = ()
+        self.tracks = []
+        self.landmarks = self.brects = None
+        self.geometry = None
+        self.open_palm = self.thumbs_up = self.thumbs_down = np.zeros(0, dtype=bool)
+        self.signs = []
+        self.gestures = []
+        self.pointing = False
+        self.spin = None
+        self.thumbs_up_any = False
+        self.evaluated = ALL_STAGES
+
+
+class GestureEngine:
+    """
+    Landmarks -> HandGestures. Fill self.landmarks (live MediaPipe or a
+    recording), then call perceive(). The classifiers take an
+    (n_hands, features) batch (see BatchClassifier).
+    """
+    def __init__(self, keypoint_classifier, point_history_classifier,
+                 keypoint_classifier_labels, point_history_classifier_labels,
+                 max_hands=2, history_length=16, timer=None, datalog=None, smoothing=None,
+                 planner=None):
+        self.keypoint_classifier = keypoint_classifier
+        self.point_history_classifier = point_history_classifier
+        self.keypoint_classifier_labels = keypoint_classifier_labels
+        self.point_history_classifier_labels = point_history_classifier_labels
+        self.history_length = history_length
+        self.timer = timer or StageTimer()
+        # optional TrainingLogger for modes 1 (keypoint) / 2 (point history)
+        self.datalog = datalog
+        self._sample = None
+        # optional EvaluationPlanner; None runs both classifiers on every frame
+        self.planner = planner
+
+        self.landmarks = LandmarkBuffer(max_hands)
+        # per-hand point history + gesture vote live on stable tracks, not on the
+        # Left/Right label (which MediaPipe swaps, and two performers share)
+        self.tracker = HandTracker(history_length, max_tracks=max(4, 2 * max_hands))
+        # optional LandmarkFilter: per-track smoothing / prediction before the rules
+        self.smoothing = smoothing
+        if smoothing is not None:
+            smoothing.reserve(self.tracker.max_tracks)
+
+        # reused per-frame buffers, one row per hand: no deepcopy / list building
+        # in the hot path, and each classifier runs once on the whole batch
+        self._landmark_features = landmark_feature_buffer(max_hands)
+        self._history_features = point_history_feature_buffer(history_length, max_hands)
+        self._history_valid = np.zeros(max_hands, dtype=bool)
+        self._gestures = HandGestures()
+
+    def request_sample(self, mode, number):
+        """Log the next frame's features under label `number` (any thread)."""
+        self._sample = (mode, number)
+
+    def perceive(self, hand_labels, image_width, image_height, now=None):
+        """
+        Classify and run the rule detectors on the hands in self.landmarks.
+        `now` (frame time, s) drives the smoothing filter; default: perf_counter.
+        """
+        timer = self.timer
+        t_start = time.perf_counter()
+        t_keypoint = t_history = t_smoothing = 0.0
+
+        g = self._gestures
+        n_hands = self.landmarks.n
+        g.n, g.width, g.height, g.labels = n_hands, image_width, image_height, hand_labels
+        g.signs, g.gestures = [], []
+        g.pointing, g.spin, g.thumbs_up_any = False, None, False
+        brects = ()
+        if n_hands:
+            landmark_lists = self.landmarks.pixels(image_width, image_height)
+            brects = self.landmarks.brects()
+        # match hands to tracks every frame, so lost tracks age out even with no hands
+        tracks = g.tracks = self.tracker.update(brects, hand_labels)
+        if n_hands and self.smoothing is not None:
+            # tracks are matched on the raw boxes; everything downstream sees filtered points
+            t_smooth = time.perf_counter()
+            self.smoothing.apply(tracks, self.landmarks.norm[:n_hands, :, :2],
+                                 time.perf_counter() if now is None else now)
+            landmark_lists = self.landmarks.pixels(image_width, image_height)
+            brects = self.landmarks.brects()
+            t_smoothing = time.perf_counter() - t_smooth
+            timer.add("smoothing", t_smoothing)
+        if not n_hands:
+            g.landmarks = g.brects = g.geometry = None
+            g.open_palm = g.thumbs_up = g.thumbs_down = np.zeros(0, dtype=bool)
+            g.evaluated = NO_STAGES
+        else:
+            g.landmarks, g.brects = landmark_lists, brects
+            # one batched geometry pass feeds every rule detector
+            geometry = g.geometry = HandGeometry(landmark_lists)
+            g.open_palm = geometry.open_palm()
+            g.thumbs_up = geometry.thumbs_up()
+            g.thumbs_down = geometry.thumbs_down()
+            g.thumbs_up_any = bool((g.thumbs_up & ~g.open_palm).any())
+
+            # taken once: request_sample() runs on another thread, and a sample
+            # needs every stage's features
+            sample, self._sample = self._sample, None
+            # cheap checks first: with the geometry known, ask which models matter
+            need = ALL_STAGES
+            if self.planner is not None and sample is None:
+                need = self.planner.plan(g)
+            g.evaluated = need
+            run_history = HISTORY_STAGE in need
+            hand_sign_ids = None
+
+            if KEYPOINT_STAGE in need:
+                # Hand sign classification (static): every hand in one batch
+                landmark_features = self._landmark_features[:n_hands]
+                for i in range(n_hands):
+                    pre_process_landmark(landmark_lists[i], out=landmark_features[i])
+                t_clf = time.perf_counter()
+                hand_sign_ids = self.keypoint_classifier(landmark_features)
+                t_keypoint = time.perf_counter() - t_clf
+                timer.add("keypoint_classifier", t_keypoint)
+
+            # Per-hand point histories (index tip if "Point" id==2), then one
+            # batch for the temporal classifier. Without signs the timeline
+            # still advances, with [0, 0] like any non-pointing frame.
+            history_length = self.history_length
+            history_features = self._history_features[:n_hands]
+            history_valid = self._history_valid[:n_hands]
+            for i in range(n_hands):
+                points = tracks[i].points
+                if hand_sign_ids is not None and hand_sign_ids[i] == 2:
+                    points.append(landmark_lists[i, 8, 0], landmark_lists[i, 8, 1])
+                else:
+                    points.append(0, 0)
+                if run_history:
+                    # points are stored pre-normalized; only the oldest-point offset is applied here
+                    pre_processed_point_history_list = points.features(
+                        image_width, image_height, out=history_features[i])
+                    history_valid[i] = len(pre_processed_point_history_list) == (history_length * 2)
+
+            # Finger gesture classification (temporal); short histories count as 0
+            finger_gesture_ids = [0] * n_hands
+            if run_history:
+                t_clf = time.perf_counter()
+                if history_valid.all():
+                    finger_gesture_ids = self.point_history_classifier(history_features).tolist()
+                else:
+                    valid = np.flatnonzero(history_valid)
+                    if len(valid):
+                        for i, gesture_id in zip(valid, self.point_history_classifier(history_features[valid])):
+                            finger_gesture_ids[i] = gesture_id
+                t_history = time.perf_counter() - t_clf
+                timer.add("history_classifier", t_history)
+
+            if sample is not None and self.datalog is not None:
+                mode, number = sample
+                if mode == 1:
+                    self.datalog.log(KEYPOINT, number, landmark_features)
+                elif mode == 2 and history_valid.any():
+                    # only full histories: the CSV / shards have fixed-width rows
+                    self.datalog.log(POINT_HISTORY, number, history_features[history_valid])
+
+            for i in range(n_hands):
+                track = tracks[i]
+                hand_sign_text = ""
+                if hand_sign_ids is not None:
+                    hand_sign_text = self.keypoint_classifier_labels[hand_sign_ids[i]]
+                # skipped frames vote 0 too, so a stale spin can't come back when the model resumes
+                track.votes.append(int(finger_gesture_ids[i]))
+                finger_gesture_text = ""
+                if run_history:
+                    finger_gesture_text = self.point_history_classifier_labels[track.votes.most()]
+                g.signs.append(hand_sign_text)
+                g.gestures.append(finger_gesture_text)
+
+                if hand_sign_text.strip().lower() in POINT_LABELS:
+                    g.pointing = True
+                gesture_key = finger_gesture_text.strip().lower()
+                if gesture_key in SPIN_KEYWORDS:
+                    g.spin = gesture_key
+
+        # For any tracked hand NOT seen this frame, keep its timeline moving with [0,0]
+        for track in self.tracker.unseen(tracks):
+            track.points.append(0, 0)
+        # preprocessing + rule detectors, classifier invokes and smoothing excluded
+        timer.add("rules", time.perf_counter() - t_start - t_keypoint - t_history - t_smoothing)
+        return g
+
+
+class EvaluationPlanner:
+    """
+    Chooses each frame's classifier stages. After the geometry pass, every
+    controller's needs(gestures) names the stages whose output could change
+    one of its decisions this frame. The union runs and the rest are
+    skipped. The history model implies the keypoint model, because its input
+    is the index tip of "Point" hands.
+    `extra` (optional, callable -> stages) adds needs from outside the
+    controllers. Skips are counted per hand, for reports and metrics.
+    """
+    def __init__(self, controllers=(), extra=None):
+        self.controllers = list(controllers)
+        self.extra = extra
+        self.hands = 0
+        self.skipped = dict.fromkeys(STAGES, 0)
+
+    def plan(self, gestures):
+        need = set(self.extra()) if self.extra is not None else set()
+        for controller in self.controllers:
+            if need >= ALL_STAGES:
+                break
+            need |= controller.needs(gestures)
+        if HISTORY_STAGE in need:
+            need.add(KEYPOINT_STAGE)
+        self.hands += gestures.n
+        for stage in STAGES:
+            if stage not in need:
+                self.skipped[stage] += gestures.n
+        return frozenset(need)
+
+    def report(self):
+        if not self.hands:
+            return "skipped: -"
+        return "skipped " + "  ".join(f"{stage}:{100.0 * self.skipped[stage] / self.hands:.0f}%"
+                                      for stage in STAGES)
+
+
+class Controller:
+    """
+    One actuator mode driven by HandGestures. update() runs on the inference
+    thread once per frame and returns an optional (text, bgr) status line.
+    needs() runs just before it, when only the geometry is known, and
+    returns the classifier stages update() could use this frame. The default
+    is all of them. hud() is read by the render thread, and close() runs at
+    shutdown.
+    """
+    def needs(self, gestures):
+        return ALL_STAGES
+
+    def update(self, gestures, now, t_frame=None):
+        return None
+
+    def hud(self):
+        return []
+
+    def close(self):
+        pass
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+Shimon's head bob (NECK commands on /head-commands): the bus actuator and
+its gesture controller.
+
+These used to live in app.py. They are here so that anything that drives
+the neck without the vision stack (ShimonSimulator's load test, the decision
+benchmarks) shares the same actuator, rules and defaults:
+
+    bob = HeadBobber(bus, host=HOST, interval=1.0)
+    bob.resume()                 # or bus.publish(GO); STOP / TEMPO likewise
+    control = HeadBobControl(bob, on_start=start_music)   # a GestureEngine Controller
+"""
+import time
+
+from shimon.bus import BeatTask, STOP, GO, TEMPO
+from shimon.gestures import Controller, ALL_STAGES, NO_STAGES
+from shimon.osc import HOST, OscOutput
+
+PORT = 9000
+OSC_PATH = "/head-commands"
+UP_ANGLE = 0.10
+DOWN_ANGLE = -0.10
+SPEED = 3
+
+# Ramped cadence (seconds between bobs)
+INTERVAL_MIN = 0.30   # fastest
+INTERVAL_MAX = 1.20   # slowest
+RAMP_FASTER_PER_S = 0.25  # shrink interval/sec when "Point" (speed up)
+RAMP_SLOWER_PER_S = 0.12  # grow interval/sec otherwise (slow down)
+
+# >>> Thumbs-up gate config
+START_STABLE_FRAMES = 15  # ~0.5s at ~30fps; how long 👍 must be held to start
+SMOOTH_STABLE_FRAMES = 6  # with --smooth: filtered landmarks don't flicker, ~0.2s is enough
+
+
+class HeadBobber:
+    """
+    Head-bob actuator on the shared control bus. pause/resume/set_interval only
+    publish events; state changes and beats all happen on the bus loop thread.
+    """
+    def __init__(self, bus, host=HOST, port=PORT, path=OSC_PATH,
+                 up=UP_ANGLE, down=DOWN_ANGLE, speed=SPEED,
+                 interval=1.0, timer=None):
+        self.bus = bus
+        self.osc = OscOutput.shared(host, port)
+        self.timer = timer
+        # capture time of the frame whose gesture resumed bobbing (gesture -> OSC latency)
+        self._t_gesture = None
+        self.path = path
+        self.up, self.down = float(up), float(down)
+        self.speed = int(speed)
+        # beats on absolute monotonic deadlines; start paused (wait for 👍)
+        self._beats = BeatTask(bus, self._on_beat, float(interval), running=False)
+        bus.subscribe(STOP, self._on_stop)
+        bus.subscribe(GO, self._on_go)
+        bus.subscribe(TEMPO, self._on_tempo)
+
+    @property
+    def running(self):
+        return self._beats.running
+
+    @property
+    def interval(self):
+        return self._beats.interval
+
+    # ---------- any thread: publish ----------
+    def pause(self):
+        self.bus.publish(STOP)
+
+    def resume(self, t_gesture=None):
+        self.bus.publish(GO, t=t_gesture)
+
+    def set_interval(self, new_interval: float):
+        self.bus.publish(TEMPO, interval=float(new_interval))
+
+    def nudge_interval(self, delta: float):
+        self.bus.publish(TEMPO, delta=float(delta))
+
+    def shutdown(self):
+        self._beats.cancel()
+
+    # ---------- bus loop thread ----------
+    def _on_stop(self, event):
+        if self.running:
+            print("[HeadBob] PAUSE")
+        self._beats.pause()
+
+    def _on_go(self, event):
+        if not self.running:
+            print("[HeadBob] RESUME")
+            self._t_gesture = event.t
+        self._beats.resume()
+
+    def _on_tempo(self, event):
+        new_interval = event.data.get("interval", self.interval + event.data.get("delta", 0.0))
+        new_interval = max(INTERVAL_MIN, min(INTERVAL_MAX, new_interval))
+        if abs(new_interval - self.interval) > 1e-6:
+            print(f"[HeadBob] interval -> {new_interval:.2f}s")
+        self._beats.set_interval(new_interval)
+
+    def _on_beat(self, beat):
+        angle = self.up if (beat % 2 == 0) else self.down
+        t0 = time.perf_counter()
+        try:
+            self.osc.send(self.path, ("NECK", angle, self.speed))
+        except Exception as e:
+            print("[OSC ERROR]", e)
+        if self.timer is not None:
+            t_sent = time.perf_counter()
+            self.timer.add("osc_send", t_sent - t0)
+            t_gesture, self._t_gesture = self._t_gesture, None
+            if t_gesture is not None:
+                self.timer.add("gesture_to_osc", t_sent - t_gesture)
+
+
+class StartGate:
+    """
+    Arms on pause/launch. Requires a stable 👍 for N frames to fire once.
+    """
+    def __init__(self, stable_frames=START_STABLE_FRAMES):
+        self.stable_needed = int(max(1, stable_frames))
+        self.stable = 0
+        self.armed = True
+
+    def reset_and_arm(self):
+        self.stable = 0
+        self.armed = True
+
+    def disarm(self):
+        self.armed = False
+        self.stable = 0
+
+    def update(self, thumbs_now: bool) -> bool:
+        """
+        Returns True exactly once when a stable thumbs-up is achieved while armed.
+        """
+        if not self.armed:
+            self.stable = 0
+            return False
+
+        if thumbs_now:
+            self.stable += 1
+            if self.stable >= self.stable_needed:
+                self.disarm()
+                return True
+        else:
+            # decay quickly to avoid accidental holds
+            self.stable = max(0, self.stable - 2)
+        return False
+
+
+class HeadBobControl(Controller):
+    """
+    Head-bob mode: StartGate, STOP/GO and the tempo ramp, driving a
+    HeadBobber (or a VoteBob in a performer process).
+    """
+    def __init__(self, bob, on_start=None, start_frames=START_STABLE_FRAMES):
+        self.bob = bob
+        self.on_start = on_start
+        # >>> Start gate (await thumbs-up)
+        self.start_gate = StartGate(stable_frames=start_frames)
+        # timebase for ramp (monotonic / recording time, never wall-clock)
+        self._last_t = None
+
+    def needs(self, gestures):
+        start_gate = self.start_gate
+        if start_gate.armed:
+            # only a (geometric) 👍 counts while armed; the models matter again
+            # on the frame the gate fires, for that frame's ramp
+            fires = gestures.thumbs_up_any and start_gate.stable + 1 >= start_gate.stable_needed
+            return ALL_STAGES if fires else NO_STAGES
+        if gestures.open_palm.any():
+            return NO_STAGES  # STOP wins and re-arms: no GO and no ramp this frame
+        return ALL_STAGES
+
+    def update(self, gestures, now, t_frame=None):
+        start_gate = self.start_gate
+        bob = self.bob
+        want_stop = bool(gestures.open_palm.any())
+        spin = gestures.spin
+        status = None
+        # >>> START GATE: while armed, ignore other GO signals and wait for stable 👍
+        if start_gate.armed:
+            triggered = start_gate.update(gestures.thumbs_up_any)
+            if triggered:
+                if self.on_start is not None:
+                    self.on_start()   # call your music start
+                bob.resume(t_frame)   # and start bobbing
+            need = max(0, start_gate.stable_needed - start_gate.stable)
+            status = (f"Awaiting 👍 to start ({need} frames)", (0, 200, 255))
+        else:
+            # Apply control: STOP has priority over GO when not awaiting start
+            if want_stop:
+                bob.pause()
+                start_gate.reset_and_arm()  # >>> require another 👍 after stop
+                status = ("SHIMON: STOP (re-armed)", (0, 0, 255))
+            elif gestures.thumbs_up_any or spin:
+                bob.resume(t_frame)
+                msg = "SHIMON: GO"
+                if spin:
+                    msg += " (Spin)"
+                status = (msg, (0, 255, 0))
+
+        # Smoothly ramp the interval (Point from ANY hand speeds up)
+        dt = 0.0 if self._last_t is None else max(0.0, now - self._last_t)
+        self._last_t = now
+
+        if (not start_gate.armed) and (gestures.pointing or spin):
+            bob.nudge_interval(-RAMP_FASTER_PER_S * dt)  # faster (shorter)
+        elif not start_gate.armed:
+            bob.nudge_interval(+RAMP_SLOWER_PER_S * dt)  # slower (longer)
+        return status
+
+    def hud(self):
+        state = "ON" if self.bob.running else "PAUSED"
+        return [(f"Bobbing: {state}", (255, 255, 255)),
+                (f"Interval: {self.bob.interval:.2f}s", (255, 255, 255))]
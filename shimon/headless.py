@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+Keyboard replacement for running without a window (robot host / ssh).
+
+StdinKeys turns characters typed on stdin into the same key codes
+cv.waitKey() would return, so select_mode() and the q/ESC quit check work
+unchanged. Signals are mapped too:
+    SIGINT / SIGTERM -> 'q'   (clean shutdown, OSC threads joined)
+    SIGUSR1          -> cycle logging mode n -> k -> h
+"""
+import queue
+import signal
+import sys
+import threading
+
+_MODE_KEYS = (ord('n'), ord('k'), ord('h'))
+
+
+class StdinKeys:
+    def __init__(self, stream=None, install_signals=True):
+        self.stream = stream if stream is not None else sys.stdin
+        self._keys = queue.SimpleQueue()
+        self._mode_idx = 0
+        self._thr = threading.Thread(target=self._reader, name="stdin-keys", daemon=True)
+        self._thr.start()
+        if install_signals:
+            self._install_signals()
+
+    def _reader(self):
+        try:
+            for line in self.stream:
+                for ch in line.strip():
+                    self._keys.put(ord(ch) & 0xFF)
+        except (OSError, ValueError):
+            pass  # stdin closed / detached (e.g. running under nohup)
+
+    def _install_signals(self):
+        if threading.current_thread() is not threading.main_thread():
+            return
+        signal.signal(signal.SIGINT, self._on_quit)
+        signal.signal(signal.SIGTERM, self._on_quit)
+        if hasattr(signal, "SIGUSR1"):
+            signal.signal(signal.SIGUSR1, self._on_cycle_mode)
+
+    def _on_quit(self, signum, frame):
+        self._keys.put(ord('q'))
+
+    def _on_cycle_mode(self, signum, frame):
+        self._mode_idx = (self._mode_idx + 1) % len(_MODE_KEYS)
+        self._keys.put(_MODE_KEYS[self._mode_idx])
+
+    def poll(self):
+        """Next pending key code, or -1 like cv.waitKey() when nothing was pressed."""
+        try:
+            return self._keys.get_nowait()
+        except queue.Empty:
+            return -1
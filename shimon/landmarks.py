@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Landmark extraction into preallocated arrays.
+
+LandmarkBuffer walks results.multi_hand_landmarks exactly once per frame and
+writes into a (max_hands, 21, 3) float32 buffer that is reused across frames.
+Pixel coordinates and bounding boxes are then derived from it with vectorized
+ops into further reused buffers, replacing calc_landmark_list /
+calc_bounding_rect and their per-landmark Python loops.
+
+The arrays returned by pixels() / brects() are views into the buffer: they
+stay valid until the next fill(). Copy anything that must outlive the frame
+(e.g. a point appended to a history deque).
+"""
+import numpy as np
+
+NUM_LANDMARKS = 21
+
+
+class LandmarkBuffer:
+    def __init__(self, max_hands=2):
+        self.max_hands = max(1, int(max_hands))
+        self.norm = np.zeros((self.max_hands, NUM_LANDMARKS, 3), dtype=np.float32)
+        self._px_f = np.zeros((self.max_hands, NUM_LANDMARKS, 2), dtype=np.float32)
+        self._px = np.zeros((self.max_hands, NUM_LANDMARKS, 2), dtype=np.int32)
+        self._brect = np.zeros((self.max_hands, 4), dtype=np.int32)
+        self._size = np.zeros(2, dtype=np.float32)
+        self._limit = np.zeros(2, dtype=np.float32)
+        self.n = 0
+
+    def fill(self, multi_hand_landmarks, roi=None):
+        """
+        Copy MediaPipe landmarks into the buffer. Returns the number of hands.
+        roi: (x0, y0, w, h) in normalized full-frame units when the landmarks
+        came from a crop (see shimon.roi); they are mapped back to the full frame.
+        """
+        n = 0
+        if multi_hand_landmarks:
+            for hand in multi_hand_landmarks:
+                if n >= self.max_hands:
+                    break
+                self.norm[n] = [(lm.x, lm.y, lm.z) for lm in hand.landmark]
+                n += 1
+        self.n = n
+        if roi is not None and n:
+            x0, y0, w, h = roi
+            norm = self.norm[:n]
+            norm[..., 0] *= w
+            norm[..., 0] += x0
+            norm[..., 1] *= h
+            norm[..., 1] += y0
+            norm[..., 2] *= w  # MediaPipe z is on the same scale as x
+        return n
+
+    def fill_array(self, norm):
+        """Load already-extracted normalized landmarks, shape (n, 21, 2|3)."""
+        norm = np.asarray(norm, dtype=np.float32)
+        n = min(len(norm), self.max_hands)
+        self.norm[:n, :, :norm.shape[2]] = norm[:n]
+        if norm.shape[2] == 2:
+            self.norm[:n, :, 2] = 0.0
+        self.n = n
+        return n
+
+    def pixels(self, image_width, image_height):
+        """
+        (n, 21, 2) int32 pixel coords, same rounding as the old calc_landmark_list:
+        truncate toward zero, then clamp to width-1 / height-1.
+        """
+        n = self.n
+        self._size[0], self._size[1] = image_width, image_height
+        self._limit[0], self._limit[1] = image_width - 1, image_height - 1
+        px_f = self._px_f[:n]
+        np.multiply(self.norm[:n, :, :2], self._size, out=px_f)
+        np.trunc(px_f, out=px_f)
+        np.minimum(px_f, self._limit, out=px_f)
+        px = self._px[:n]
+        px[...] = px_f
+        return px
+
+    def brects(self):
+        """(n, 4) [x1, y1, x2, y2] boxes from the last pixels() call (cv.boundingRect semantics)."""
+        n = self.n
+        px = self._px[:n]
+        out = self._brect[:n]
+        np.min(px, axis=1, out=out[:, 0:2])
+        np.max(px, axis=1, out=out[:, 2:4])
+        out[:, 2:4] += 1
+        return out
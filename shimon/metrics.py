@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+Latency histograms for show-time diagnosis, exposed Prometheus-style.
+
+StageTimer forwards every stage sample to a Metrics sink, so each existing
+`timer.stage(...)` / `timer.add(...)` call also lands in a cumulative
+histogram. The histograms are served as text on http://127.0.0.1:<port>/metrics
+and, when a trace path is given, every sample is appended to a JSONL file:
+
+    {"t": 12.345678, "stage": "hands", "ms": 6.12}
+
+`t` is perf_counter seconds, i.e. the same clock as Frame.t_capture.
+Gauges are callables evaluated at scrape time (dropped frames, OSC counts),
+so nothing is polled between scrapes.
+"""
+import bisect
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# seconds; spans a 0.5 ms OSC send up to a 1 s stall
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.002, 0.005, 0.010, 0.020, 0.033, 0.050,
+                   0.100, 0.200, 0.500, 1.0)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot: > largest bucket
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def quantile(self, q):
+        """Upper bucket bound containing quantile q (None when empty)."""
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class Metrics:
+    def __init__(self, prefix="shimon", buckets=DEFAULT_BUCKETS, trace_path=None):
+        self.prefix = prefix
+        self.buckets = tuple(buckets)
+        self._hists = {}
+        self._gauges = {}
+        self._lock = threading.Lock()
+        self._trace = open(trace_path, "a", encoding="utf-8") if trace_path else None
+
+    def observe(self, stage, seconds, t=None):
+        with self._lock:
+            hist = self._hists.get(stage)
+            if hist is None:
+                hist = self._hists[stage] = Histogram(self.buckets)
+            hist.observe(seconds)
+            if self._trace is not None and t is not None:
+                self._trace.write(json.dumps({"t": round(t, 6), "stage": stage,
+                                              "ms": round(seconds * 1000.0, 3)}) + "\n")
+
+    def gauge(self, name, fn, help_text=""):
+        """Register fn() -> number, read on every scrape."""
+        with self._lock:
+            self._gauges[name] = (fn, help_text)
+
+    def render(self):
+        """Prometheus text exposition format."""
+        p = self.prefix
+        lines = [f"# HELP {p}_stage_seconds Per-stage latency (end_to_end / gesture_to_osc are "
+                 f"measured from the frame capture timestamp)",
+                 f"# TYPE {p}_stage_seconds histogram"]
+        with self._lock:
+            for stage, hist in self._hists.items():
+                label = f'stage="{stage}"'
+                cumulative = 0
+                for bound, n in zip(hist.buckets, hist.counts):
+                    cumulative += n
+                    lines.append(f'{p}_stage_seconds_bucket{{{label},le="{bound:g}"}} {cumulative}')
+                lines.append(f'{p}_stage_seconds_bucket{{{label},le="+Inf"}} {hist.count}')
+                lines.append(f"{p}_stage_seconds_sum{{{label}}} {hist.sum:.6f}")
+                lines.append(f"{p}_stage_seconds_count{{{label}}} {hist.count}")
+            gauges = list(self._gauges.items())
+        for name, (fn, help_text) in gauges:
+            try:
+                value = float(fn())
+            except Exception:
+                continue
+            if help_text:
+                lines.append(f"# HELP {p}_{name} {help_text}")
+            lines.append(f"# TYPE {p}_{name} gauge")
+            lines.append(f"{p}_{name} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """{stage: (p50_s, p99_s, count)} from the bucket bounds."""
+        with self._lock:
+            return {s: (h.quantile(0.5), h.quantile(0.99), h.count) for s, h in self._hists.items()}
+
+    def close(self):
+        with self._lock:
+            if self._trace is not None:
+                self._trace.close()
+                self._trace = None
+
+
+class MetricsServer:
+    """Serves metrics.render() at /metrics from a daemon thread (localhost only by default)."""
+    def __init__(self, metrics, port, host="127.0.0.1"):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass  # no per-scrape console spam
+
+        self.httpd = ThreadingHTTPServer((host, int(port)), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self._thr = threading.Thread(target=self.httpd.serve_forever, name="metrics", daemon=True)
+        self._thr.start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
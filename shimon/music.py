@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+"""
+Gesture-controlled music on Shimon's arm (/arm [midi_note, velocity]).
+
+MusicPlayer runs its beats as a BeatTask on the shared EventBus. It replaces
+the per-script MusicPlayer threads. A pattern is a list of steps and each
+beat plays one step: a single note (an arpeggio) or several notes sent as
+one OSC bundle (a chord).
+
+Each (pattern, velocity) is compiled once by compile_schedule() into a
+Schedule of pre-encoded datagrams, kept in an LRU cache. Tempo is not part
+of it: the BeatTask interval times MusicPlayer's beats, and
+schedule_timing() gives the (offsets, period) for scripts that run their own
+loop. Playback only indexes into the current Schedule. Mode and velocity
+changes swap in another Schedule with one attribute store, so a beat never
+sees a half-updated sequence and does no per-note encoding.
+
+MusicControl is the gesture -> player controller that ShimonMasterHandGestures
+(arpeggios) and ShimonVelocityTester (chords + hand-height dynamics) used to
+implement separately:
+  * an open palm held for `stop_hold` seconds stops playback;
+  * thumbs up / thumbs down / finger spin switch to a pattern;
+  * with `dynamics`, the highest wrist sets the velocity (higher = louder).
+"""
+from collections import namedtuple
+from functools import lru_cache
+
+from shimon.bus import BeatTask
+from shimon.gestures import Controller, HISTORY_STAGE, NO_STAGES, spin_direction
+from shimon.geometry import WRIST
+from shimon.osc import OscOutput, encode_bundle, encode_message
+
+MUSIC_PORT = 9010
+OSC_ARM_PATH = "/arm"
+STOPPED = "stopped"
+BPM_MIN, BPM_MAX = 30.0, 300.0
+
+
+def arpeggio(root=60, intervals=(0, 4, 7), octaves=1, direction="updown"):
+    """MIDI notes of a triad arpeggio capped by the top root: "up", "down" or "updown"."""
+    notes_up = []
+    for o in range(octaves):
+        notes_up += [root + 12 * o + i for i in intervals]
+    notes_up.append(root + 12 * octaves)
+    if direction == "up":
+        return notes_up
+    if direction == "down":
+        return list(reversed(notes_up))
+    if direction == "updown":
+        return notes_up + list(reversed(notes_up[:-1]))
+    raise ValueError("direction must be 'up', 'down', or 'updown'")
+
+
+# mode -> steps; one step per beat
+ARPEGGIOS = {
+    "arp_cmaj": [(n,) for n in arpeggio(60, (0, 4, 7))],
+    "arp_cmin": [(n,) for n in arpeggio(60, (0, 3, 7))],
+    "arp_gmaj": [(n,) for n in arpeggio(67, (0, 4, 7))],
+    "arp_caug": [(n,) for n in arpeggio(60, (0, 4, 8))],
+    "arp_cdim": [(n,) for n in arpeggio(60, (0, 3, 6))],
+}
+CHORDS = {
+    "chord_cmaj": [(60, 64, 67)],   # C E G
+    "chord_cmin": [(60, 63, 67)],   # C Eb G
+    "chord_gmaj": [(67, 71, 74)],   # G B D
+    "chord_caug": [(60, 64, 68)],   # C E G#
+    "chord_cdim": [(60, 63, 66)],   # C Eb Gb
+}
+
+
+# datagrams[i] is step i of the pattern; keys[i] is the OscOutput dedupe key
+# (the path for single notes, None for bundles)
+Schedule = namedtuple("Schedule", "datagrams keys")
+
+
+@lru_cache(maxsize=256)
+def compile_schedule(path, steps, velocity):
+    """
+    Schedule for `steps` (a tuple of note tuples), one datagram per step.
+    Cached: velocity follows the hand in MusicControl, so one pattern sees a
+    few dozen velocities. Tempo changes don't recompile (see schedule_timing).
+    """
+    velocity = int(max(0, min(127, velocity)))
+    datagrams, keys = [], []
+    for notes in steps:
+        if len(notes) == 1:
+            datagrams.append(encode_message(path, (int(notes[0]), velocity)))
+            keys.append(path)
+        else:
+            # all notes of a chord in one bundle, so they land together
+            datagrams.append(encode_bundle([(path, (int(n), velocity)) for n in notes]))
+            keys.append(None)
+    return Schedule(tuple(datagrams), tuple(keys))
+
+
+def schedule_timing(n_steps, bpm, gap=0.0):
+    """
+    (offsets, period): step i goes out at offsets[i] s into each cycle of
+    `period` s, one step per beat at `bpm` plus `gap` s of rest at the end.
+    """
+    beat = 60.0 / float(bpm)
+    return tuple(i * beat for i in range(n_steps)), n_steps * beat + float(gap)
+
+
+class MusicPlayer:
+    """
+    Plays `patterns[mode]` one step per beat. Control calls may come from any
+    thread; they are applied on the bus loop, where the beats run.
+    """
+    def __init__(self, bus, host, port, path=OSC_ARM_PATH, patterns=ARPEGGIOS, mode=None,
+                 bpm=120.0, velocity=100):
+        self.bus = bus
+        self.osc = OscOutput.shared(host, port)
+        self.path = path
+        # hashable steps: compile_schedule() is keyed on them
+        self.patterns = {m: tuple(tuple(int(n) for n in notes) for notes in steps)
+                         for m, steps in patterns.items()}
+        self.default_mode = mode or next(iter(self.patterns))
+        self._mode = self.default_mode
+        self._bpm = float(bpm)
+        self._vel = int(velocity)
+        self._idx = 0
+        self._schedule = None
+        self._reschedule()
+        self._beats = BeatTask(bus, self._on_beat, 60.0 / self._bpm, running=True)
+
+    @property
+    def mode(self):
+        return self._mode
+
+    @property
+    def velocity(self):
+        return self._vel
+
+    @property
+    def running(self):
+        return self._beats.running
+
+    # ---------- any thread ----------
+    def set_mode(self, mode):
+        self.bus.call(self._set_mode, mode)
+
+    def pause(self):
+        self.bus.call(self._pause)
+
+    def resume(self):
+        self.bus.call(self._resume)
+
+    def set_velocity(self, velocity):
+        self.bus.call(self._set_velocity, int(max(0, min(127, velocity))))
+
+    def set_bpm(self, bpm):
+        # takes effect from the next beat boundary
+        self.bus.call(self._set_bpm, max(BPM_MIN, min(BPM_MAX, float(bpm))))
+
+    def shutdown(self):
+        self._beats.cancel()
+
+    # ---------- bus loop thread ----------
+    def _set_mode(self, mode):
+        if mode != STOPPED and mode not in self.patterns:
+            return
+        if mode != self._mode:
+            print(f"[Player] mode -> {mode}")
+        self._mode = mode
+        if mode == STOPPED:
+            self._beats.pause()
+        else:
+            self._reschedule()
+            self._beats.resume()
+
+    def _set_velocity(self, velocity):
+        self._vel = velocity
+        self._reschedule()
+
+    def _set_bpm(self, bpm):
+        self._bpm = bpm
+        self._beats.set_interval(60.0 / bpm)
+
+    def _reschedule(self):
+        steps = self.patterns.get(self._mode)
+        # a single store: _on_beat reads either the old schedule or the new one
+        self._schedule = compile_schedule(self.path, steps, self._vel) if steps else None
+
+    def _pause(self):
+        if self._mode != STOPPED:
+            print("[Player] STOP")
+        self._mode = STOPPED
+        self._beats.pause()
+
+    def _resume(self):
+        if self._mode == STOPPED:
+            self._mode = self.default_mode
+            print(f"[Player] RESUME → {self._mode}")
+            self._reschedule()
+        self._beats.resume()
+
+    def _on_beat(self, beat):
+        schedule = self._schedule
+        if schedule is None:
+            return
+        i = self._idx % len(schedule.datagrams)
+        self._idx = i + 1
+        try:
+            self.osc.send_raw(schedule.datagrams[i], schedule.keys[i])
+        except Exception as e:
+            print("[OSC ERROR]", e)
+
+
+class MusicControl(Controller):
+    def __init__(self, player, thumbs_up=None, thumbs_down=None, spin=None, stop_hold=2.0,
+                 dynamics=False, vel_min=30, vel_max=120, smoothing=0.2):
+        self.player = player
+        self.thumbs_up, self.thumbs_down, self.spin = thumbs_up, thumbs_down, spin
+        self.stop_hold = float(stop_hold)
+        self.dynamics = dynamics
+        self.vel_min, self.vel_max = int(vel_min), int(vel_max)
+        self.smoothing = float(smoothing)
+        self.velocity = None
+        self._stop_since = None
+        self._spin_stages = frozenset((HISTORY_STAGE,))
+
+    def needs(self, gestures):
+        # stop, thumbs up / down and dynamics are geometric; only spin uses a model,
+        # and an open palm overrides any switch
+        if not self.spin or gestures.open_palm.any():
+            return NO_STAGES
+        return self._spin_stages
+
+    def update(self, gestures, now, t_frame=None):
+        want_stop = False
+        switch_to = None
+        highest = None
+        for i in range(gestures.n):
+            if gestures.open_palm[i]:
+                want_stop = True
+            elif gestures.thumbs_up[i] and self.thumbs_up:
+                switch_to = self.thumbs_up
+            elif gestures.thumbs_down[i] and self.thumbs_down:
+                switch_to = self.thumbs_down
+            if self.spin and spin_direction(gestures.gestures[i]):
+                switch_to = self.spin
+            wrist = gestures.landmarks[i, WRIST, 1] / float(gestures.height)
+            if highest is None or wrist < highest:
+                highest = wrist
+
+        status = None
+        if want_stop:
+            if self._stop_since is None:
+                self._stop_since = now
+            held = now - self._stop_since
+            if held >= self.stop_hold:
+                self.player.pause()
+                status = ("PLAYBACK: STOP", (0, 0, 255))
+                self._stop_since = None  # the next open hand needs a fresh hold
+            else:
+                status = (f"Open hand: stopping in {self.stop_hold - held:.1f}s", (0, 200, 255))
+        else:
+            if self._stop_since is not None:
+                status = ("Stop canceled", (255, 255, 0))
+            self._stop_since = None
+            if switch_to is not None:
+                self.player.set_mode(switch_to)
+                status = (f"MODE: {switch_to}", (0, 255, 0))
+
+        if self.dynamics and highest is not None:
+            target = int(round(self.vel_min + (1.0 - highest) * (self.vel_max - self.vel_min)))
+            previous = self.velocity
+            if previous is None:
+                self.velocity = target
+            else:
+                self.velocity = int(round(previous * (1 - self.smoothing) + target * self.smoothing))
+            if self.velocity != previous:
+                self.player.set_velocity(self.velocity)
+        return status
+
+    def hud(self):
+        lines = [(f"Mode: {self.player.mode}", (255, 255, 255))]
+        if self.dynamics and self.velocity is not None:
+            lines.append((f"Dynamics (vel): {self.velocity}", (255, 255, 0)))
+        return lines
+
+    def close(self):
+        self.player.shutdown()
+
+
+def arpeggio_control(bus, host, port, path=OSC_ARM_PATH, bpm=120.0):
+    """ShimonMasterHandGestures: 👍 -> C dim, 👎 -> C min arpeggio; ✋ held 2 s stops."""
+    player = MusicPlayer(bus, host, port, path, ARPEGGIOS, "arp_cmaj", bpm=bpm, velocity=100)
+    return MusicControl(player, thumbs_up="arp_cdim", thumbs_down="arp_cmin")
+
+
+def chord_control(bus, host, port, path=OSC_ARM_PATH, bpm=120.0):
+    """ShimonVelocityTester: 👍 -> C dim, 👎 -> C min, spin -> C maj chords; hand height -> velocity."""
+    player = MusicPlayer(bus, host, port, path, CHORDS, "chord_cmaj", bpm=bpm, velocity=80)
+    return MusicControl(player, thumbs_up="chord_cdim", thumbs_down="chord_cmin",
+                        spin="chord_cmaj", dynamics=True)
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+Shared OSC output: one non-blocking UDP socket per destination.
+
+Every sender (HeadBobber, MusicPlayer, the arpeggio script) goes through
+OscOutput.shared(host, port) instead of its own SimpleUDPClient:
+  * messages are encoded once and cached by (address, args);
+  * simultaneous events (chord notes, neck + arm on one port) go out as a
+    single OSC bundle datagram instead of N sends with sleeps in between;
+  * an identical message to the same address inside `dedupe_s` is coalesced,
+    and a token bucket caps the datagram rate so the robot's UDP receiver
+    is never flooded. Dropped/coalesced counts are kept for reporting.
+"""
+import socket
+import threading
+import time
+from functools import lru_cache
+
+from pythonosc import osc_bundle_builder
+from pythonosc import osc_message_builder
+
+HOST = "192.168.1.1"   # <-- set your robot IP (app.py / ShimonSimulator --host override it)
+
+IMMEDIATELY = osc_bundle_builder.IMMEDIATELY
+
+
+@lru_cache(maxsize=1024)
+def _encode_message(address, args, types=None):
+    # `types` only keys the cache: 1, 1.0 and True hash equal but encode differently
+    builder = osc_message_builder.OscMessageBuilder(address=address)
+    for a in args:
+        builder.add_arg(a)
+    return builder.build()
+
+
+def encode_message(address, args=()):
+    """OSC datagram bytes for address + args (cached; args must be hashable scalars)."""
+    args = tuple(args)
+    return _encode_message(address, args, tuple(map(type, args))).dgram
+
+
+@lru_cache(maxsize=256)
+def _encode_bundle(messages, timetag):
+    builder = osc_bundle_builder.OscBundleBuilder(timetag)
+    for address, args, types in messages:
+        builder.add_content(_encode_message(address, args, types))
+    return builder.build().dgram
+
+
+def encode_bundle(messages, timetag=IMMEDIATELY):
+    """
+    One bundle datagram for [(address, args), ...]. timetag is OSC time
+    (seconds since epoch, or IMMEDIATELY); only immediate bundles are cached
+    usefully, timed ones are unique per call anyway.
+    """
+    return _encode_bundle(tuple((a, tuple(v), tuple(map(type, v))) for a, v in messages), timetag)
+
+
+class OscOutput:
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, host, port, max_rate=200.0, dedupe_s=0.02, clock=time.monotonic):
+        self.address = (host, int(port))
+        self.max_rate = float(max_rate)
+        self.dedupe_s = float(dedupe_s)
+        self.clock = clock
+        self.sent = 0
+        self.coalesced = 0
+        self.rate_limited = 0
+        self.dropped = 0  # socket buffer full (non-blocking send would have blocked)
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.setblocking(False)
+        self._lock = threading.Lock()
+        self._last = {}  # osc address -> (datagram, t)
+        self._tokens = self.max_rate
+        self._t_tokens = clock()
+
+    @classmethod
+    def shared(cls, host, port, **kwargs):
+        """Process-wide output for (host, port); created on first use."""
+        key = (host, int(port))
+        with cls._instances_lock:
+            out = cls._instances.get(key)
+            if out is None:
+                out = cls._instances[key] = cls(host, port, **kwargs)
+            return out
+
+    # ---------- sending ----------
+    def send(self, address, args=()):
+        """Send one message. Returns False if it was coalesced or dropped."""
+        return self._send(address, encode_message(address, args))
+
+    def send_bundle(self, messages, timetag=IMMEDIATELY):
+        """Send [(address, args), ...] as one timetagged bundle datagram."""
+        if not messages:
+            return False
+        return self._send(None, encode_bundle(messages, timetag))
+
+    def send_raw(self, dgram, key=None):
+        """Send pre-encoded bytes (e.g. from a cached schedule)."""
+        return self._send(key, dgram)
+
+    def _send(self, key, dgram):
+        now = self.clock()
+        with self._lock:
+            if key is not None and self.dedupe_s > 0:
+                last = self._last.get(key)
+                if last is not None and last[0] == dgram and (now - last[1]) < self.dedupe_s:
+                    self.coalesced += 1
+                    return False
+            if self.max_rate > 0:
+                self._tokens = min(self.max_rate,
+                                   self._tokens + (now - self._t_tokens) * self.max_rate)
+                self._t_tokens = now
+                if self._tokens < 1.0:
+                    self.rate_limited += 1
+                    return False
+                self._tokens -= 1.0
+            if key is not None:
+                self._last[key] = (dgram, now)
+            # sent under the lock so datagrams leave in call order across threads
+            try:
+                self._sock.sendto(dgram, self.address)
+            except BlockingIOError:
+                self.dropped += 1
+                return False
+            self.sent += 1
+            return True
+
+    def stats(self):
+        return {"sent": self.sent, "coalesced": self.coalesced,
+                "rate_limited": self.rate_limited, "dropped": self.dropped}
+
+    def close(self):
+        with OscOutput._instances_lock:
+            if OscOutput._instances.get(self.address) is self:
+                del OscOutput._instances[self.address]
+        self._sock.close()
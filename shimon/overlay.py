@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Batched overlay drawing for the preview window.
+
+draw_landmarks used to make two cv.line calls per bone and two cv.circle calls
+per joint, which is more than 80 OpenCV calls per hand. draw_hand() gathers every bone
+from the HAND_BONES index array. It draws them with one cv.polylines per
+style (black outline, white core). A zero-length thick polyline is a filled
+disc, so the joints are drawn the same way from (i, i) index pairs: a black
+disc with a white one a pixel smaller on top, one call per radius and colour.
+
+Text is the other per-frame cost: the HUD puts the same strings (FPS, mode,
+interval, labels) twice, outline and fill, every frame. TextCache rasterizes
+each distinct (text, style) once into a small premultiplied BGR patch with its
+alpha. It then composites that patch, so a line is only rasterized again when
+its value changes.
+"""
+from collections import OrderedDict
+
+import cv2 as cv
+import numpy as np
+
+from shimon.geometry import TH_TIP, IX_TIP, MI_TIP, RI_TIP, PI_TIP
+
+# (from, to) landmark indices: thumb, index, middle, ring, little, palm
+HAND_BONES = np.array([
+    (2, 3), (3, 4),
+    (5, 6), (6, 7), (7, 8),
+    (9, 10), (10, 11), (11, 12),
+    (13, 14), (14, 15), (15, 16),
+    (17, 18), (18, 19), (19, 20),
+    (0, 1), (1, 2), (2, 5), (5, 9), (9, 13), (13, 17), (17, 0),
+], dtype=np.intp)
+
+FINGERTIPS = (TH_TIP, IX_TIP, MI_TIP, RI_TIP, PI_TIP)
+JOINT_RADIUS, TIP_RADIUS = 5, 8
+
+
+# (i, i) pairs: thickness 2r on a zero-length segment is exactly cv.circle(r, -1)
+_TIP_DOTS = np.array([(i, i) for i in FINGERTIPS], dtype=np.intp)
+_JOINT_DOTS = np.array([(i, i) for i in range(21) if i not in FINGERTIPS], dtype=np.intp)
+
+
+def draw_hand(image, landmarks):
+    """Skeleton of one (21, 2) pixel hand: 2 calls for the bones, 4 for the joints."""
+    pts = np.asarray(landmarks, dtype=np.int32)
+    if len(pts) != 21:
+        return image
+    bones = pts[HAND_BONES]                     # (21, 2, 2): one 2-point polyline per bone
+    cv.polylines(image, bones, False, (0, 0, 0), 6)
+    cv.polylines(image, bones, False, (255, 255, 255), 2)
+    for dots, radius in ((_JOINT_DOTS, JOINT_RADIUS), (_TIP_DOTS, TIP_RADIUS)):
+        dots = pts[dots]
+        # 1-px black rim, like the old fill + outline circle pair
+        cv.polylines(image, dots, False, (0, 0, 0), 2 * radius)
+        cv.polylines(image, dots, False, (255, 255, 255), 2 * (radius - 1))
+    return image
+
+
+class TextCache:
+    """
+    put() is a drop-in for cv.putText with an optional outline pass
+    (outline = extra thickness drawn in black underneath, like the HUD's
+    4-px / 2-px pairs). Entries are kept in LRU order, up to `maxsize`.
+    Use one cache per thread: entries are shared by reference, not copied.
+    """
+    def __init__(self, maxsize=128, font=cv.FONT_HERSHEY_SIMPLEX):
+        self.maxsize = int(maxsize)
+        self.font = font
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def put(self, image, text, org, scale, color, thickness=1, outline=0):
+        key = (text, float(scale), tuple(color), int(thickness), int(outline))
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            entry = self._entries[key] = self._rasterize(*key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        patch, inv_alpha, (dx, dy) = entry
+        self._composite(image, patch, inv_alpha, org[0] - dx, org[1] - dy)
+        return image
+
+    def _rasterize(self, text, scale, color, thickness, outline):
+        width = max(thickness, outline)
+        (w, h), baseline = cv.getTextSize(text, self.font, scale, width)
+        pad = width + 2
+        size = (h + baseline + 2 * pad, w + 2 * pad)
+        org = (pad, pad + h)                     # baseline origin inside the patch
+        patch = np.zeros(size + (3,), dtype=np.uint8)
+        alpha = np.zeros(size, dtype=np.uint8)
+        if outline:
+            cv.putText(patch, text, org, self.font, scale, (0, 0, 0), outline, cv.LINE_AA)
+            cv.putText(alpha, text, org, self.font, scale, 255, outline, cv.LINE_AA)
+        # drawn over black, the fill pass is already premultiplied by its coverage
+        cv.putText(patch, text, org, self.font, scale, color, thickness, cv.LINE_AA)
+        cv.putText(alpha, text, org, self.font, scale, 255, thickness, cv.LINE_AA)
+        inv_alpha = cv.merge([255 - alpha] * 3)
+        return patch, inv_alpha, org
+
+    @staticmethod
+    def _composite(image, patch, inv_alpha, x, y):
+        h, w = patch.shape[:2]
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, image.shape[1]), min(y + h, image.shape[0])
+        if x0 >= x1 or y0 >= y1:
+            return
+        px, py = x0 - x, y0 - y
+        roi = image[y0:y1, x0:x1]
+        clip = (slice(py, py + y1 - y0), slice(px, px + x1 - x0))
+        # roi * (1 - alpha) + premultiplied patch, saturating uint8 math
+        cv.add(cv.multiply(roi, inv_alpha[clip], scale=1 / 255.0), patch[clip], dst=roi)
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+Staged capture -> inference -> render pipeline.
+
+Each stage runs on its own thread and hands work to the next one through a
+LatestSlot: a single-entry, latest-frame-wins mailbox. If a downstream stage
+is busy, the older item is dropped (and counted) instead of queueing up, so
+gesture-to-OSC latency stays bounded by roughly one frame per stage.
+"""
+import threading
+import time
+from collections import deque
+
+
+# ===================== Latest-frame-wins mailbox =====================
+class LatestSlot:
+    """Bounded (size 1) queue. put() overwrites, get() blocks until new data."""
+    def __init__(self, name=""):
+        self.name = name
+        self.dropped = 0
+        self.delivered = 0
+        self._item = None
+        self._has_item = False
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def put(self, item, block=False):
+        """
+        Overwrite the pending item (counted as dropped). With block=True, wait
+        for the consumer to take it instead; used for file sources where every
+        frame should be processed.
+        """
+        with self._cond:
+            while block and self._has_item and not self._closed:
+                self._cond.wait(0.1)
+            if self._has_item:
+                self.dropped += 1  # explicit drop: consumer never saw it
+            self._item = item
+            self._has_item = True
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Return the newest item, or None on timeout / after close()."""
+        with self._cond:
+            if not self._has_item and not self._closed:
+                self._cond.wait(timeout)
+            if not self._has_item:
+                return None
+            item, self._item, self._has_item = self._item, None, False
+            self.delivered += 1
+            self._cond.notify_all()  # wake a blocking put()
+            return item
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed and not self._has_item
+
+
+# ===================== Stage timing =====================
+class StageTimer:
+    """
+    Rolling per-stage durations (milliseconds), shared by all pipeline threads.
+        with timer.stage("inference"):
+            results = hands.process(rgb)
+    Samples are also forwarded to `metrics` (a shimon.metrics.Metrics) if set.
+    """
+    def __init__(self, window=60, metrics=None):
+        self.window = int(window)
+        self.metrics = metrics
+        self._samples = {}
+        self._order = []
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds):
+        with self._lock:
+            buf = self._samples.get(name)
+            if buf is None:
+                buf = self._samples[name] = deque(maxlen=self.window)
+                self._order.append(name)
+            buf.append(seconds * 1000.0)
+        if self.metrics is not None:
+            self.metrics.observe(name, seconds, time.perf_counter())
+
+    def stage(self, name):
+        return _StageContext(self, name)
+
+    def snapshot(self):
+        """{stage: (mean_ms, max_ms)} in first-seen order."""
+        with self._lock:
+            return {n: (sum(self._samples[n]) / len(self._samples[n]),
+                        max(self._samples[n]))
+                    for n in self._order if self._samples[n]}
+
+    def report(self):
+        return "  ".join(f"{n}:{mean:.1f}ms" for n, (mean, _) in self.snapshot().items())
+
+
+class _StageContext:
+    __slots__ = ("timer", "name", "t0")
+
+    def __init__(self, timer, name):
+        self.timer, self.name = timer, name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timer.add(self.name, time.perf_counter() - self.t0)
+        return False
+
+
+# ===================== Frames & stage threads =====================
+class Frame:
+    """A captured (already mirrored) BGR frame plus its capture timestamp."""
+    __slots__ = ("index", "t_capture", "image")
+
+    def __init__(self, index, t_capture, image):
+        self.index = index
+        self.t_capture = t_capture
+        self.image = image
+
+
+class CaptureThread(threading.Thread):
+    """Reads the camera as fast as it delivers and publishes into a LatestSlot."""
+    def __init__(self, cap, out_slot, timer=None, flip=True, drop_frames=True):
+        super().__init__(name="capture", daemon=True)
+        self.cap = cap
+        self.out = out_slot
+        self.timer = timer or StageTimer()
+        self.flip = flip
+        self.drop_frames = drop_frames  # False: wait for inference, never drop
+        self._halt = threading.Event()
+
+    def run(self):
+        import cv2 as cv
+        index = 0
+        try:
+            while not self._halt.is_set():
+                t0 = time.perf_counter()
+                ret, image = self.cap.read()
+                if not ret:
+                    break
+                t_read = time.perf_counter()
+                self.timer.add("capture", t_read - t0)
+                if self.flip:
+                    image = cv.flip(image, 1)
+                    self.timer.add("flip", time.perf_counter() - t_read)
+                else:
+                    image = image.copy()  # the source may reuse its buffer on the next read
+                self.out.put(Frame(index, t0, image), block=not self.drop_frames)
+                index += 1
+        finally:
+            self.out.close()
+
+    def stop(self):
+        self._halt.set()
+
+
+class WorkerThread(threading.Thread):
+    """Pulls the newest item from in_slot, applies fn, pushes the result to out_slot."""
+    def __init__(self, name, fn, in_slot, out_slot, poll=0.1):
+        super().__init__(name=name, daemon=True)
+        self.fn = fn
+        self.inp = in_slot
+        self.out = out_slot
+        self.poll = poll
+        self.error = None
+        self._halt = threading.Event()
+
+    def run(self):
+        try:
+            while not self._halt.is_set():
+                item = self.inp.get(timeout=self.poll)
+                if item is None:
+                    if self.inp.closed:
+                        break
+                    continue
+                self.out.put(self.fn(item))
+        except Exception as e:  # surface to the render thread instead of dying silently
+            self.error = e
+            print(f"[{self.name} ERROR]", e)
+        finally:
+            self.out.close()
+
+    def stop(self):
+        self._halt.set()
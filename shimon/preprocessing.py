@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+Array versions of pre_process_landmark / pre_process_point_history.
+
+Both work on numpy input and write into caller-owned output buffers, so the
+per-frame hot path does no deepcopy, no itertools.chain and no list building.
+The returned vectors alias `out`: consume them (classifier call) before the
+next frame overwrites the buffer.
+"""
+import numpy as np
+
+NUM_LANDMARKS = 21
+
+
+def landmark_feature_buffer(n=None):
+    """Reusable (42,) float32 output for pre_process_landmark, or (n, 42) for a batch."""
+    shape = NUM_LANDMARKS * 2 if n is None else (int(n), NUM_LANDMARKS * 2)
+    return np.zeros(shape, dtype=np.float32)
+
+
+def pre_process_landmark(landmark_array, out=None):
+    """
+    (21, 2) pixel landmarks -> (42,) wrist-relative coords scaled to [-1, 1]
+    by the largest absolute component (same numbers as the list version).
+    """
+    if out is None:
+        out = landmark_feature_buffer()
+    rel = out.reshape(NUM_LANDMARKS, 2)
+    np.subtract(landmark_array, landmark_array[0], out=rel)
+    max_value = max(out.max(), -out.min())
+    if max_value > 0:
+        np.divide(out, max_value, out=out)
+    return out
+
+
+class PointHistory:
+    """
+    Fixed-length point ring (drop-in for deque(maxlen=n) of [x, y] points).
+    Every point is stored twice, at i and i + maxlen, so the oldest->newest
+    window is always one contiguous slice: view() never copies.
+
+    Alongside the pixels it keeps each point already divided by the frame
+    size, so features() only has to subtract the oldest point: append() is
+    O(1) and nothing is re-normalized as the window slides.
+    """
+    def __init__(self, maxlen, size=(1, 1)):
+        self.maxlen = int(maxlen)
+        self._buf = np.zeros((2 * self.maxlen, 2), dtype=np.int32)
+        self._norm = np.zeros((2 * self.maxlen, 2), dtype=np.float64)
+        self._size = (1, 1)
+        self._head = 0
+        self._len = 0
+        self.set_size(*size)
+
+    def set_size(self, image_width, image_height):
+        """Normalize by a new frame size (re-scales the stored window once)."""
+        size = (image_width, image_height)
+        if size != self._size:
+            self._size = size
+            np.divide(self._buf, size, out=self._norm)
+
+    def append(self, x, y):
+        if self._len < self.maxlen:
+            pos = self._len
+            self._len += 1
+        else:
+            pos = self._head
+            self._head = (self._head + 1) % self.maxlen
+        buf, norm = self._buf, self._norm
+        buf[pos, 0] = buf[pos + self.maxlen, 0] = x
+        buf[pos, 1] = buf[pos + self.maxlen, 1] = y
+        norm[pos, 0] = norm[pos + self.maxlen, 0] = x / self._size[0]
+        norm[pos, 1] = norm[pos + self.maxlen, 1] = y / self._size[1]
+
+    def clear(self):
+        self._head = 0
+        self._len = 0
+
+    def view(self):
+        """(len, 2) int32 points, oldest first. Valid until the next append()."""
+        return self._buf[self._head:self._head + self._len]
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        return iter(self.view().tolist())
+
+    def features(self, image_width, image_height, out=None):
+        """
+        Same vector as pre_process_point_history(self, w, h): one subtraction
+        of the oldest normalized point, written into `out`.
+        """
+        self.set_size(image_width, image_height)
+        n = self._len
+        if out is None:
+            out = point_history_feature_buffer(n)
+        flat = out[:2 * n]
+        if n:
+            window = self._norm[self._head:self._head + n]
+            np.subtract(window, window[0], out=flat.reshape(n, 2), casting="same_kind")
+        return flat
+
+
+def point_history_feature_buffer(history_length, n=None):
+    """
+    Reusable (2 * history_length,) float32 output for pre_process_point_history,
+    or (n, 2 * history_length) for a batch (pass one row per hand as `out`).
+    """
+    shape = int(history_length) * 2 if n is None else (int(n), int(history_length) * 2)
+    return np.zeros(shape, dtype=np.float32)
+
+
+def pre_process_point_history(history, image_width, image_height, out=None, size=None):
+    """
+    PointHistory -> (2 * len,) coords relative to the oldest point, divided by
+    the image size. `size` may be a reused (2,) float32 array holding (w, h).
+    """
+    points = history.view()
+    n = len(points)
+    if out is None:
+        out = point_history_feature_buffer(n)
+    if size is None:
+        size = np.array((image_width, image_height), dtype=np.float32)
+    flat = out[:2 * n]
+    rel = flat.reshape(n, 2)
+    if n:
+        np.subtract(points, points[0], out=rel)
+        np.divide(rel, size, out=rel)
+    return flat
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Compact binary recording of landmark streams, for camera-free replay.
+
+File layout: a 32-byte header followed by fixed-size little-endian records,
+one per frame, so a recording can be np.memmap'ed and indexed directly:
+
+    header : magic b"SHLMREC1", u2 version, u2 max_hands, u2 width, u2 height
+    record : f8 t            seconds since the first recorded frame
+             u1 n            hands in this frame
+             u1 hand[max]    0 = Left, 1 = Right, 255 = unused slot
+             f4 score[max]   handedness score
+             f4 lm[max,21,3] normalized MediaPipe landmarks (x, y, z)
+"""
+import struct
+
+import numpy as np
+
+MAGIC = b"SHLMREC1"
+VERSION = 1
+HEADER_SIZE = 32
+_HEADER = struct.Struct("<8sHHHH")
+
+HANDEDNESS = ("Left", "Right")
+_HAND_CODES = {label: i for i, label in enumerate(HANDEDNESS)}
+NO_HAND = 255
+
+
+def record_dtype(max_hands):
+    return np.dtype([
+        ("t", "<f8"),
+        ("n", "u1"),
+        ("hand", "u1", (max_hands,)),
+        ("score", "<f4", (max_hands,)),
+        ("lm", "<f4", (max_hands, 21, 3)),
+    ])
+
+
+class LandmarkRecorder:
+    """Appends one record per frame from a filled LandmarkBuffer."""
+    def __init__(self, path, max_hands, width, height):
+        self.path = path
+        self.max_hands = int(max_hands)
+        self._f = open(path, "wb")
+        header = _HEADER.pack(MAGIC, VERSION, self.max_hands, int(width), int(height))
+        self._f.write(header.ljust(HEADER_SIZE, b"\0"))
+        self._rec = np.zeros(1, dtype=record_dtype(self.max_hands))  # reused every frame
+        self._t0 = None
+        self.frames = 0
+
+    def write(self, t, landmarks, labels, scores=None):
+        if self._t0 is None:
+            self._t0 = t
+        rec = self._rec[0]
+        n = min(landmarks.n, self.max_hands)
+        rec["t"] = t - self._t0
+        rec["n"] = n
+        rec["hand"][:] = NO_HAND
+        rec["score"][:] = 0.0
+        rec["lm"][:n] = landmarks.norm[:n]
+        for i in range(n):
+            rec["hand"][i] = _HAND_CODES.get(labels[i], NO_HAND)
+            if scores is not None:
+                rec["score"][i] = scores[i]
+        self._f.write(self._rec.data)
+        self.frames += 1
+
+    def close(self):
+        if not self._f.closed:
+            self._f.close()
+
+
+class LandmarkRecording:
+    """Memory-mapped read access to a recording; nothing is loaded up front."""
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            magic, version, max_hands, width, height = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a landmark recording")
+        if version != VERSION:
+            raise ValueError(f"{path}: unsupported recording version {version}")
+        self.path = path
+        self.max_hands = max_hands
+        self.width, self.height = width, height
+        self.frames = np.memmap(path, dtype=record_dtype(max_hands), mode="r", offset=HEADER_SIZE)
+
+    def __len__(self):
+        return len(self.frames)
+
+    def labels(self, i):
+        rec = self.frames[i]
+        return [HANDEDNESS[c] if c < len(HANDEDNESS) else "Unknown" for c in rec["hand"][:rec["n"]]]
+
+    @property
+    def duration(self):
+        return float(self.frames["t"][-1]) if len(self.frames) else 0.0
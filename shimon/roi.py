@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""
+Adaptive inference front end for MediaPipe Hands.
+
+Instead of converting and processing the full frame every time, RoiInference:
+  * once hands are found, feeds only a padded crop around their union box;
+  * downscales whatever it feeds by `scale` (landmarks are normalized, so the
+    scale needs no mapping back; the crop offset does, see LandmarkBuffer.fill);
+  * goes back to a full frame every `full_every` frames (to pick up new hands),
+    and immediately when the crop loses a hand, a hand reaches the crop's
+    edge, or handedness confidence drops below `min_score`;
+  * with `target_fps`, adjusts `scale` between min_scale and max_scale so the
+    convert + hands.process time fits the frame budget.
+
+A tracking-mode Hands (static_image_mode=False) carries its hand ROI from one
+frame to the next in input-image coordinates, so it must never see the input
+change frame. Two rules keep that true:
+  * crops go to their own `crop_hands` instance, and full frames go to `hands`.
+    Each instance only ever sees one kind of input;
+  * the crop window (origin and size) is only placed after a full frame. It
+    then stays fixed until the next full-frame refresh, and is kept across
+    refreshes while the hands remain inside it. So `crop_hands` sees a new
+    window only when the hands have moved out of the old one.
+With a static_image_mode Hands, the same instance can serve both.
+
+    front = RoiInference(make_hands(), crop_hands=make_hands())
+    results, roi = front.process(image)
+    n = landmarks.fill(results.multi_hand_landmarks, roi=roi)
+    front.observe(landmarks.norm[:n], scores)
+"""
+import time
+
+import cv2 as cv
+import numpy as np
+
+EDGE = 0.02   # normalized: a hand this close to the crop window's border forces a full frame
+
+
+class RoiInference:
+    def __init__(self, hands, crop_hands=None, pad=0.3, full_every=15, min_score=0.6, use_roi=True,
+                 target_fps=None, min_scale=0.35, max_scale=1.0, timer=None):
+        self.hands = hands
+        self.crop_hands = crop_hands if crop_hands is not None else hands
+        self.pad = float(pad)
+        self.full_every = max(1, int(full_every))
+        self.min_score = float(min_score)
+        self.use_roi = use_roi
+        self.target_fps = target_fps
+        self.min_scale, self.max_scale = float(min_scale), float(max_scale)
+        self.scale = self.max_scale
+        self.timer = timer
+        self.full_frames = 0
+        self.roi_frames = 0
+        self.windows = 0        # crop windows placed
+        self._box = None        # normalized [x0, y0, x1, y1] union of the last hands
+        self._window = None     # normalized crop window held between full frames
+        self._full = True       # the last processed frame was a full frame
+        self._hands = 0         # hands found on the last processed frame
+        self._since_full = 0
+        self._force_full = True
+        self._cost = None       # EMA of convert + process seconds
+        self._small = None
+        self._rgb = None
+
+    # ---------- per frame ----------
+    def process(self, image):
+        """Run hands.process on the chosen region. Returns (results, roi or None)."""
+        t0 = time.perf_counter()
+        height, width = image.shape[:2]
+        roi = None
+        view = image
+        crop = self._crop(width, height)
+        self._full = crop is None
+        if crop is not None:
+            x0, y0, x1, y1 = crop
+            view = image[y0:y1, x0:x1]
+            roi = (x0 / width, y0 / height, (x1 - x0) / width, (y1 - y0) / height)
+            self.roi_frames += 1
+            self._since_full += 1
+        else:
+            self.full_frames += 1
+            self._since_full = 0
+        self._force_full = False
+
+        if self.scale < 0.999:
+            size = (max(32, int(view.shape[1] * self.scale)), max(32, int(view.shape[0] * self.scale)))
+            self._small = _reuse(self._small, (size[1], size[0], 3))
+            view = cv.resize(view, size, dst=self._small, interpolation=cv.INTER_AREA)
+        self._rgb = _reuse(self._rgb, view.shape)
+        cv.cvtColor(view, cv.COLOR_BGR2RGB, dst=self._rgb)
+        t_convert = time.perf_counter()
+
+        self._rgb.flags.writeable = False
+        results = (self.hands if crop is None else self.crop_hands).process(self._rgb)
+        self._rgb.flags.writeable = True
+        t_end = time.perf_counter()
+
+        if self.timer is not None:
+            self.timer.add("convert", t_convert - t0)
+            self.timer.add("hands", t_end - t_convert)
+        self._adapt(t_end - t0)
+        return results, roi
+
+    def observe(self, norm, scores=None):
+        """Feed back the full-frame landmarks (n, 21, 2|3) found for the last frame."""
+        n = len(norm)
+        lost = n < self._hands or n == 0
+        weak = scores is not None and len(scores) and min(scores) < self.min_score
+        self._hands = n
+        if n:
+            xy = norm[..., :2]
+            lo = xy.min(axis=(0, 1))
+            hi = xy.max(axis=(0, 1))
+            self._box = (float(lo[0]), float(lo[1]), float(hi[0]), float(hi[1]))
+        else:
+            self._box = None
+        if self._full:
+            self._place()
+        elif self._box is not None and not _contains(self._window, self._box, EDGE):
+            self._force_full = True
+        if lost or weak:
+            self._force_full = True
+
+    def close(self):
+        self.hands.close()
+        if self.crop_hands is not self.hands:
+            self.crop_hands.close()
+
+    # ---------- internals ----------
+    def _place(self):
+        """After a full frame: keep the crop window while the hands are inside it, else re-place it."""
+        if self._box is None:
+            self._window = None
+            return
+        if self._window is not None and _contains(self._window, self._box, EDGE):
+            return
+        x0, y0, x1, y1 = self._box
+        pad_x = (x1 - x0) * self.pad + 0.05
+        pad_y = (y1 - y0) * self.pad + 0.05
+        self._window = (max(0.0, x0 - pad_x), max(0.0, y0 - pad_y), min(1.0, x1 + pad_x), min(1.0, y1 + pad_y))
+        self.windows += 1
+
+    def _crop(self, width, height):
+        """Pixel crop [x0, y0, x1, y1] for this frame, or None for a full frame."""
+        if (not self.use_roi or self._window is None or self._force_full
+                or self._since_full + 1 >= self.full_every):
+            return None
+        x0, y0, x1, y1 = self._window
+        # round out to 32 px so the crop (and its buffers) rarely change shape
+        x0 = max(0, int(x0 * width) // 32 * 32)
+        y0 = max(0, int(y0 * height) // 32 * 32)
+        x1 = min(width, -(-int(x1 * width) // 32) * 32)
+        y1 = min(height, -(-int(y1 * height) // 32) * 32)
+        if x1 - x0 < 64 or y1 - y0 < 64:
+            return None
+        if (x1 - x0) * (y1 - y0) > 0.6 * width * height:
+            return None  # the crop would save little
+        return x0, y0, x1, y1
+
+    def _adapt(self, seconds):
+        """Resolution controller: hold convert + process under the frame budget."""
+        if not self.target_fps:
+            return
+        self._cost = seconds if self._cost is None else 0.8 * self._cost + 0.2 * seconds
+        budget = 1.0 / self.target_fps
+        if self._cost > 0.9 * budget:
+            self.scale = max(self.min_scale, self.scale * 0.9)
+        elif self._cost < 0.6 * budget:
+            self.scale = min(self.max_scale, self.scale * 1.05)
+
+    def stats(self):
+        return {"full_frames": self.full_frames, "roi_frames": self.roi_frames,
+                "windows": self.windows, "scale": round(self.scale, 3)}
+
+
+def _contains(window, box, edge):
+    """True if `box` lies inside `window` with at least `edge` to spare on every side."""
+    return (window[0] + edge <= box[0] and window[1] + edge <= box[1]
+            and box[2] <= window[2] - edge and box[3] <= window[3] - edge)
+
+
+def _reuse(buf, shape):
+    if buf is None or buf.shape != tuple(shape):
+        return np.empty(shape, dtype=np.uint8)
+    return buf
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+Drift-free beat scheduling on a monotonic clock.
+
+The old loops did `send(); time.sleep(interval)`, so send time and OS wake-up
+jitter piled up on every beat. Here each beat has an absolute deadline
+(previous deadline + interval), so lateness on one beat is not carried into
+the next. Tempo changes apply from the next beat boundary, and pause/resume
+wake the worker immediately instead of polling.
+
+BeatTimeline is the pure deadline arithmetic, driven by any clock; BeatTask
+(shimon.bus) runs it as an asyncio task against the bus loop's clock.
+"""
+
+
+class BeatTimeline:
+    def __init__(self, interval, now=0.0):
+        self.interval = float(interval)
+        self.beat = 0                  # index of the next beat to fire
+        self.deadline = float(now)     # absolute time of the next beat
+        self.skipped = 0
+
+    def restart(self, now):
+        """Next beat fires at `now` (used on resume, like the old loops)."""
+        self.deadline = float(now)
+
+    def set_interval(self, interval):
+        # The already-scheduled deadline stands; the new spacing starts after it.
+        self.interval = float(interval)
+
+    def poll(self, now):
+        """Return the beat index if it is due at `now` (and advance), else None."""
+        if now < self.deadline:
+            return None
+        beat = self.beat
+        self.beat += 1
+        self.deadline += self.interval
+        if self.deadline <= now:
+            # Stalled for more than a beat: drop the missed beats, keep the phase.
+            missed = int((now - self.deadline) // self.interval) + 1
+            self.deadline += missed * self.interval
+            self.skipped += missed
+        return beat
+
+    def time_until(self, now):
+        return self.deadline - now
+
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+Local stand-in for Shimon's OSC receivers: what arrives, when, and whether
+the robot could have kept up.
+
+    sim = ShimonSimulator(ports=(9000, 9010)).start()
+    ...  # point HeadBobber / MusicPlayer at 127.0.0.1 (app.py --host 127.0.0.1)
+    print(sim.format_report())
+
+Every datagram (plain message or bundle) is timestamped with
+time.perf_counter() on arrival. That is the clock app.py stamps frames and
+gestures with, so in-process senders get true gesture -> actuation latency
+via mark(). Per OSC address it keeps:
+  * message count and rate;
+  * beat-interval mean, standard deviation and p99 deviation from the median
+    (jitter). Messages within `burst_s` of the previous one (a chord bundle,
+    several players on the same beat) belong to the same beat;
+  * latency from each mark() to the first message on that address after it.
+
+A simple actuator model flags commands the hardware would not have carried out:
+  * NECK [cmd, angle, speed]: the head moves at `neck_rate` rad/s, and a new
+    target arriving before the last one was reached counts as `neck_cut`;
+  * /arm [note, velocity]: `arms` strikers, each busy for `strike_s` after a
+    note; a note with no free striker counts as `arm_missed`.
+"""
+import selectors
+import socket
+import statistics
+import threading
+import time
+from collections import deque
+
+from pythonosc.osc_packet import OscPacket, ParseError
+
+
+class _PathStats:
+    __slots__ = ("count", "first", "last", "beat", "intervals", "latencies")
+
+    def __init__(self, window):
+        self.count = 0
+        self.first = self.last = self.beat = None   # beat: first arrival of the latest beat
+        self.intervals = deque(maxlen=window)
+        self.latencies = deque(maxlen=window)
+
+
+class ShimonSimulator:
+    def __init__(self, host="127.0.0.1", ports=(9000, 9010), arm_path="/arm", neck_rate=2.0, arms=4,
+                 strike_s=0.1, burst_s=0.005, window=10000, clock=time.perf_counter):
+        self.host = host
+        self.arm_path = arm_path
+        self.neck_rate = float(neck_rate)
+        self.arms = int(arms)
+        self.strike_s = float(strike_s)
+        self.burst_s = float(burst_s)
+        self.window = int(window)
+        self.clock = clock
+        self.datagrams = 0
+        self.malformed = 0
+        self.neck_cut = 0
+        self.arm_missed = 0
+        self._lock = threading.Lock()
+        self._paths = {}
+        self._marks = {}         # address -> t of a pending mark()
+        self._neck = [0.0, 0.0, 0.0]   # position at `t`, target, t
+        self._arm_free = [0.0] * self.arms
+        self._selector = selectors.DefaultSelector()
+        self._socks = []
+        for port in ports:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.bind((host, int(port)))
+            sock.setblocking(False)
+            self._selector.register(sock, selectors.EVENT_READ)
+            self._socks.append(sock)
+        self._stop = threading.Event()
+        self._thr = threading.Thread(target=self._run, name="shimon-sim", daemon=True)
+
+    @property
+    def ports(self):
+        """Bound ports, in the order given (port 0 picks a free one)."""
+        return [s.getsockname()[1] for s in self._socks]
+
+    def start(self):
+        self._thr.start()
+        return self
+
+    def close(self, timeout=1.0):
+        self._stop.set()
+        if self._thr.is_alive():
+            self._thr.join(timeout=timeout)
+        for sock in self._socks:
+            self._selector.unregister(sock)
+            sock.close()
+        self._selector.close()
+
+    def mark(self, address, t=None):
+        """A gesture happened at `t`: the next message on `address` gives one latency sample."""
+        with self._lock:
+            self._marks[address] = self.clock() if t is None else t
+
+    def reset(self):
+        with self._lock:
+            self._paths.clear()
+            self._marks.clear()
+            self.datagrams = self.malformed = self.neck_cut = self.arm_missed = 0
+
+    # ---------- receiver thread ----------
+    def _run(self):
+        while not self._stop.is_set():
+            for key, _ in self._selector.select(timeout=0.05):
+                while True:
+                    try:
+                        dgram = key.fileobj.recv(65536)
+                    except (BlockingIOError, OSError):
+                        break
+                    self._receive(dgram, self.clock())
+
+    def _receive(self, dgram, t):
+        try:
+            messages = OscPacket(dgram).messages
+        except ParseError:
+            with self._lock:
+                self.malformed += 1
+            return
+        with self._lock:
+            self.datagrams += 1
+            for timed in messages:
+                message = timed.message
+                self._record(message.address, t)
+                params = message.params
+                if params and params[0] == "NECK":
+                    self._neck_command(float(params[1]), t)
+                elif message.address == self.arm_path:
+                    self._strike(t)
+
+    def _record(self, address, t):
+        stats = self._paths.get(address)
+        if stats is None:
+            stats = self._paths[address] = _PathStats(self.window)
+        if stats.first is None:
+            stats.first = stats.beat = t
+        elif t - stats.last >= self.burst_s:
+            # one interval per beat, not per note
+            stats.intervals.append(t - stats.beat)
+            stats.beat = t
+        stats.last = t
+        stats.count += 1
+        t_mark = self._marks.pop(address, None)
+        if t_mark is not None:
+            stats.latencies.append(t - t_mark)
+
+    def _neck_command(self, angle, t):
+        position, target, t_prev = self._neck
+        travel = self.neck_rate * (t - t_prev)
+        if abs(target - position) > travel:
+            self.neck_cut += 1
+            position += travel if target > position else -travel
+        else:
+            position = target
+        self._neck = [position, angle, t]
+
+    def _strike(self, t):
+        for i, free_at in enumerate(self._arm_free):
+            if free_at <= t:
+                self._arm_free[i] = t + self.strike_s
+                return
+        self.arm_missed += 1
+
+    # ---------- reporting ----------
+    def report(self):
+        """{address: {count, rate_hz, interval_*_ms, jitter_p99_ms, latency_*_ms}} plus totals."""
+        with self._lock:
+            paths = {a: (s.count, s.first, s.last, list(s.intervals), list(s.latencies))
+                     for a, s in self._paths.items()}
+            totals = {"datagrams": self.datagrams, "malformed": self.malformed,
+                      "neck_cut": self.neck_cut, "arm_missed": self.arm_missed}
+        out = {}
+        for address, (count, first, last, intervals, latencies) in paths.items():
+            row = {"count": count}
+            if count > 1 and last > first:
+                row["rate_hz"] = (count - 1) / (last - first)
+            if len(intervals) > 1:
+                median = statistics.median(intervals)
+                deviations = sorted(abs(i - median) for i in intervals)
+                row["interval_mean_ms"] = statistics.fmean(intervals) * 1000
+                row["interval_std_ms"] = statistics.pstdev(intervals) * 1000
+                row["jitter_p99_ms"] = deviations[min(len(deviations) - 1, int(0.99 * len(deviations)))] * 1000
+            if latencies:
+                row["latency_mean_ms"] = statistics.fmean(latencies) * 1000
+                row["latency_max_ms"] = max(latencies) * 1000
+            out[address] = row
+        out["totals"] = totals
+        return out
+
+    def format_report(self):
+        report = self.report()
+        totals = report.pop("totals")
+        lines = []
+        for address, row in sorted(report.items()):
+            fields = "  ".join(f"{k}:{v:.2f}" if isinstance(v, float) else f"{k}:{v}"
+                               for k, v in row.items())
+            lines.append(f"  {address:16s} {fields}")
+        lines.append("  " + "  ".join(f"{k}:{v}" for k, v in totals.items()))
+        return "\n".join(lines)
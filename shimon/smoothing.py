@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Per-hand landmark smoothing and short-horizon prediction (One-Euro filter).
+
+The rule detectors and StartGate used to see raw MediaPipe landmarks, whose
+frame-to-frame jitter flips borderline poses on and off, so StartGate needed
+a long run of frames before trusting a thumbs-up. LandmarkFilter runs a
+One-Euro filter (Casiez et al., CHI 2012) over all 21 points of every hand
+in one vectorized step:
+
+    speed    = |filtered derivative|             (per point)
+    cutoff   = min_cutoff + beta * speed
+    estimate = estimate + alpha(cutoff, dt) * (raw - estimate)
+
+A held pose gets a low cutoff, which removes jitter. A moving hand gets a high
+cutoff, so it is followed with little lag. With `lead` > 0 the output is
+extrapolated along the filtered velocity by that many seconds. That makes up
+for part of the camera + inference latency.
+
+State is a few (max_tracks, 21, 2) arrays indexed by HandTracker slot. A
+slot whose track id changed, or that has not been seen for `max_gap`
+seconds, restarts from the raw landmarks.
+"""
+import math
+
+import numpy as np
+
+NUM_LANDMARKS = 21
+
+
+def _alpha(cutoff, dt):
+    """Exponential-smoothing factor for a first-order low-pass at `cutoff` Hz."""
+    tau = 1.0 / (2.0 * math.pi * cutoff)
+    return dt / (dt + tau)
+
+
+class LandmarkFilter:
+    def __init__(self, max_tracks=8, min_cutoff=1.0, beta=10.0, d_cutoff=1.0, lead=0.0, max_gap=0.25):
+        self.min_cutoff = float(min_cutoff)   # Hz, at rest
+        self.beta = float(beta)               # Hz per (normalized unit / s) of speed
+        self.d_cutoff = float(d_cutoff)       # Hz, for the derivative
+        self.lead = float(lead)               # s of prediction
+        self.max_gap = float(max_gap)
+        self.resets = 0
+        self._allocate(max_tracks)
+
+    def _allocate(self, max_tracks):
+        self.x = np.zeros((max_tracks, NUM_LANDMARKS, 2), dtype=np.float32)    # filtered position
+        self.dx = np.zeros((max_tracks, NUM_LANDMARKS, 2), dtype=np.float32)   # filtered velocity
+        self.t = np.zeros(max_tracks, dtype=np.float64)
+        self.ids = np.zeros(max_tracks, dtype=np.int64)   # track id the slot's state belongs to; 0 = none
+
+    def reserve(self, max_tracks):
+        """Make room for `max_tracks` slots (existing state is kept)."""
+        if max_tracks > len(self.ids):
+            old = self.x, self.dx, self.t, self.ids
+            self._allocate(max_tracks)
+            for new, prev in zip((self.x, self.dx, self.t, self.ids), old):
+                new[:len(prev)] = prev
+
+    def apply(self, tracks, points, now):
+        """
+        Filter (n, 21, 2) normalized `points` in place. `tracks` are the
+        HandTracker tracks of the same hands, in the same order; `now` is in
+        seconds on the frame clock (capture / recording time).
+        """
+        n = len(points)
+        if not n:
+            return points
+        slots = np.fromiter((t.slot for t in tracks[:n]), dtype=np.intp, count=n)
+        ids = np.fromiter((t.id for t in tracks[:n]), dtype=np.int64, count=n)
+        elapsed = now - self.t[slots]
+        fresh = (self.ids[slots] != ids) | (elapsed > self.max_gap)
+        # repeated timestamps (a carried-forward frame) still move by a millisecond's worth
+        dt = np.maximum(elapsed, 1e-3).astype(np.float32)[:, None, None]
+
+        x_prev = self.x[slots]
+        dx_prev = self.dx[slots]
+        raw_dx = (points - x_prev) / dt
+        dx = dx_prev + _alpha(self.d_cutoff, dt) * (raw_dx - dx_prev)
+        speed = np.sqrt(np.einsum("hpc,hpc->hp", dx, dx))[..., None]
+        x = x_prev + _alpha(self.min_cutoff + self.beta * speed, dt) * (points - x_prev)
+        if fresh.any():
+            x[fresh] = points[fresh]
+            dx[fresh] = 0.0
+            self.resets += int(fresh.sum())
+
+        self.x[slots] = x
+        self.dx[slots] = dx
+        self.t[slots] = now
+        self.ids[slots] = ids
+        if self.lead:
+            x += self.lead * dx
+            np.clip(x, 0.0, 1.0, out=x)
+        points[...] = x
+        return points
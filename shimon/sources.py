@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+Frame sources beyond a live camera: video files and image-sequence folders.
+
+open_source() turns a --device value into a cv.VideoCapture-like object:
+    "0", "1", ...      -> live camera (unchanged behaviour)
+    path/to/video.mp4  -> video file
+    path/to/frames/    -> sorted image files in that directory
+
+File sources are wrapped in PrefetchCapture, which decodes ahead on a
+background thread into a fixed ring of preallocated frame buffers and paces
+delivery to the source FPS, to --max_fps, or not at all.
+"""
+import os
+import queue
+import threading
+import time
+
+import cv2 as cv
+import numpy as np
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".webp")
+
+
+class ImageSequence:
+    """Reads the images of a directory in name order, VideoCapture style."""
+    def __init__(self, directory, fps=30.0):
+        self.files = sorted(os.path.join(directory, f) for f in os.listdir(directory)
+                            if f.lower().endswith(IMAGE_EXTENSIONS))
+        self.fps = float(fps)
+        self._pos = 0
+
+    def isOpened(self):
+        return bool(self.files)
+
+    def read(self, image=None):
+        while self._pos < len(self.files):
+            path = self.files[self._pos]
+            self._pos += 1
+            frame = cv.imread(path, cv.IMREAD_COLOR)
+            if frame is None:
+                print(f"[Source] skipping unreadable image {path}")
+                continue
+            if image is not None and image.shape == frame.shape:
+                np.copyto(image, frame)
+                return True, image
+            return True, frame
+        return False, None
+
+    def get(self, prop):
+        if prop == cv.CAP_PROP_FPS:
+            return self.fps
+        if prop == cv.CAP_PROP_FRAME_COUNT:
+            return float(len(self.files))
+        return 0.0
+
+    def set(self, prop, value):
+        return False
+
+    def release(self):
+        self.files = []
+
+
+class PrefetchCapture:
+    """
+    Decode-ahead wrapper around a VideoCapture-like source.
+    The frame returned by read() stays valid until the next read() call,
+    after which its buffer goes back to the ring for reuse.
+    """
+    def __init__(self, source, ring_size=8, max_fps=None):
+        self.source = source
+        self.ring_size = max(2, int(ring_size))
+        self.max_fps = max_fps  # None / 0 -> no pacing
+        self._free = queue.Queue()
+        self._ready = queue.Queue()  # bounded by the ring itself
+        self._held = None
+        self._halt = threading.Event()
+        self._t0 = None
+        self._delivered = 0
+        self._thr = threading.Thread(target=self._decode, name="prefetch", daemon=True)
+        self._thr.start()
+
+    def _decode(self):
+        ok, first = self.source.read()
+        if not ok:
+            self._ready.put(None)
+            return
+        # preallocate the ring from the first frame's shape
+        for _ in range(self.ring_size - 1):
+            self._free.put(np.empty_like(first))
+        self._ready.put(first)
+        while not self._halt.is_set():
+            try:
+                buf = self._free.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            ok, frame = self.source.read(buf)
+            if not ok:
+                self._ready.put(None)
+                return
+            self._ready.put(frame)
+
+    def read(self):
+        if self._held is not None:
+            self._free.put(self._held)
+            self._held = None
+        frame = self._ready.get()
+        if frame is None:
+            self._ready.put(None)  # stay at EOF for any further reads
+            return False, None
+        if self.max_fps:
+            now = time.perf_counter()
+            if self._t0 is None:
+                self._t0 = now
+            wait = self._t0 + self._delivered / self.max_fps - now
+            if wait > 0:
+                time.sleep(wait)
+        self._delivered += 1
+        self._held = frame
+        return True, frame
+
+    def isOpened(self):
+        return self.source.isOpened()
+
+    def get(self, prop):
+        return self.source.get(prop)
+
+    def set(self, prop, value):
+        return self.source.set(prop, value)
+
+    def release(self):
+        self._halt.set()
+        self._thr.join(timeout=1.0)
+        self.source.release()
+
+
+def is_camera(device):
+    return str(device).isdigit()
+
+
+def open_source(device, width=None, height=None, max_fps=None, as_fast_as_possible=False,
+                ring_size=8):
+    """
+    Open --device as a capture. Cameras get width/height applied; files and
+    directories are prefetched and paced at max_fps, else their own FPS,
+    unless as_fast_as_possible.
+    """
+    if is_camera(device):
+        cap = cv.VideoCapture(int(device))
+        if width:
+            cap.set(cv.CAP_PROP_FRAME_WIDTH, width)
+        if height:
+            cap.set(cv.CAP_PROP_FRAME_HEIGHT, height)
+        return cap
+
+    if os.path.isdir(device):
+        source = ImageSequence(device)
+    elif os.path.isfile(device):
+        source = cv.VideoCapture(device)
+    else:
+        raise FileNotFoundError(f"--device {device!r} is not a camera index, video file or directory")
+    if not source.isOpened():
+        raise IOError(f"could not open {device!r}")
+
+    fps = None
+    if not as_fast_as_possible:
+        fps = max_fps or source.get(cv.CAP_PROP_FPS) or 30.0
+    return PrefetchCapture(source, ring_size=ring_size, max_fps=fps)
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Sliding-window label vote with O(1) updates.
+
+Replaces `Counter(deque(maxlen=n)).most_common()[0][0]` on every frame.
+For each label it keeps a queue of the positions it still holds in the
+window, so the count is the queue length and the oldest occurrence is the
+queue head; append() touches only the label coming in and the one falling
+out. most() scans the labels present (a handful of gesture ids), not the
+window, and breaks ties the way Counter does: earliest first occurrence.
+"""
+from collections import deque
+
+
+class LabelVote:
+    def __init__(self, maxlen):
+        self.maxlen = int(maxlen)
+        self._ring = [None] * self.maxlen
+        self._positions = {}  # label -> deque of sequence numbers in the window
+        self._seq = 0
+
+    def append(self, label):
+        slot = self._seq % self.maxlen
+        if self._seq >= self.maxlen:
+            old = self._ring[slot]
+            positions = self._positions[old]
+            positions.popleft()
+            if not positions:
+                del self._positions[old]
+        self._ring[slot] = label
+        positions = self._positions.get(label)
+        if positions is None:
+            positions = self._positions[label] = deque()
+        positions.append(self._seq)
+        self._seq += 1
+
+    def most(self, default=None):
+        """The majority label in the window (ties -> the one seen first)."""
+        best, best_count, best_first = default, 0, None
+        for label, positions in self._positions.items():
+            count = len(positions)
+            if count > best_count or (count == best_count and positions[0] < best_first):
+                best, best_count, best_first = label, count, positions[0]
+        return best
+
+    def count(self, label):
+        positions = self._positions.get(label)
+        return len(positions) if positions else 0
+
+    def clear(self):
+        self._ring = [None] * self.maxlen
+        self._positions.clear()
+        self._seq = 0
+
+    def __len__(self):
+        return min(self._seq, self.maxlen)
+
+    def __iter__(self):
+        """Labels oldest first, like iterating the deque it replaces."""
+        n = len(self)
+        start = self._seq - n
+        return (self._ring[i % self.maxlen] for i in range(start, self._seq))
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+Hand identity tracking: stable track IDs instead of "Left"/"Right" keys.
+
+MediaPipe's handedness label flips, and two performers can both show a
+"Right" hand, so histories keyed by label get mixed. HandTracker matches
+each frame's bounding boxes to live tracks:
+  * cost = 1 - IoU, or, for a box that moved clear of its old position
+    within `max_jump` box diagonals, 1 + distance / diagonal;
+  * optimal assignment (linear_assignment: exhaustive for a few hands,
+    Hungarian beyond that);
+  * unmatched tracks age and are released after `max_age` frames.
+
+Tracks come from a fixed pool of `max_tracks` slots, each with a
+preallocated PointHistory and LabelVote. A released slot is cleared and
+reused, so memory stays bounded however many hands come and go.
+"""
+import itertools
+import math
+
+import numpy as np
+
+from shimon.preprocessing import PointHistory
+from shimon.temporal import LabelVote
+
+_NO_MATCH = 1e9
+_BRUTE_FORCE_MAX = 4  # <= 4! = 24 candidate assignments
+
+
+def linear_assignment(cost):
+    """
+    Minimum-cost assignment for a (rows, cols) cost matrix (list of lists or
+    array). Returns [(row, col), ...] with one pair per row when rows <= cols,
+    else one per column. Small problems are solved exhaustively, larger ones
+    with the Hungarian algorithm (potentials, O(n^2 m)).
+    """
+    rows = cost.tolist() if isinstance(cost, np.ndarray) else [list(r) for r in cost]
+    if not rows or not rows[0]:
+        return []
+    transposed = len(rows) > len(rows[0])
+    if transposed:
+        rows = [list(c) for c in zip(*rows)]
+    n, m = len(rows), len(rows[0])
+    if m <= _BRUTE_FORCE_MAX:
+        # a frame has a handful of hands: trying every assignment beats any setup cost
+        best = min(itertools.permutations(range(m), n),
+                   key=lambda cols: sum(rows[i][j] for i, j in enumerate(cols)))
+        pairs = list(enumerate(best))
+    else:
+        pairs = _hungarian(np.array(rows, dtype=np.float64))
+    if transposed:
+        pairs = [(c, r) for r, c in pairs]
+    return sorted(pairs)
+
+
+def _hungarian(cost):
+    n, m = cost.shape
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=np.intp)    # p[j]: row (1-based) assigned to column j
+    way = np.zeros(m + 1, dtype=np.intp)
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            cur = cost[i0 - 1] - u[i0] - v[1:]
+            free = ~used[1:]
+            better = free & (cur < minv[1:])
+            minv[1:][better] = cur[better]
+            way[1:][better] = j0
+            candidates = np.where(free, minv[1:], np.inf)
+            j1 = int(np.argmin(candidates)) + 1
+            delta = candidates[j1 - 1]
+            u[p[used]] += delta
+            v[used] -= delta
+            minv[1:][free] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+    return [(int(p[j]) - 1, j - 1) for j in range(1, m + 1) if p[j]]
+
+
+class Track:
+    """One tracked hand. Buffers belong to the pool slot and are reused."""
+    __slots__ = ("slot", "id", "label", "brect", "age", "hits", "points", "votes")
+
+    def __init__(self, slot, history_length):
+        self.slot = slot
+        self.id = None          # None while the slot is free
+        self.label = None       # latest MediaPipe handedness, for display only
+        self.brect = np.zeros(4, dtype=np.float64)
+        self.age = 0            # frames since last matched
+        self.hits = 0
+        self.points = PointHistory(history_length)
+        self.votes = LabelVote(history_length)
+
+    def reset(self):
+        self.id = None
+        self.label = None
+        self.age = 0
+        self.hits = 0
+        self.points.clear()
+        self.votes.clear()
+
+
+def _iou(a, b):
+    """IoU of two [x1, y1, x2, y2] boxes (plain floats: a frame has only a few)."""
+    ix = min(a[2], b[2]) - max(a[0], b[0])
+    iy = min(a[3], b[3]) - max(a[1], b[1])
+    if ix <= 0 or iy <= 0:
+        return 0.0
+    inter = ix * iy
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+class HandTracker:
+    def __init__(self, history_length=16, max_tracks=8, max_age=15, min_iou=0.1, max_jump=1.5):
+        self.history_length = int(history_length)
+        self.max_age = int(max_age)
+        self.min_iou = float(min_iou)
+        self.max_jump = float(max_jump)
+        self._pool = [Track(i, self.history_length) for i in range(int(max_tracks))]
+        self._ids = itertools.count(1)
+        self.created = 0
+        self.released = 0
+
+    @property
+    def max_tracks(self):
+        return len(self._pool)
+
+    @property
+    def tracks(self):
+        """Live tracks, in slot order."""
+        return [t for t in self._pool if t.id is not None]
+
+    def update(self, brects, labels=()):
+        """
+        Match this frame's (n, 4) boxes to tracks. Returns one Track per box,
+        in box order; tracks not seen this frame are aged (and released).
+        """
+        n = len(brects)
+        if n > len(self._pool):
+            raise ValueError(f"{n} hands but only {len(self._pool)} track slots")
+        live = self.tracks
+        assigned = [None] * n
+        if n and live:
+            cost = self._cost(live, np.asarray(brects).tolist())
+            for r, c in linear_assignment(cost):
+                if cost[r][c] < _NO_MATCH:
+                    assigned[c] = live[r]
+
+        matched = {t.slot for t in assigned if t is not None}
+        for t in live:
+            if t.slot in matched:
+                t.age = 0  # before _allocate() looks for the stalest track
+            else:
+                t.age += 1
+                if t.age > self.max_age:
+                    t.reset()
+                    self.released += 1
+
+        for i in range(n):
+            track = assigned[i]
+            if track is None:
+                track = assigned[i] = self._allocate()
+            track.brect[:] = brects[i]
+            track.age = 0
+            track.hits += 1
+            if i < len(labels):
+                track.label = labels[i]
+        return assigned
+
+    def unseen(self, seen):
+        """Live tracks that are not in `seen` (the list returned by update)."""
+        slots = {t.slot for t in seen}
+        return [t for t in self._pool if t.id is not None and t.slot not in slots]
+
+    def _cost(self, live, boxes):
+        cost = []
+        for t in live:
+            prev = t.brect.tolist()
+            # no overlap (fast move / low FPS): fall back to centroid distance in box diagonals
+            diag = max(math.hypot(prev[2] - prev[0], prev[3] - prev[1]), 1e-9)
+            row = []
+            for box in boxes:
+                iou = _iou(prev, box)
+                if iou >= self.min_iou:
+                    row.append(1.0 - iou)
+                    continue
+                dist = math.hypot(box[0] + box[2] - prev[0] - prev[2],
+                                  box[1] + box[3] - prev[1] - prev[3]) * 0.5 / diag
+                row.append(1.0 + dist if dist <= self.max_jump else _NO_MATCH)
+            cost.append(row)
+        return cost
+
+    def _allocate(self):
+        free = next((t for t in self._pool if t.id is None), None)
+        if free is None:
+            # pool exhausted: recycle the stalest track
+            free = max(self._pool, key=lambda t: t.age)
+            free.reset()
+            self.released += 1
+        free.id = next(self._ids)
+        self.created += 1
+        return free